@@ -1,31 +1,50 @@
-import secrets, pyotp, qrcode, io, base64, logging
+import secrets, pyotp, qrcode, io, base64, logging, datetime
 from fastapi.security import OAuth2PasswordRequestForm
-from fastapi import APIRouter, Depends, HTTPException, Request
-from sqlmodel import Session, select
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, UploadFile, File
+from fastapi.concurrency import run_in_threadpool
+from sqlmodel import select, delete
+from sqlmodel.ext.asyncio.session import AsyncSession
 from .database import get_session
-from .models import User
+from .models import PasswordResetToken, User, UserSession
 from .schemas import (
     LoginRequest,
+    RefreshRequest,
     ResetRequest,
     ResetConfirm,
     MFAEnableRequest,
     MFAVerifyRequest,
-    UserCreate
+    UserCreate,
+    UserRoleUpdate,
+    UserSearchPage
+)
+from .dependencies import (
+    hash_password_async,
+    verify_password_async,
+    hash_pool,
+    get_current_user,
+    create_access_token,
+    invalidate_user,
+    user_cache,
+    USER_INVALIDATION_TOPIC
 )
-from .dependencies import get_password_hash, verify_password, get_current_user, create_access_token
 from .rate_limiter import limiter
+from .pubsub import hub
+from .sessions import create_session, rotate_session, revoke_family, revoke_user_sessions, announce_revoked, hash_token
+from .config import ACCESS_TOKEN_MINUTES, RESET_TOKEN_MINUTES
+from .user_directory import user_directory
+from .user_provisioning import provision_users
 from .utils import log_security_event
-from typing import List
+from typing import List, Optional
 
 router = APIRouter(prefix="", tags=["Authentication"])
 
 @router.post("/login")
 @limiter.limit("5/minute")
-async def login(data: LoginRequest, request: Request, session: Session = Depends(get_session)):
+async def login(data: LoginRequest, request: Request, session: AsyncSession = Depends(get_session)):
     """Bejelentkezés audit naplózással"""
-    user = session.exec(select(User).where(User.username == data.username)).first()
+    user = (await session.exec(select(User).where(User.username == data.username))).first()
     
-    if not user or not verify_password(data.password, user.hashed_password):
+    if not user or not await verify_password_async(data.password, user.hashed_password):
         # SIKERTELEN kísérlet naplózása IP címmel
         log_security_event(f"SIKERTELEN BEJELENTKEZES - User: {data.username} - IP: {request.client.host}")
         raise HTTPException(status_code=401, detail="Hibás felhasználónév vagy jelszó")
@@ -44,41 +63,77 @@ async def login(data: LoginRequest, request: Request, session: Session = Depends
     # SIKERES belépés naplózása
     log_security_event(f"SIKERES BEJELENTKEZES - User: {user.username}")
     
-    access_token = create_access_token(data={"sub": user.username})
+    refresh_token, user_session = create_session(session, user.username)
+    await session.commit()
+    access_token = create_access_token(data={"sub": user.username, "sid": user_session.family_id})
     
     return {
         "access_token": access_token,
+        "refresh_token": refresh_token,
         "token_type": "bearer",
+        "expires_in": ACCESS_TOKEN_MINUTES * 60,
         "mfa_enabled": user.mfa_enabled,
         "role": user.role
     }
 
+@router.post("/token/refresh")
+async def refresh_access_token(data: RefreshRequest, session: AsyncSession = Depends(get_session)):
+    """Új access + refresh token a régi refresh token cseréjével (jelszó és bcrypt nélkül)"""
+    refresh_token, user_session = await rotate_session(session, data.refresh_token)
+    await session.commit()
+    access_token = create_access_token(data={"sub": user_session.username, "sid": user_session.family_id})
+    
+    return {
+        "access_token": access_token,
+        "refresh_token": refresh_token,
+        "token_type": "bearer",
+        "expires_in": ACCESS_TOKEN_MINUTES * 60
+    }
+
+@router.post("/logout")
+async def logout(data: RefreshRequest, session: AsyncSession = Depends(get_session)):
+    """Kijelentkezés: a munkamenet-család visszavonása, a kiadott access tokenek is azonnal érvénytelenek"""
+    user_session = (await session.exec(
+        select(UserSession).where(UserSession.token_hash == hash_token(data.refresh_token))
+    )).first()
+    
+    if user_session:
+        await revoke_family(session, user_session.family_id)
+        await session.commit()
+        announce_revoked([user_session.family_id])
+        log_security_event(f"KIJELENTKEZES - User: {user_session.username}")
+    
+    return {"message": "Kijelentkezve"}
+
 @router.post("/token")
 async def login_for_swagger(
     form_data: OAuth2PasswordRequestForm = Depends(),
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_session)
 ):
-    """Külön endpoint a Swagger UI Authorize gombjához (Form Data-t vár)"""
-    user = session.exec(select(User).where(User.username == form_data.username)).first()
+    """Külön endpoint a Swagger UI Authorize gombjához (Form Data-t vár; saját munkamenet, kijelentkezéssel visszavonható)"""
+    user = (await session.exec(select(User).where(User.username == form_data.username))).first()
     
-    if not user or not verify_password(form_data.password, user.hashed_password):
+    if not user or not await verify_password_async(form_data.password, user.hashed_password):
         raise HTTPException(status_code=401, detail="Hibás felhasználónév vagy jelszó")
     
-    access_token = create_access_token(data={"sub": user.username})
+    refresh_token, user_session = create_session(session, user.username)
+    await session.commit()
+    access_token = create_access_token(data={"sub": user.username, "sid": user_session.family_id})
     
-    return {"access_token": access_token, "token_type": "bearer"}
+    return {"access_token": access_token, "refresh_token": refresh_token, "token_type": "bearer"}
 
 @router.post("/mfa/setup")
-async def mfa_setup(req: MFAEnableRequest, session: Session = Depends(get_session)):
+async def mfa_setup(req: MFAEnableRequest, session: AsyncSession = Depends(get_session)):
     """MFA beállítása"""
-    user = session.exec(select(User).where(User.username == req.username)).first()
+    user = (await session.exec(select(User).where(User.username == req.username))).first()
     if not user:
         raise HTTPException(status_code=404)
     
     if not user.mfa_secret:
         user.mfa_secret = pyotp.random_base32()
         session.add(user)
-        session.commit()
+        await session.commit()
+        invalidate_user(user.username)
     
     # QR kód generálása
     uri = pyotp.totp.TOTP(user.mfa_secret).provisioning_uri(
@@ -94,9 +149,9 @@ async def mfa_setup(req: MFAEnableRequest, session: Session = Depends(get_sessio
 
 
 @router.post("/mfa/verify")
-async def mfa_verify(req: MFAVerifyRequest, session: Session = Depends(get_session)):
+async def mfa_verify(req: MFAVerifyRequest, session: AsyncSession = Depends(get_session)):
     """MFA kód ellenőrzése"""
-    user = session.exec(select(User).where(User.username == req.username)).first()
+    user = (await session.exec(select(User).where(User.username == req.username))).first()
     if not user:
         raise HTTPException(status_code=404)
     
@@ -104,7 +159,8 @@ async def mfa_verify(req: MFAVerifyRequest, session: Session = Depends(get_sessi
     if totp.verify(req.code):
         user.mfa_enabled = True
         session.add(user)
-        session.commit()
+        await session.commit()
+        invalidate_user(user.username)
         return {"message": "MFA sikeresen bekapcsolva!"}
     else:
         raise HTTPException(status_code=400, detail="Hibás kód!")
@@ -113,51 +169,117 @@ async def mfa_verify(req: MFAVerifyRequest, session: Session = Depends(get_sessi
 @router.post("/users", status_code=201)
 async def create_user(
     user_data: UserCreate,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_session),
     current_user: User = Depends(get_current_user)
 ):
     """Új felhasználó létrehozása (csak admin)"""
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Nincs jogosultságod!")
     
-    existing_user = session.exec(
+    existing_user = (await session.exec(
         select(User).where(User.username == user_data.username)
-    ).first()
+    )).first()
     
     if existing_user:
         raise HTTPException(status_code=400, detail="Ez a felhasználónév már foglalt!")
     
     new_user = User(
         username=user_data.username,
-        hashed_password=get_password_hash(user_data.password),
+        hashed_password=await hash_password_async(user_data.password),
         role=user_data.role,
         mfa_enabled=False
     )
     session.add(new_user)
-    session.commit()
+    await session.commit()
+    invalidate_user(new_user.username)
+    user_directory.add(new_user.username)
     
     return {"message": f"Felhasználó ({user_data.username}) létrehozva!"}
 
+@router.post("/users/bulk")
+async def bulk_create_users(
+    file: UploadFile = File(...),
+    current_user: User = Depends(get_current_user)
+):
+    """Tömeges felhasználó-felvétel CSV vagy JSON fájlból, soronkénti eredménnyel (csak admin)"""
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Nincs jogosultságod!")
+    
+    filename = (file.filename or "").lower()
+    if filename.endswith(".json") or file.content_type == "application/json":
+        file_format = "json"
+    elif filename.endswith(".csv") or file.content_type == "text/csv":
+        file_format = "csv"
+    else:
+        raise HTTPException(status_code=400, detail="Csak .csv vagy .json fájl tölthető fel")
+    
+    # A validálás és a beszúrás szálban, a bcrypt processzkészletben fut - az eseményhurok szabad marad
+    try:
+        report = await run_in_threadpool(provision_users, file.file, file_format)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    usernames = report.pop("usernames")
+    if usernames:
+        for username in usernames:
+            user_directory.add(username)
+        # Egyetlen üzenet a soronkénti helyett: a többi worker újratölti az indexét
+        hub.publish([USER_INVALIDATION_TOPIC], {"type": "resync"})
+    
+    log_security_event(
+        f"TOMEGES FELHASZNALO FELVETEL - Admin: {current_user.username} - Sikeres: {report['created']} - Hibas: {report['failed']}"
+    )
+    return report
+
+@router.put("/users/{username}/role")
+async def update_user_role(
+    username: str,
+    data: UserRoleUpdate,
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(get_current_user)
+):
+    """Felhasználó szerepkörének módosítása (csak admin)"""
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Nincs jogosultságod!")
+    if data.role not in ("admin", "user"):
+        raise HTTPException(status_code=400, detail="Érvénytelen szerepkör!")
+    
+    user = (await session.exec(select(User).where(User.username == username))).first()
+    if not user:
+        raise HTTPException(status_code=404, detail="Felhasználó nem található")
+    
+    user.role = data.role
+    session.add(user)
+    await session.commit()
+    invalidate_user(username)
+    log_security_event(f"SZEREPKOR MODOSITVA - User: {username} - Uj szerepkor: {data.role} - Modosito: {current_user.username}")
+    
+    return {"message": f"{username} szerepköre: {data.role}"}
+
 logging.basicConfig(level=logging.INFO, filename="security.log")
 logger = logging.getLogger("security")
 @router.post("/request-reset")
 async def request_reset(
     data: ResetRequest,
     request: Request,
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_session)
 ):
     """Jelszó visszaállítás kérése"""
     
-    user = session.exec(select(User).where(User.username == data.username)).first()
+    user = (await session.exec(select(User).where(User.username == data.username))).first()
     
     if user:
         client_ip = request.client.host if request.client else "Unknown"
         logger.info(f"Jelszo visszaallitas kerese: {user.username} - IP: {client_ip}")
         
         token = secrets.token_urlsafe(16)
-        user.reset_token = token
-        session.add(user)
-        session.commit()
+        await session.execute(delete(PasswordResetToken).where(PasswordResetToken.username == user.username))
+        session.add(PasswordResetToken(
+            token_hash=hash_token(token),
+            username=user.username,
+            expires_at=datetime.datetime.utcnow() + datetime.timedelta(minutes=RESET_TOKEN_MINUTES)
+        ))
+        await session.commit()
         
         print(f"JELSZÓ VISSZAÁLLÍTÓ KÓD ({user.username}): {token}")
     
@@ -165,25 +287,57 @@ async def request_reset(
 
 
 @router.post("/confirm-reset")
-async def confirm_reset(data: ResetConfirm, session: Session = Depends(get_session)):
-    """Jelszó visszaállítás megerősítése"""
-    user = session.exec(select(User).where(User.reset_token == data.token)).first()
+async def confirm_reset(data: ResetConfirm, session: AsyncSession = Depends(get_session)):
+    """Jelszó visszaállítás megerősítése (elsődleges kulcsos keresés a token lenyomatára, egyszer használható)"""
+    reset_token = await session.get(PasswordResetToken, hash_token(data.token))
+    
+    if not reset_token or reset_token.expires_at <= datetime.datetime.utcnow():
+        raise HTTPException(status_code=400, detail="Érvénytelen vagy lejárt kód!")
     
+    user = (await session.exec(select(User).where(User.username == reset_token.username))).first()
     if not user:
         raise HTTPException(status_code=400, detail="Érvénytelen kód!")
     
-    user.hashed_password = get_password_hash(data.new_password)
-    user.reset_token = None
+    user.hashed_password = await hash_password_async(data.new_password)
+    user.feed_secret_hash = None
+    await session.delete(reset_token)
     session.add(user)
-    session.commit()
+    revoked = await revoke_user_sessions(session, user.username)
+    await session.commit()
+    invalidate_user(user.username)
+    announce_revoked(revoked)
     
     return {"message": "Sikeres jelszócsere!"}
 
 @router.get("/users/list", response_model=List[str])
 async def list_usernames(
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(get_current_user)
+):
+    """Visszaadja az összes felhasználó nevét (nagy címtárnál a /users/search lapozós keresése ajánlott)"""
+    return (await session.exec(select(User.username))).all()
+
+@router.get("/users/search", response_model=UserSearchPage)
+async def search_users(
+    q: str = Query("", max_length=100),
+    limit: int = Query(20, ge=1, le=100),
+    cursor: Optional[str] = None,
     current_user: User = Depends(get_current_user)
 ):
-    """Visszaadja az összes felhasználó nevét"""
-    users = session.exec(select(User)).all()
-    return [u.username for u in users]
+    """Felhasználónév keresés a memóriabeli indexből: előbb prefix, majd részszó találatok"""
+    items, next_cursor = user_directory.search(q, limit, cursor)
+    return {"items": items, "next_cursor": next_cursor}
+
+@router.get("/admin/metrics/password-hashing")
+async def password_hashing_metrics(current_user: User = Depends(get_current_user)):
+    """A bcrypt szálkészlet terhelése és sorban állási ideje (csak admin)"""
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Csak adminoknak!")
+    return hash_pool.stats()
+
+@router.get("/admin/metrics/user-cache")
+async def user_cache_metrics(current_user: User = Depends(get_current_user)):
+    """A felhasználó-gyorsítótár találati aránya (csak admin)"""
+    if current_user.role != "admin":
+        raise HTTPException(status_code=403, detail="Csak adminoknak!")
+    return user_cache.stats()
@@ -0,0 +1,161 @@
+import csv, io
+from typing import IO, Iterator, List, Optional, Tuple
+from sqlmodel import Session, select, func
+from .database import engine
+from .models import Event, EventChange, EventParticipant
+from .dependencies import add_owner_to_participants
+from . import ical, recurrence
+from .config import RECURRENCE_MAX_COUNT, RECURRENCE_MAX_YEARS
+from .utils import encrypt_text, sanitize_input, to_utc
+
+IMPORT_BATCH_SIZE = 1000
+TRUE_VALUES = {"1", "true", "igen", "yes", "x"}
+
+
+def clean_text(text: Optional[str]) -> Optional[str]:
+    """Sanitizálás; jelölőkarakter nélküli szövegen a bleach kihagyható, mert változatlanul adná vissza"""
+    if not text:
+        return text
+    if "<" in text or ">" in text or "&" in text:
+        return sanitize_input(text)
+    return text
+
+
+def iter_csv(stream: IO[str]) -> Iterator[Tuple[int, Optional[dict], Optional[str]]]:
+    """CSV sorok folyamatos feldolgozása (fejléc: title,start_date,end_date,description,participants,is_public,is_meeting[,rrule,exdates])"""
+    reader = csv.DictReader(stream)
+    for row in reader:
+        number = reader.line_num
+        try:
+            start = to_utc(row["start_date"].strip())
+            end = to_utc(row["end_date"].strip())
+        except (KeyError, AttributeError, ValueError) as e:
+            yield number, None, f"Érvénytelen időpont: {e}"
+            continue
+
+        yield number, {
+            "title": (row.get("title") or "").strip(),
+            "description": row.get("description") or None,
+            "participants": row.get("participants") or None,
+            "start_date": start,
+            "end_date": end,
+            "is_public": (row.get("is_public") or "").strip().lower() in TRUE_VALUES,
+            "is_meeting": (row.get("is_meeting") or "").strip().lower() in TRUE_VALUES,
+            "rrule": row.get("rrule") or None,
+            "exdates": row.get("exdates") or None,
+        }, None
+
+
+def prepare_row(data: dict, owner: str, generate_meet_link) -> Tuple[Optional[dict], List[str], Optional[str]]:
+    """Validálás, sanitizálás és titkosítás egy sorra: (insert adatok, résztvevők, hiba)"""
+    title = clean_text(data["title"])
+    if not title:
+        return None, [], "Hiányzó cím"
+    if data["end_date"] < data["start_date"]:
+        return None, [], "A befejezés nem lehet korábban a kezdésnél"
+
+    rrule, exdates, series_end = None, None, None
+    if data.get("rrule"):
+        try:
+            rule = recurrence.parse_rrule(data["rrule"])
+            recurrence.check_limits(data["start_date"], rule, RECURRENCE_MAX_COUNT, RECURRENCE_MAX_YEARS)
+            exdates = recurrence.format_exdates(to_utc(item) for item in recurrence.parse_exdates(data.get("exdates")))
+        except ValueError as e:
+            return None, [], f"Érvénytelen ismétlődés: {e}"
+        rrule = recurrence.format_rrule(rule)
+        series_end = recurrence.series_end(data["start_date"], data["end_date"], rule)
+
+    participants = add_owner_to_participants(owner, clean_text(data.get("participants")))
+    description = clean_text(data.get("description"))
+    is_meeting = data.get("is_meeting", False)
+
+    return {
+        "title": title,
+        "start_date": data["start_date"],
+        "end_date": data["end_date"],
+        "description": encrypt_text(description) if description else None,
+        "owner": owner,
+        "participants": ", ".join(participants),
+        "is_meeting": is_meeting,
+        "meeting_link": generate_meet_link() if is_meeting else None,
+        "is_public": data.get("is_public", False),
+        "version": 0,
+        "rrule": rrule,
+        "exdates": exdates,
+        "series_end": series_end,
+        "participant_count": len(participants),
+    }, participants, None
+
+
+def flush_batch(session: Session, rows: List[dict], participants: List[List[str]]) -> int:
+    """Egy köteg beszúrása executemany-vel, saját tranzakcióban; a köteg verzióját adja vissza"""
+    change = EventChange(owner=rows[0]["owner"], public=any(row["is_public"] for row in rows))
+    session.add(change)
+    session.flush()
+
+    # A változásnapló beszúrása már megszerezte az írási zárat, így az azonosítók
+    # előre kioszthatók, és a sorok RETURNING nélkül, egyetlen executemany-vel mennek be
+    connection = session.connection()
+    event_table = Event.__table__
+    first_id = (connection.execute(select(func.max(event_table.c.id))).scalar() or 0) + 1
+    event_ids = range(first_id, first_id + len(rows))
+    for event_id, row in zip(event_ids, rows):
+        row["id"] = event_id
+        row["version"] = change.id
+
+    connection.execute(event_table.insert(), rows)
+    connection.execute(EventParticipant.__table__.insert(), [
+        {
+            "event_id": row["id"], "username": username,
+            "start_date": row["start_date"], "end_date": row["end_date"], "series_end": row["series_end"]
+        }
+        for row, usernames in zip(rows, participants)
+        for username in usernames
+    ])
+    session.commit()
+    return change.id
+
+
+def import_events(stream: IO[bytes], file_format: str, owner: str, generate_meet_link) -> dict:
+    """Folyamatos beolvasás, kötegelt beszúrás és soronkénti hibajelentés"""
+    text_stream = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    parsed = ical.iter_events(text_stream) if file_format == "ics" else iter_csv(text_stream)
+
+    imported = 0
+    errors = []
+    audience = {owner}
+    public = False
+    version = None
+    rows, row_participants = [], []
+
+    with Session(engine) as session:
+        for number, data, error in parsed:
+            row = None
+            if not error:
+                row, participants, error = prepare_row(data, owner, generate_meet_link)
+            if error:
+                errors.append({"row": number, "error": error})
+                continue
+
+            rows.append(row)
+            row_participants.append(participants)
+            audience.update(participants)
+            public = public or row["is_public"]
+
+            if len(rows) >= IMPORT_BATCH_SIZE:
+                version = flush_batch(session, rows, row_participants)
+                imported += len(rows)
+                rows, row_participants = [], []
+
+        if rows:
+            version = flush_batch(session, rows, row_participants)
+            imported += len(rows)
+
+    return {
+        "imported": imported,
+        "failed": len(errors),
+        "errors": errors,
+        "version": version,
+        "audience": audience,
+        "public": public,
+    }
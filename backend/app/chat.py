@@ -1,12 +1,20 @@
-from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import Session, select
+import asyncio
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, WebSocket, status
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from google.genai import types
-from .database import get_session
-from .models import ChatMessage, User
-from .schemas import ChatRequest
-from .dependencies import get_current_user
+from .database import async_engine, get_session
+from .models import ChatMessage, ChatArchiveEntry, User
+from .schemas import ChatRequest, SupportRequest
+from .dependencies import get_current_user, get_user_from_token
 from .ai_client import client
 from .utils import log_security_event
+from .chat_archive import read_archived_messages
+from .helpdesk import (
+    add_message, commit_messages, get_summary, mark_read, support_queue, wait_for_messages, serve_chat_socket
+)
+from .config import CHAT_LONG_POLL_MAX
 
 router = APIRouter(tags=["Chat & Helpdesk"])
 
@@ -52,48 +60,36 @@ FONTOS SZABÁLYOK:
 @router.post("/chat/send")
 async def send_chat_message(
     chat_req: ChatRequest,
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_session)
 ):
     """Chat üzenet küldése"""
-    # Ellenőrizzük az előző üzenetet
-    last_msg = session.exec(
-        select(ChatMessage)
-        .where(ChatMessage.session_id == chat_req.session_id)
-        .order_by(ChatMessage.timestamp.desc())
-    ).first()
+    # Ellenőrizzük az előző üzenetet (az összesítő sorból, elsődleges kulcs alapján)
+    summary = await get_summary(session, chat_req.session_id)
     
     is_human_mode = False
-    if last_msg:
-        if last_msg.needs_human:
+    if summary:
+        if summary.needs_human:
             is_human_mode = True
-        if last_msg.sender == "admin":
+        if summary.last_sender == "admin":
             is_human_mode = True
     
-    user_msg = ChatMessage(
-        session_id=chat_req.session_id,
-        sender="user",
-        message=chat_req.message,
-        needs_human=is_human_mode
-    )
-    
     if "ember" in chat_req.message.lower() or "help" in chat_req.message.lower():
         log_security_event(f"HELPDESK ATKAPCSOLÁS KERVE - Session: {chat_req.session_id}")
-        user_msg.needs_human = True
-        session.add(user_msg)
-        session.commit()
+        user_msg = await add_message(session, chat_req.session_id, "user", chat_req.message, needs_human=True)
+        await commit_messages(session, user_msg)
         
-        system_msg = ChatMessage(
-            session_id=chat_req.session_id,
-            sender="bot",
-            message="Átkapcsollak egy kollégához. Kérlek várj...",
+        system_msg = await add_message(
+            session,
+            chat_req.session_id,
+            "bot",
+            "Átkapcsollak egy kollégához. Kérlek várj...",
             needs_human=True
         )
-        session.add(system_msg)
-        session.commit()
+        await commit_messages(session, system_msg)
         return {"status": "human_transfer_initiated"}
     
-    session.add(user_msg)
-    session.commit()
+    user_msg = await add_message(session, chat_req.session_id, "user", chat_req.message, needs_human=is_human_mode)
+    await commit_messages(session, user_msg)
     
     if is_human_mode:
         return {"status": "waiting_for_admin"}
@@ -101,12 +97,12 @@ async def send_chat_message(
     # AI LOGIKA
     try:
         # 1. Előzmények betöltése
-        history_msgs = session.exec(
+        history_msgs = (await session.exec(
             select(ChatMessage)
             .where(ChatMessage.session_id == chat_req.session_id)
             .where(ChatMessage.id != user_msg.id) 
             .order_by(ChatMessage.timestamp)
-        ).all()
+        )).all()
 
         # 2. Előzmények formázása a Gemini számára (LISTA ÉPÍTÉS)
         formatted_history = []
@@ -134,90 +130,91 @@ async def send_chat_message(
         ai_reply_text = "Bocsánat, egy kis technikai hiba történt az AI kapcsolatban."
 
     
-    bot_reply = ChatMessage(
-        session_id=chat_req.session_id,
-        sender="bot",
-        message=ai_reply_text,
-        needs_human=False
-    )
-    session.add(bot_reply)
-    session.commit()
+    bot_reply = await add_message(session, chat_req.session_id, "bot", ai_reply_text, needs_human=False)
+    await commit_messages(session, bot_reply)
     
     return {"status": "bot_replied", "reply": ai_reply_text}
 
 
+def history_query(session_id: str, after_id: Optional[int]):
+    """A beszélgetés üzenetei; after_id esetén csak az annál újabbak, azonosító szerint"""
+    statement = select(ChatMessage).where(ChatMessage.session_id == session_id)
+    if after_id is not None:
+        return statement.where(ChatMessage.id > after_id).order_by(ChatMessage.id)
+    return statement.order_by(ChatMessage.timestamp)
+
+
 @router.get("/chat/history/{session_id}")
 async def get_chat_history(
     session_id: str,
-    session: Session = Depends(get_session)
+    after_id: Optional[int] = None,
+    wait: float = Query(0, ge=0, le=CHAT_LONG_POLL_MAX),
+    session: AsyncSession = Depends(get_session)
 ):
-    messages = session.exec(
-        select(ChatMessage)
-        .where(ChatMessage.session_id == session_id)
-        .order_by(ChatMessage.timestamp)
-    ).all()
-    return messages
+    """Chat előzmények; after_id: csak az újabb üzenetek, wait > 0: long-poll, amíg új üzenet nem érkezik"""
+    async def fetch():
+        return (await session.exec(history_query(session_id, after_id))).all()
+
+    return await wait_for_messages(session, session_id, wait, fetch)
 
 
-@router.get("/admin/support-requests")
+@router.get("/admin/support-requests", response_model=List[SupportRequest])
 async def get_support_requests(
-    session: Session = Depends(get_session),
+    response: Response,
+    limit: int = Query(50, ge=1, le=200),
+    cursor: Optional[str] = None,
+    needs_human: Optional[bool] = None,
+    session: AsyncSession = Depends(get_session),
     current_user: User = Depends(get_current_user)
 ):
+    """Support sor az összesítő táblából: előbb az emberre várók, lapozva (X-Next-Cursor)"""
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Csak adminoknak!")
     
-    all_msgs = session.exec(
-        select(ChatMessage).order_by(ChatMessage.timestamp.desc())
-    ).all()
-    
-    session_status = {}
-    for msg in all_msgs:
-        if msg.session_id not in session_status:
-            session_status[msg.session_id] = msg.needs_human
-    
-    result_list = [
-        {"session_id": sid, "needs_human": status}
-        for sid, status in session_status.items()
-    ]
-    
-    return result_list
+    return await support_queue(session, limit, cursor, needs_human, response)
 
 
 @router.get("/admin/chat/{target_session_id}")
 async def get_user_chat_admin(
     target_session_id: str,
-    session: Session = Depends(get_session),
+    after_id: Optional[int] = None,
+    wait: float = Query(0, ge=0, le=CHAT_LONG_POLL_MAX),
+    session: AsyncSession = Depends(get_session),
     current_user: User = Depends(get_current_user)
 ):
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Csak adminoknak!")
     
-    messages = session.exec(
-        select(ChatMessage)
-        .where(ChatMessage.session_id == target_session_id)
-        .order_by(ChatMessage.timestamp)
-    ).all()
+    async def fetch():
+        # Az archivált (régi, lezárt) részek a szegmensfájlokból, utánuk a még aktív üzenetek
+        statement = select(ChatArchiveEntry).where(ChatArchiveEntry.session_id == target_session_id)
+        if after_id is not None:
+            statement = statement.where(ChatArchiveEntry.last_id > after_id)
+        entries = (await session.exec(statement.order_by(ChatArchiveEntry.id))).all()
+        archived = await asyncio.to_thread(read_archived_messages, entries) if entries else []
+        if after_id is not None:
+            archived = [m for m in archived if m.id > after_id]
+
+        messages = (await session.exec(history_query(target_session_id, after_id))).all()
+        return archived + list(messages)
+
+    messages = await wait_for_messages(session, target_session_id, wait, fetch)
+    if messages:
+        await mark_read(session, target_session_id)
     return messages
 
 
 @router.post("/admin/reply")
 async def admin_reply(
     reply_data: dict,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_session),
     current_user: User = Depends(get_current_user)
 ):
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Csak adminoknak!")
     
-    admin_msg = ChatMessage(
-        session_id=reply_data["target_session_id"],
-        sender="admin",
-        message=reply_data["message"],
-        needs_human=True
-    )
-    session.add(admin_msg)
-    session.commit()
+    admin_msg = await add_message(session, reply_data["target_session_id"], "admin", reply_data["message"], needs_human=True)
+    await commit_messages(session, admin_msg)
     
     return {"status": "sent"}
 
@@ -225,19 +222,44 @@ async def admin_reply(
 @router.post("/admin/resolve")
 async def resolve_chat(
     data: dict,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_session),
     current_user: User = Depends(get_current_user)
 ):
     if current_user.role != "admin":
         raise HTTPException(status_code=403, detail="Csak adminoknak!")
     
-    resolve_msg = ChatMessage(
-        session_id=data["target_session_id"],
-        sender="system",
-        message="A beszélgetést az adminisztrátor lezárta. Visszatérés AI módba.",
+    resolve_msg = await add_message(
+        session,
+        data["target_session_id"],
+        "system",
+        "A beszélgetést az adminisztrátor lezárta. Visszatérés AI módba.",
         needs_human=False
     )
-    session.add(resolve_msg)
-    session.commit()
+    await commit_messages(session, resolve_msg)
     
     return {"status": "resolved"}
+
+
+@router.websocket("/ws/chat/{session_id}")
+async def chat_socket(websocket: WebSocket, session_id: str, after_id: Optional[int] = None):
+    """Helpdesk widget socket: az új üzenetek azonnal; újracsatlakozáskor after_id-tól folytatja"""
+    await websocket.accept()
+    await serve_chat_socket(websocket, session_id, after_id)
+
+
+@router.websocket("/ws/admin/chat")
+async def admin_chat_socket(websocket: WebSocket, token: str, after_id: Optional[int] = None):
+    """Admin multiplex socket: minden beszélgetés új üzenetei (böngészős WebSocket nem küld fejlécet, ezért query tokennel)"""
+    # Rövid életű session: a hosszan nyitott kapcsolat nem foglalhat helyet a kapcsolatkészletben
+    try:
+        async with AsyncSession(async_engine) as session:
+            current_user = await get_user_from_token(token, session)
+    except HTTPException:
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+    if current_user.role != "admin":
+        await websocket.close(code=status.WS_1008_POLICY_VIOLATION)
+        return
+
+    await websocket.accept()
+    await serve_chat_socket(websocket, None, after_id)
@@ -0,0 +1,204 @@
+import asyncio, datetime, gzip, json, os, threading
+from typing import List, Tuple
+from sqlalchemy import bindparam
+from sqlmodel import Session, select, delete, insert, update
+from .database import engine
+from .models import ChatMessage, ChatArchiveEntry, ChatSession
+from .helpdesk import STATUS_RESOLVED
+from .config import (
+    CHAT_RETENTION_DAYS,
+    CHAT_ARCHIVE_DIR,
+    CHAT_ARCHIVE_BATCH,
+    CHAT_ARCHIVE_SEGMENT_BYTES,
+    CHAT_ARCHIVE_INTERVAL
+)
+
+SEGMENT_PREFIX = "chat-"
+SEGMENT_SUFFIX = ".jsonl.gz"
+DELETE_CHUNK_SIZE = 500
+
+_append_lock = threading.Lock()
+
+
+def segment_path(name: str) -> str:
+    return os.path.join(CHAT_ARCHIVE_DIR, name)
+
+
+def current_segment() -> str:
+    """Az utolsó szegmensfájl neve; ha betelt (vagy még nincs), a következő sorszámú"""
+    os.makedirs(CHAT_ARCHIVE_DIR, exist_ok=True)
+    names = sorted(n for n in os.listdir(CHAT_ARCHIVE_DIR) if n.startswith(SEGMENT_PREFIX) and n.endswith(SEGMENT_SUFFIX))
+    if names and os.path.getsize(segment_path(names[-1])) < CHAT_ARCHIVE_SEGMENT_BYTES:
+        return names[-1]
+    number = int(names[-1][len(SEGMENT_PREFIX):-len(SEGMENT_SUFFIX)]) + 1 if names else 1
+    return f"{SEGMENT_PREFIX}{number:06d}{SEGMENT_SUFFIX}"
+
+
+ARCHIVE_COLUMNS = (
+    ChatMessage.id,
+    ChatMessage.session_id,
+    ChatMessage.sender,
+    ChatMessage.message,
+    ChatMessage.timestamp,
+    ChatMessage.needs_human,
+)
+
+
+def message_to_json(message) -> dict:
+    return {
+        "id": message.id,
+        "session_id": message.session_id,
+        "sender": message.sender,
+        "message": message.message,
+        "timestamp": message.timestamp.isoformat(),
+        "needs_human": message.needs_human,
+    }
+
+
+def append_members(members: List[bytes]) -> Tuple[str, List[int]]:
+    """
+    Gzip tagok hozzáfűzése az aktuális szegmenshez (csak hozzáfűzés, fsync-kel): (szegmens, kezdő offsetek).
+    Az összefűzött gzip tagok együtt is érvényes gzip fájlt adnak, de offsetről egyenként is olvashatók.
+    """
+    with _append_lock:
+        name = current_segment()
+        fd = os.open(segment_path(name), os.O_WRONLY | os.O_CREAT | os.O_APPEND, 0o600)
+        try:
+            start = os.lseek(fd, 0, os.SEEK_END)
+            data = b"".join(members)
+            written = 0
+            while written < len(data):
+                written += os.write(fd, data[written:])
+            os.fsync(fd)
+        finally:
+            os.close(fd)
+
+    offsets = []
+    for member in members:
+        offsets.append(start)
+        start += len(member)
+    return name, offsets
+
+
+def find_archivable_sessions(cutoff: datetime.datetime) -> List[Tuple[str, int]]:
+    """
+    Az admin által lezárt, cutoff óta inaktív és még nem archivált beszélgetések: (session_id, utolsó üzenet id) -
+    az összesítő tábla ix_chatsession_queue indexén, írási zár nélkül. Az AI módban lévő beszélgetés még élő,
+    a felhasználó bármikor folytathatja, ezért nem kerül archívumba.
+    """
+    with Session(engine) as session:
+        return session.execute(
+            select(ChatSession.session_id, ChatSession.last_message_id).where(
+                ChatSession.needs_human == False,
+                ChatSession.status == STATUS_RESOLVED,
+                ChatSession.last_message_at < cutoff,
+                ChatSession.last_message_id > ChatSession.archived_through_id
+            )
+        ).all()
+
+
+def mark_archived(session: Session, last_ids: dict):
+    """Az összesítő sorokban az archivált határ rögzítése, hogy a beszélgetés ne legyen újra jelölt"""
+    table = ChatSession.__table__
+    session.connection().execute(
+        update(table).where(table.c.session_id == bindparam("sid")).values(archived_through_id=bindparam("last_id")),
+        [{"sid": sid, "last_id": last_id} for sid, last_id in last_ids.items()]
+    )
+
+
+def archive_batch(candidates: List[Tuple[str, int]]) -> int:
+    """
+    Egy köteg beszélgetés archiválása; az archivált üzenetek számát adja vissza.
+    Sorrend: olvasás (zár nélkül) -> szegmensfájl írása -> egy rövid írási tranzakció (index + törlés).
+    Ha a tranzakció előtt leáll a folyamat, csak hivatkozatlan bájtok maradnak a szegmensben.
+    """
+    last_ids = dict(candidates)
+    with Session(engine) as session:
+        messages = session.execute(
+            select(*ARCHIVE_COLUMNS)
+            .where(ChatMessage.session_id.in_(last_ids))
+            .order_by(ChatMessage.session_id, ChatMessage.id)
+        ).all()
+        session.rollback()  # az olvasási pillanatkép elengedése a fájlírás idejére
+
+        transcripts = {}
+        for message in messages:
+            if message.id <= last_ids[message.session_id]:
+                transcripts.setdefault(message.session_id, []).append(message)
+        if not transcripts:
+            mark_archived(session, last_ids)
+            session.commit()
+            return 0
+
+        session_ids = list(transcripts)
+        members = [
+            gzip.compress("".join(
+                json.dumps(message_to_json(m), ensure_ascii=False) + "\n" for m in transcripts[sid]
+            ).encode(), compresslevel=6)
+            for sid in session_ids
+        ]
+        segment, offsets = append_members(members)
+
+        ids = [m.id for sid in session_ids for m in transcripts[sid]]
+        removed = 0
+        for i in range(0, len(ids), DELETE_CHUNK_SIZE):
+            chunk = ids[i:i + DELETE_CHUNK_SIZE]
+            removed += session.execute(delete(ChatMessage).where(ChatMessage.id.in_(chunk))).rowcount
+        if removed != len(ids):
+            # Közben egy másik worker archiválta: a szegmensben maradt másolatra nem hivatkozunk
+            session.rollback()
+            return 0
+
+        mark_archived(session, last_ids)
+        now = datetime.datetime.utcnow()
+        session.execute(insert(ChatArchiveEntry), [
+            {
+                "session_id": sid,
+                "segment": segment,
+                "offset": offset,
+                "length": len(member),
+                "message_count": len(transcripts[sid]),
+                "first_id": transcripts[sid][0].id,
+                "last_id": transcripts[sid][-1].id,
+                "archived_at": now,
+            }
+            for sid, offset, member in zip(session_ids, offsets, members)
+        ])
+        session.commit()
+        return len(ids)
+
+
+def archive_chats(retention_days: int = CHAT_RETENTION_DAYS) -> int:
+    """A megőrzési időn túli lezárt beszélgetések áthelyezése a tömörített archívumba, kötegenként"""
+    cutoff = datetime.datetime.utcnow() - datetime.timedelta(days=retention_days)
+    candidates = find_archivable_sessions(cutoff)
+    total = 0
+    for i in range(0, len(candidates), CHAT_ARCHIVE_BATCH):
+        total += archive_batch(candidates[i:i + CHAT_ARCHIVE_BATCH])
+    return total
+
+
+def read_archived_messages(entries: List[ChatArchiveEntry]) -> List[ChatMessage]:
+    """Archivált üzenetek visszaolvasása az offset-index alapján (egy gzip tag bejegyzésenként)"""
+    messages = []
+    for entry in entries:
+        with open(segment_path(entry.segment), "rb") as segment:
+            segment.seek(entry.offset)
+            member = segment.read(entry.length)
+        for line in gzip.decompress(member).decode().split("\n")[:-1]:
+            data = json.loads(line)
+            data["timestamp"] = datetime.datetime.fromisoformat(data["timestamp"])
+            messages.append(ChatMessage(**data))
+    return messages
+
+
+async def chat_archiver():
+    """Háttér-feladat: a régi, lezárt beszélgetések időszakos archiválása"""
+    while True:
+        try:
+            archived = await asyncio.to_thread(archive_chats)
+            if archived:
+                print(f"Chat üzenetek archiválva: {archived}")
+        except Exception as e:
+            print(f"Chat archiválás hiba: {e}")
+        await asyncio.sleep(CHAT_ARCHIVE_INTERVAL)
@@ -14,6 +14,64 @@ ALGORITHM = "HS256"
 # Adatbázis konfiguráció
 DATABASE_FILE = "database.db"
 DATABASE_URL = f"sqlite:///{DATABASE_FILE}"
+ASYNC_DATABASE_URL = f"sqlite+aiosqlite:///{DATABASE_FILE}"
+
+# SQLite hangolás: kapcsolatkészlet mérete, zárolásnál várakozás (ms), memóriába leképezett I/O (bájt)
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", 8))
+DB_MAX_OVERFLOW = int(os.getenv("DB_MAX_OVERFLOW", 8))
+DB_BUSY_TIMEOUT_MS = int(os.getenv("DB_BUSY_TIMEOUT_MS", 5000))
+DB_MMAP_SIZE = int(os.getenv("DB_MMAP_SIZE", 256 * 1024 * 1024))
+
+# Leírás-visszafejtés gyorsítótár és párhuzamosítás
+DECRYPT_CACHE_MAX_BYTES = int(os.getenv("DECRYPT_CACHE_MAX_BYTES", 32 * 1024 * 1024))
+DECRYPT_WORKERS = int(os.getenv("DECRYPT_WORKERS", min(8, os.cpu_count() or 1)))
+DECRYPT_BATCH_THRESHOLD = int(os.getenv("DECRYPT_BATCH_THRESHOLD", 256))
+
+# Jelszó-hashelés (bcrypt) szálkészlet: egyidejű műveletek és a várakozási sor korlátja
+HASH_WORKERS = int(os.getenv("HASH_WORKERS", min(4, os.cpu_count() or 1)))
+HASH_QUEUE_LIMIT = int(os.getenv("HASH_QUEUE_LIMIT", 64))
+
+# Tömeges felhasználó-felvétel: bcrypt processzkészlet mérete (alapból minden mag)
+PROVISION_WORKERS = int(os.getenv("PROVISION_WORKERS", os.cpu_count() or 1))
+
+# Tokenek: rövid életű access token + forgó refresh token, jelszó-visszaállító kód, lejárt rekordok söprése
+ACCESS_TOKEN_MINUTES = int(os.getenv("ACCESS_TOKEN_MINUTES", 15))
+REFRESH_TOKEN_DAYS = int(os.getenv("REFRESH_TOKEN_DAYS", 14))
+SESSION_SWEEP_INTERVAL = float(os.getenv("SESSION_SWEEP_INTERVAL", 3600))
+RESET_TOKEN_MINUTES = int(os.getenv("RESET_TOKEN_MINUTES", 30))
+# Naptár-feed token: külső kliensek nem frissítenek, ezért hosszú lejárat; a tárolt titok cseréje azonnal visszavonja
+FEED_TOKEN_DAYS = int(os.getenv("FEED_TOKEN_DAYS", 365))
+
+# Ismétlődő események: a COUNT legnagyobb értéke, és az UNTIL legfeljebb ennyi évvel a kezdés után
+RECURRENCE_MAX_COUNT = int(os.getenv("RECURRENCE_MAX_COUNT", 10000))
+RECURRENCE_MAX_YEARS = int(os.getenv("RECURRENCE_MAX_YEARS", 100))
+
+# Chat megőrzés: a lezárt beszélgetések ennyi nap inaktivitás után tömörített szegmensfájlokba kerülnek
+CHAT_RETENTION_DAYS = int(os.getenv("CHAT_RETENTION_DAYS", 30))
+CHAT_ARCHIVE_DIR = os.getenv("CHAT_ARCHIVE_DIR", "chat_archive")
+CHAT_ARCHIVE_BATCH = int(os.getenv("CHAT_ARCHIVE_BATCH", 200))
+CHAT_ARCHIVE_SEGMENT_BYTES = int(os.getenv("CHAT_ARCHIVE_SEGMENT_BYTES", 64 * 1024 * 1024))
+CHAT_ARCHIVE_INTERVAL = float(os.getenv("CHAT_ARCHIVE_INTERVAL", 3600))
+
+# Chat előzmények long-poll: egy kérés legfeljebb ennyi másodpercig vár új üzenetre
+CHAT_LONG_POLL_MAX = float(os.getenv("CHAT_LONG_POLL_MAX", 30))
+
+# Helpdesk WebSocket: szívverés (mp), socketenkénti várakozási sor, küldési időkorlát, pótlás oldalmérete
+CHAT_WS_HEARTBEAT = float(os.getenv("CHAT_WS_HEARTBEAT", 25))
+CHAT_WS_QUEUE = int(os.getenv("CHAT_WS_QUEUE", 100))
+CHAT_WS_SEND_TIMEOUT = float(os.getenv("CHAT_WS_SEND_TIMEOUT", 10))
+CHAT_WS_CATCHUP_LIMIT = int(os.getenv("CHAT_WS_CATCHUP_LIMIT", 500))
+
+# Bejelentkezett felhasználók gyorsítótára (get_current_user)
+USER_CACHE_TTL = float(os.getenv("USER_CACHE_TTL", 60))
+USER_CACHE_SIZE = int(os.getenv("USER_CACHE_SIZE", 10000))
+
+# Rate limit tároló: "sqlite:///..." (workerek között közös) vagy "memory://" (workerenként külön)
+RATE_LIMIT_STORAGE = os.getenv("RATE_LIMIT_STORAGE", "sqlite:///ratelimit.db")
+
+# Pub/sub backend: "local" (egy worker) vagy "sqlite" (több worker közös fájllal)
+PUBSUB_BACKEND = os.getenv("PUBSUB_BACKEND", "local")
+PUBSUB_DATABASE = os.getenv("PUBSUB_DATABASE", "pubsub.db")
 
 # CORS beállítások
 ALLOWED_ORIGINS = ["http://localhost:3000"]
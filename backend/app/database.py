@@ -1,9 +1,45 @@
-from sqlmodel import Session, create_engine
-from .config import DATABASE_URL
+from sqlalchemy import event
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel import create_engine
+from sqlmodel.ext.asyncio.session import AsyncSession
+from .config import (
+    DATABASE_URL,
+    ASYNC_DATABASE_URL,
+    DB_POOL_SIZE,
+    DB_MAX_OVERFLOW,
+    DB_BUSY_TIMEOUT_MS,
+    DB_MMAP_SIZE
+)
 
-engine = create_engine(DATABASE_URL)
+def configure_sqlite(dbapi_connection, connection_record):
+    """Kapcsolatonkénti beállítások: WAL (olvasók nem blokkolják az írót), várakozás zárolásnál, mmap"""
+    cursor = dbapi_connection.cursor()
+    cursor.execute("PRAGMA journal_mode=WAL")
+    cursor.execute("PRAGMA synchronous=NORMAL")
+    cursor.execute(f"PRAGMA busy_timeout={DB_BUSY_TIMEOUT_MS}")
+    cursor.execute(f"PRAGMA mmap_size={DB_MMAP_SIZE}")
+    cursor.execute("PRAGMA temp_store=MEMORY")
+    cursor.close()
 
-def get_session():
-    """Adatbázis session dependency"""
-    with Session(engine) as session:
+# Szinkron engine: induláskori migrációk, háttér-feladatok és a szálban futó tömeges műveletek
+engine = create_engine(
+    DATABASE_URL,
+    connect_args={"check_same_thread": False},
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW
+)
+
+# Aszinkron engine (aiosqlite) a kéréskezelőkhöz - a lekérdezés nem blokkolja az eseményhurkot
+async_engine = create_async_engine(
+    ASYNC_DATABASE_URL,
+    pool_size=DB_POOL_SIZE,
+    max_overflow=DB_MAX_OVERFLOW
+)
+
+event.listen(engine, "connect", configure_sqlite)
+event.listen(async_engine.sync_engine, "connect", configure_sqlite)
+
+async def get_session():
+    """Aszinkron adatbázis session dependency (commit után az objektumok nem járnak le, nincs rejtett lekérdezés)"""
+    async with AsyncSession(async_engine, expire_on_commit=False) as session:
         yield session
@@ -1,13 +1,27 @@
-import jwt
-from typing import Optional
+import jwt, asyncio, hmac, threading, time
+from collections import OrderedDict, deque
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional
 from fastapi import Depends, HTTPException, status
 from fastapi.security import OAuth2PasswordBearer
 from passlib.context import CryptContext
-from sqlmodel import Session, select
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from .database import get_session
 from .models import User
+from .pubsub import hub
+from .sessions import revoked_sessions, hash_token
 from datetime import datetime, timedelta
-from .config import SECRET_KEY, ALGORITHM
+from .config import (
+    SECRET_KEY,
+    ALGORITHM,
+    ACCESS_TOKEN_MINUTES,
+    FEED_TOKEN_DAYS,
+    HASH_WORKERS,
+    HASH_QUEUE_LIMIT,
+    USER_CACHE_TTL,
+    USER_CACHE_SIZE
+)
 
 # Jelszó hash
 pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
@@ -16,14 +30,19 @@ pwd_context = CryptContext(schemes=["bcrypt"], deprecated="auto")
 oauth2_scheme = OAuth2PasswordBearer(tokenUrl="token")
 
 def create_access_token(data: dict):
-    """Új JWT token generálása lejárattal"""
+    """Új, rövid életű JWT token generálása (a sid a munkamenet-család, visszavonáshoz)"""
     to_encode = data.copy()
-    expire = datetime.utcnow() + timedelta(minutes=60)
+    expire = datetime.utcnow() + timedelta(minutes=ACCESS_TOKEN_MINUTES)
     to_encode.update({"exp": expire})
     
     encoded_jwt = jwt.encode(to_encode, SECRET_KEY, algorithm=ALGORITHM)
     return encoded_jwt
 
+def create_feed_token(username: str, secret: str) -> str:
+    """Csak naptár-feed olvasásra jogosító, hosszú lejáratú token (a titok lenyomata a felhasználónál, cserélhető)"""
+    expire = datetime.utcnow() + timedelta(days=FEED_TOKEN_DAYS)
+    return jwt.encode({"sub": username, "scope": "feed", "fsec": secret, "exp": expire}, SECRET_KEY, algorithm=ALGORITHM)
+
 def get_password_hash(password: str) -> str:
     """Jelszó hashelése"""
     return pwd_context.hash(password)
@@ -32,29 +51,195 @@ def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Jelszó ellenőrzése"""
     return pwd_context.verify(plain_password, hashed_password)
 
+class HashPool:
+    """Korlátos szálkészlet a bcrypt műveletekhez - az eseményhurok nem blokkol, a torlódás mérhető"""
+
+    def __init__(self, workers: int, queue_limit: int):
+        self.workers = workers
+        self.queue_limit = queue_limit
+        self.executor = ThreadPoolExecutor(max_workers=workers, thread_name_prefix="bcrypt")
+        self.pending = 0
+        self.active = 0
+        self.completed = 0
+        self.rejected = 0
+        self.wait_times: deque = deque(maxlen=1000)
+        self._lock = threading.Lock()
+
+    async def run(self, func, *args):
+        """Művelet futtatása a készletben; telített sornál 503"""
+        if self.pending >= self.workers + self.queue_limit:
+            self.rejected += 1
+            raise HTTPException(status_code=503, detail="A szerver túlterhelt, próbáld újra később")
+
+        self.pending += 1
+        submitted = time.perf_counter()
+
+        def task():
+            with self._lock:
+                self.active += 1
+                self.wait_times.append(time.perf_counter() - submitted)
+            try:
+                return func(*args)
+            finally:
+                with self._lock:
+                    self.active -= 1
+
+        try:
+            return await asyncio.get_running_loop().run_in_executor(self.executor, task)
+        finally:
+            self.pending -= 1
+            self.completed += 1
+
+    def stats(self) -> dict:
+        with self._lock:
+            waits = sorted(self.wait_times)
+            active = self.active
+
+        def percentile(p: float) -> float:
+            return waits[min(len(waits) - 1, int(len(waits) * p))] * 1000 if waits else 0.0
+
+        return {
+            "workers": self.workers,
+            "queue_limit": self.queue_limit,
+            "active": active,
+            "queued": max(0, self.pending - active),
+            "completed": self.completed,
+            "rejected": self.rejected,
+            "wait_ms_p50": percentile(0.50),
+            "wait_ms_p99": percentile(0.99),
+        }
+
+
+hash_pool = HashPool(HASH_WORKERS, HASH_QUEUE_LIMIT)
+
+async def hash_password_async(password: str) -> str:
+    """Jelszó hashelése a bcrypt szálkészletben"""
+    return await hash_pool.run(get_password_hash, password)
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """Jelszó ellenőrzése a bcrypt szálkészletben"""
+    return await hash_pool.run(verify_password, plain_password, hashed_password)
+
+class UserCache:
+    """TTL + LRU gyorsítótár a felhasználói rekordokhoz (kulcs: a token sub mezője)"""
+
+    def __init__(self, ttl: float, max_entries: int):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._items: "OrderedDict[str, tuple]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, username: str) -> Optional[User]:
+        """Session-független másolat, így a kérés nyugodtan módosíthatja"""
+        with self._lock:
+            item = self._items.get(username)
+            if item is None or item[0] < time.monotonic():
+                if item is not None:
+                    del self._items[username]
+                self.misses += 1
+                return None
+            self._items.move_to_end(username)
+            self.hits += 1
+            return item[1].model_copy()
+
+    def put(self, user: User):
+        snapshot = User.model_validate(user)
+        with self._lock:
+            self._items[user.username] = (time.monotonic() + self.ttl, snapshot)
+            self._items.move_to_end(user.username)
+            while len(self._items) > self.max_entries:
+                self._items.popitem(last=False)
+
+    def invalidate(self, username: str):
+        with self._lock:
+            self._items.pop(username, None)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._items),
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0,
+        }
+
+
+user_cache = UserCache(USER_CACHE_TTL, USER_CACHE_SIZE)
+
+USER_INVALIDATION_TOPIC = "users:invalidate"
+
+def invalidate_user(username: str):
+    """Felhasználó kiürítése a gyorsítótárból (commit után hívandó) - a hubon át a többi workerben is"""
+    user_cache.invalidate(username)
+    hub.publish([USER_INVALIDATION_TOPIC], {"type": "user_invalidate", "username": username})
+
+async def listen_user_invalidations():
+    """Háttér-feladat: más workerek érvénytelenítéseinek alkalmazása"""
+    subscription = hub.subscribe([USER_INVALIDATION_TOPIC], maxsize=1000)
+    try:
+        while True:
+            try:
+                message = await subscription.get(timeout=60)
+            except asyncio.TimeoutError:
+                continue
+            if message.get("type") == "resync":
+                user_cache.clear()
+            else:
+                user_cache.invalidate(message["username"])
+    finally:
+        hub.unsubscribe(subscription)
+
 async def get_current_user(
     token: str = Depends(oauth2_scheme),
-    session: Session = Depends(get_session)
+    session: AsyncSession = Depends(get_session)
 ) -> User:
     """Token dekódolása és felhasználó azonosítása"""
+    return await get_user_from_token(token, session)
+
+async def get_user_from_token(token: str, session: AsyncSession, scopes: tuple = ("access",)) -> User:
+    """Felhasználó azonosítása nyers tokenből (pl. query paraméterből érkező SSE kapcsolatnál)"""
     try:
         payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
         username: str = payload.get("sub")
         if username is None:
             raise HTTPException(status_code=401, detail="Érvénytelen token (hiányzó sub)")
+        if payload.get("scope", "access") not in scopes:
+            raise HTTPException(status_code=401, detail="A token ehhez a művelethez nem használható")
+        if payload.get("sid") in revoked_sessions:
+            raise HTTPException(status_code=401, detail="A munkamenet visszavonva, jelentkezz be újra!")
     except jwt.ExpiredSignatureError:
         raise HTTPException(status_code=401, detail="A munkamenet lejárt, jelentkezz be újra!")
     except jwt.PyJWTError:
         raise HTTPException(status_code=401, detail="Érvénytelen token")
         
-    user = session.exec(select(User).where(User.username == username)).first()
-    if not user:
-        raise HTTPException(status_code=401, detail="Felhasználó nem található")
+    user = user_cache.get(username)
+    if user is None:
+        user = (await session.exec(select(User).where(User.username == username))).first()
+        if not user:
+            raise HTTPException(status_code=401, detail="Felhasználó nem található")
+        user_cache.put(user)
+
+    # Feed tokennél a titoknak a felhasználónál tárolt (legutóbb kiadott) lenyomathoz kell illeszkednie
+    if payload.get("scope") == "feed":
+        secret = payload.get("fsec")
+        if not secret or not user.feed_secret_hash or not hmac.compare_digest(hash_token(secret), user.feed_secret_hash):
+            raise HTTPException(status_code=401, detail="A feed token visszavonva, kérj újat!")
     return user
 
-def add_owner_to_participants(owner: str, participants_str: Optional[str]) -> str:
+def split_participants(participants_str: Optional[str]) -> List[str]:
+    """Vesszővel elválasztott résztvevő lista felbontása (ismétlődések nélkül)"""
+    parts = (p.strip() for p in (participants_str or "").split(","))
+    return list(dict.fromkeys(p for p in parts if p))
+
+def add_owner_to_participants(owner: str, participants_str: Optional[str]) -> List[str]:
     """Tulajdonos hozzáadása a résztvevőkhöz"""
-    parts = [p.strip() for p in (participants_str or "").split(",") if p.strip()]
+    parts = split_participants(participants_str)
     if owner not in parts:
         parts.insert(0, owner)
-    return ", ".join(parts)
+    return parts
@@ -1,14 +1,42 @@
-import bleach, random, string
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException
-from sqlmodel import Session, select
-from .database import get_session
-from .models import Event, User
-from .dependencies import get_current_user, add_owner_to_participants
-from .utils import encrypt_text, decrypt_text, log_security_event
+import bleach, random, secrets, string, base64, datetime, functools, json, asyncio
+from email.utils import format_datetime, parsedate_to_datetime
+from bisect import bisect_left
+from typing import Any, Dict, List, NamedTuple, Optional, Set, Union
+from fastapi import APIRouter, Depends, HTTPException, Query, Request, Response, UploadFile, File
+from fastapi.concurrency import run_in_threadpool
+from fastapi.responses import StreamingResponse
+from sqlmodel import Session, select, delete, insert, update, func, or_, and_, case, literal, String
+from sqlalchemy import DateTime, bindparam, null, union_all
+from sqlmodel.ext.asyncio.session import AsyncSession
+from .database import engine, async_engine, get_session
+from .models import Event, EventChange, EventParticipant, EventWaitlist, User
+from .dependencies import (
+    get_current_user,
+    get_user_from_token,
+    create_feed_token,
+    invalidate_user,
+    add_owner_to_participants,
+    split_participants
+)
+from .pubsub import hub
+from .sessions import hash_token
+from .bulk_import import import_events
+from . import ical, recurrence, scheduling
+from .config import RECURRENCE_MAX_COUNT, RECURRENCE_MAX_YEARS
+from .schemas import ConflictBatchRequest, EventDelta, FreeBusyRequest, SlotSearchRequest
+from .utils import (
+    encrypt_text,
+    decrypt_text,
+    decrypt_many,
+    invalidate_decrypted,
+    log_security_event,
+    to_utc
+)
 
 router = APIRouter(prefix="/events", tags=["Events"])
 
+FEED_CHUNK_SIZE = 500
+
 def sanitize(text: str):
     """Bemeneti adatok tisztítása (XSS védelem)"""
     if text:
@@ -19,15 +47,451 @@ def generate_meet_link():
     room_id = ''.join(random.choices(string.ascii_letters + string.digits, k=10))
     return f"https://meet.jit.si/UCC-Event-{room_id}"
 
+def participant_dates(event: Event) -> dict:
+    """Az esemény időpontjai a résztvevő-kapcsolat számára (a foglaltság az esemény tábla nélkül olvasható)"""
+    return {"start_date": event.start_date, "end_date": event.end_date, "series_end": event.series_end}
+
+async def sync_participants(session: AsyncSession, event: Event, usernames: List[str]) -> Set[str]:
+    """Résztvevő kapcsolótábla szinkronizálása halmazműveletekkel; az érintett felhasználókat adja vissza"""
+    current = set((await session.exec(
+        select(EventParticipant.username).where(EventParticipant.event_id == event.id)
+    )).all())
+    wanted = set(usernames)
+
+    dates = participant_dates(event)
+    for username in wanted - current:
+        session.add(EventParticipant(event_id=event.id, username=username, **dates))
+
+    # A megmaradó kapcsolatokba is az esemény (esetleg módosult) időpontjai kerülnek
+    kept = current & wanted
+    if kept:
+        await session.execute(
+            update(EventParticipant)
+            .where(EventParticipant.event_id == event.id, EventParticipant.username.in_(kept))
+            .values(**dates)
+            .execution_options(synchronize_session=False)
+        )
+
+    removed = current - wanted
+    if removed:
+        await session.execute(
+            delete(EventParticipant).where(
+                EventParticipant.event_id == event.id,
+                EventParticipant.username.in_(removed)
+            )
+        )
+
+    event.participants = ", ".join(usernames)
+    event.participant_count = len(wanted)
+    return current | wanted
+
+def check_capacity(capacity: Optional[int], participants: List[str]):
+    """Létszámkorlát validálása (a tulajdonos is résztvevőnek számít)"""
+    if capacity is None:
+        return
+    if capacity < 1:
+        raise HTTPException(status_code=400, detail="A létszámkorlát legalább 1 kell legyen")
+    if len(participants) > capacity:
+        raise HTTPException(status_code=400, detail="A résztvevők száma meghaladja a létszámkorlátot")
+
+async def add_participant(session: AsyncSession, event_id: int, username: str) -> bool:
+    """Atomi jelentkezés: egyetlen feltételes UPDATE dönt a duplikációról és a létszámról, olvasás-módosítás-írás nélkül"""
+    already_joined = select(EventParticipant.username).where(
+        EventParticipant.event_id == event_id,
+        EventParticipant.username == username
+    ).exists()
+    result = await session.execute(
+        update(Event)
+        .where(
+            Event.id == event_id,
+            ~already_joined,
+            or_(Event.capacity == None, Event.participant_count < Event.capacity)
+        )
+        .values(
+            participant_count=Event.participant_count + 1,
+            participants=case(
+                (or_(Event.participants == None, Event.participants == ""), username),
+                else_=Event.participants.concat(f", {username}")
+            )
+        )
+        .execution_options(synchronize_session=False)
+    )
+    if result.rowcount == 0:
+        return False
+
+    # Az UPDATE már megszerezte az írási zárat, így a kapcsolat beszúrása nem versenyezhet
+    await session.execute(
+        insert(EventParticipant).from_select(
+            ["event_id", "username", "start_date", "end_date", "series_end"],
+            select(Event.id, literal(username), Event.start_date, Event.end_date, Event.series_end)
+            .where(Event.id == event_id)
+        )
+    )
+    return True
+
+async def remove_participant(session: AsyncSession, event_id: int, username: str) -> bool:
+    """Atomi leiratkozás: DELETE, majd a számláló és a résztvevő szöveg SQL oldali frissítése"""
+    result = await session.execute(
+        delete(EventParticipant).where(
+            EventParticipant.event_id == event_id,
+            EventParticipant.username == username
+        )
+    )
+    if result.rowcount == 0:
+        return False
+
+    normalized = func.replace(func.replace(Event.participants, ", ", ",", type_=String), ",", ", ", type_=String)
+    await session.execute(
+        update(Event)
+        .where(Event.id == event_id)
+        .values(
+            participant_count=Event.participant_count - 1,
+            participants=func.trim(
+                func.replace(literal(", ").concat(normalized).concat(", "), f", {username}, ", ", "),
+                ", "
+            )
+        )
+        .execution_options(synchronize_session=False)
+    )
+    return True
+
+async def promote_waitlist(session: AsyncSession, event_id: int) -> List[str]:
+    """Felszabadult helyek kiosztása a várólista sorrendjében; a bekerült felhasználókat adja vissza"""
+    promoted = []
+    while True:
+        waiting = (await session.exec(
+            select(EventWaitlist)
+            .where(EventWaitlist.event_id == event_id)
+            .order_by(EventWaitlist.id)
+            .limit(1)
+        )).first()
+        if not waiting:
+            break
+        if await add_participant(session, event_id, waiting.username):
+            promoted.append(waiting.username)
+        elif not await session.get(EventParticipant, (event_id, waiting.username)):
+            break
+        await session.delete(waiting)
+        await session.flush()
+    return promoted
+
+def set_recurrence(event: Event, rrule: Optional[str], exdates: Optional[str]):
+    """Ismétlődési szabály és kivételek validálása, normalizálása és a sorozat végének kiszámítása"""
+    if not rrule:
+        event.rrule = event.exdates = event.series_end = None
+        return
+    try:
+        rule = recurrence.parse_rrule(rrule)
+        recurrence.check_limits(event.start_date, rule, RECURRENCE_MAX_COUNT, RECURRENCE_MAX_YEARS)
+        cancelled = {to_utc(item.strip()) for item in (exdates or "").split(",") if item.strip()}
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=f"Érvénytelen ismétlődés: {e}")
+
+    event.rrule = recurrence.format_rrule(rule)
+    event.exdates = recurrence.format_exdates(cancelled)
+    event.series_end = recurrence.series_end(event.start_date, event.end_date, rule)
+
+def overlaps(window_start: datetime.datetime, window_end: Optional[datetime.datetime] = None):
+    """Időablak feltétel; az ismétlődő sorozatot a series_end alapján szűri"""
+    condition = or_(Event.end_date > window_start, Event.series_end > window_start)
+    if window_end is None:
+        return condition
+    return and_(Event.start_date < window_end, condition)
+
+# Egy alkalom hossza napokban (az ix_event_owner_duration kifejezés-indexszel azonos alakban)
+EVENT_DURATION = func.julianday(Event.end_date) - func.julianday(Event.start_date)
+
+def earliest_start(window_start, longest):
+    """Legkorábbi kezdés, ami még az ablakba lóghat: ablak eleje - leghosszabb alkalom (napokban, 1 mp ráhagyással)"""
+    return func.strftime("%Y-%m-%d %H:%M:%f", func.julianday(window_start) - func.coalesce(longest, 0) - 1 / 86400)
+
+@functools.cache
+def owner_overlapping(columns: tuple):
+    """
+    A tulajdonos ablakba lógó eseményei egyetlen lekérdezésben, két szűk indexelt tartománnyal: az egyszeri
+    eseményeknél a kezdés alulról is korlátos (ablak eleje - a tulajdonos leghosszabb alkalma, amit a kifejezés-index
+    egyetlen olvasással ad; a julianday lebegőpontos, ezért 1 mp ráhagyással), a sorozatok a series_end indexén jönnek.
+    Oszlopkészletenként egyszer épül; paraméterek: owner, window_start, window_end, exclude_id (0: nincs kizárás).
+    """
+    owner, exclude_id = bindparam("owner"), bindparam("exclude_id")
+    window_start, window_end = bindparam("window_start", type_=DateTime), bindparam("window_end", type_=DateTime)
+    longest = select(func.max(EVENT_DURATION)).where(Event.owner == owner).scalar_subquery()
+    earliest = earliest_start(window_start, longest)
+    one_off = select(*columns).where(
+        Event.owner == owner,
+        Event.rrule.is_(None),
+        Event.start_date < window_end,
+        Event.start_date > earliest,
+        Event.end_date > window_start,
+        Event.id != exclude_id
+    )
+    series = select(*columns).where(
+        Event.owner == owner,
+        Event.rrule.is_not(None),
+        Event.series_end > window_start,
+        Event.start_date < window_end,
+        Event.id != exclude_id
+    )
+    return union_all(one_off, series)
+
+async def find_overlapping(
+    session: AsyncSession,
+    columns: tuple,
+    owner: str,
+    window_start: datetime.datetime,
+    window_end: datetime.datetime,
+    exclude_id: Optional[int] = None
+) -> list:
+    """owner_overlapping futtatása; a sorok oszlopnév szerint is elérhetők"""
+    return (await session.execute(owner_overlapping(columns), {
+        "owner": owner,
+        "window_start": window_start,
+        "window_end": window_end,
+        "exclude_id": exclude_id or 0,
+    })).all()
+
+def event_occurrences(event, window_start: datetime.datetime, window_end: datetime.datetime):
+    """Egy esemény (vagy sorozat) alkalmai az időablakban"""
+    if not event.rrule:
+        if event.start_date < window_end and event.end_date > window_start:
+            yield event.start_date, event.end_date
+        return
+    yield from recurrence.occurrences(
+        event.start_date, event.end_date,
+        recurrence.parse_rrule(event.rrule), recurrence.parse_exdates(event.exdates),
+        window_start, window_end
+    )
+
+def expand_series(
+    events: List[Event],
+    date_from: Optional[datetime.datetime],
+    date_to: Optional[datetime.datetime]
+) -> List[Event]:
+    """Sorozatok kibontása alkalmakra, csak zárt időablak esetén (ablak nélkül a sorozat egy elem marad)"""
+    if not date_from or not date_to or not any(event.rrule for event in events):
+        return events
+
+    window_start, window_end = to_utc(date_from), to_utc(date_to)
+    expanded = []
+    for event in events:
+        if not event.rrule:
+            expanded.append(event)
+            continue
+        for start, end in event_occurrences(event, window_start, window_end):
+            occurrence = Event.model_validate(event)
+            occurrence.start_date, occurrence.end_date = start, end
+            expanded.append(occurrence)
+    expanded.sort(key=lambda event: (event.start_date, event.id))
+    return expanded
+
+def decrypt_descriptions(events: List[Event]):
+    """Leírások kötegelt visszafejtése (gyorsítótár + szálkészlet nagy listáknál)"""
+    plaintexts = decrypt_many([event.description for event in events])
+    for event, plaintext in zip(events, plaintexts):
+        event.description = plaintext
+
+async def record_change(session: AsyncSession, event: Event, was_public: bool, deleted: bool = False):
+    """Változás naplózása; az esemény verziója a naplóbejegyzés azonosítója lesz"""
+    change = EventChange(
+        event_id=event.id,
+        owner=event.owner,
+        public=was_public or event.is_public,
+        removed=deleted or not event.is_public
+    )
+    session.add(change)
+    await session.flush()
+    event.version = change.id
+
+async def public_version(session: AsyncSession) -> int:
+    """A publikus eseménylista aktuális verziója (indexelt MAX lekérdezés)"""
+    version = (await session.exec(
+        select(func.max(EventChange.id)).where(EventChange.public == True)
+    )).first()
+    return version or 0
+
+def notify_change(event: Event, action: str, audience: Set[str], was_public: bool = False):
+    """Változás publikálása a hubra - csak azoknak, akik láthatják az eseményt"""
+    topics = {f"events:user:{username}" for username in audience}
+    if was_public or event.is_public:
+        topics.add("events:public")
+    hub.publish(topics, {
+        "type": "event",
+        "action": action,
+        "event_id": event.id,
+        "version": event.version
+    })
+
+# Egy résztvevő-kapcsolat alkalmának hossza napokban (az ix_eventparticipant_user_duration indexszel azonos alakban)
+PARTICIPANT_DURATION = func.julianday(EventParticipant.end_date) - func.julianday(EventParticipant.start_date)
+
+@functools.cache
+def busy_statement():
+    """
+    A felhasználók ablakba lógó alkalmai a résztvevő-kapcsolatokból; paraméterek: usernames (JSON lista), window_start,
+    window_end. Az egyszeri alkalmak felhasználónként alulról korlátos tartománnyal, a fedő indexből (esemény sor nélkül);
+    csak a sorozatokhoz kell az esemény (rrule, exdates), azok a series_end részleges indexén jönnek.
+    """
+    window_start, window_end = bindparam("window_start", type_=DateTime), bindparam("window_end", type_=DateTime)
+    wanted = func.json_each(bindparam("usernames")).table_valued("value").alias("wanted")
+    longest = (
+        select(func.max(PARTICIPANT_DURATION))
+        .where(EventParticipant.username == wanted.c.value)
+        .scalar_subquery()
+    )
+    bounds = select(wanted.c.value.label("username"), longest.label("longest")).subquery("bounds")
+
+    one_off = (
+        select(
+            EventParticipant.username, EventParticipant.start_date, EventParticipant.end_date,
+            null().label("rrule"), null().label("exdates")
+        )
+        .select_from(bounds)
+        .join(EventParticipant, EventParticipant.username == bounds.c.username)
+        .where(
+            EventParticipant.start_date < window_end,
+            EventParticipant.start_date > earliest_start(window_start, bounds.c.longest),
+            EventParticipant.end_date > window_start,
+            EventParticipant.series_end.is_(None)
+        )
+    )
+    series = (
+        select(EventParticipant.username, Event.start_date, Event.end_date, Event.rrule, Event.exdates)
+        .join(Event, Event.id == EventParticipant.event_id)
+        .where(
+            EventParticipant.username.in_(select(wanted.c.value)),
+            EventParticipant.series_end > window_start,
+            EventParticipant.start_date < window_end
+        )
+    )
+    return union_all(one_off, series)
+
+async def load_busy(
+    session: AsyncSession,
+    usernames: List[str],
+    window_start: datetime.datetime,
+    window_end: datetime.datetime
+) -> Dict[str, List[scheduling.Interval]]:
+    """Felhasználónkénti összefésült foglaltság egyetlen indexelt lekérdezéssel, visszafejtés nélkül"""
+    rows = (await session.execute(busy_statement(), {
+        "usernames": json.dumps(usernames),
+        "window_start": window_start,
+        "window_end": window_end,
+    })).all()
+
+    intervals: Dict[str, list] = {username: [] for username in usernames}
+    for username, *interval in rows:
+        intervals[username].append(interval)
+
+    # A sorozatok alkalmai csak az ablakon belül bomlanak ki
+    return {
+        username: scheduling.merge_intervals(scheduling.clip(
+            recurrence.expand(busy, window_start, window_end), window_start, window_end
+        ))
+        for username, busy in intervals.items()
+    }
+
+def encode_cursor(event: Event) -> str:
+    """Keyset cursor készítése az utolsó visszaadott eseményből"""
+    raw = f"{event.start_date.isoformat()}|{event.id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_cursor(cursor: str):
+    """Keyset cursor visszafejtése (kezdés, azonosító) párra"""
+    try:
+        start, event_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|")
+        return datetime.datetime.fromisoformat(start), int(event_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Érvénytelen cursor")
+
+class WindowSource(NamedTuple):
+    """A lapozott listázás oszlopai: az esemény sora, vagy a résztvevő-kapcsolatba másolt időpontok"""
+    key: Any
+    start_date: Any
+    end_date: Any
+    series_end: Any
+    duration: Any
+    one_off: Any
+    series: Any
+
+
+# Az egyszeri/sorozat feltétel a részleges indexek predikátumával azonos alakú, hogy a tervező használhassa őket
+EVENT_WINDOW = WindowSource(
+    Event.id, Event.start_date, Event.end_date, Event.series_end, EVENT_DURATION,
+    Event.rrule.is_(None), Event.rrule.is_not(None)
+)
+PARTICIPANT_WINDOW = WindowSource(
+    EventParticipant.event_id, EventParticipant.start_date, EventParticipant.end_date, EventParticipant.series_end,
+    PARTICIPANT_DURATION, EventParticipant.series_end.is_(None), EventParticipant.series_end.is_not(None)
+)
+
+def apply_window(
+    scope,
+    date_from: Optional[datetime.datetime],
+    date_to: Optional[datetime.datetime],
+    cursor: Optional[str],
+    source: WindowSource = EVENT_WINDOW
+):
+    """
+    A kör (scope: tulajdonos / nyilvános / résztvevő feltétele) ablakba lógó eseményei (start_date, id) sorrendben,
+    keyset lapozással. Alsó határnál két indexelt tartomány: az egyszeri alkalmak kezdése alulról is korlátos (ablak
+    eleje - a kör leghosszabb alkalma a kifejezés-indexből), a sorozatok a series_end részleges indexén jönnek.
+    """
+    bounds = [scope]
+    if date_to:
+        bounds.append(source.start_date < to_utc(date_to))
+    if cursor:
+        start, event_id = decode_cursor(cursor)
+        bounds.append(or_(
+            source.start_date > start,
+            and_(source.start_date == start, source.key > event_id)
+        ))
+
+    if not date_from:
+        statement = select(Event)
+        if source is PARTICIPANT_WINDOW:
+            statement = statement.join(EventParticipant, EventParticipant.event_id == Event.id)
+        return statement.where(*bounds).order_by(source.start_date, source.key)
+
+    window_start = to_utc(date_from)
+    longest = select(func.max(source.duration)).where(scope).scalar_subquery()
+    keys = (source.key.label("id"), source.start_date.label("start_date"))
+    one_off = select(*keys).where(
+        *bounds,
+        source.one_off,
+        source.start_date > earliest_start(window_start, longest),
+        source.end_date > window_start
+    )
+    series = select(*keys).where(*bounds, source.series, source.series_end > window_start)
+    window = union_all(one_off, series).subquery("window")
+    return (
+        select(Event)
+        .join(window, window.c.id == Event.id)
+        .order_by(window.c.start_date, window.c.id)
+    )
+
+async def fetch_page(session: AsyncSession, statement, limit: Optional[int], response: Response) -> List[Event]:
+    """Egy oldal lekérése; ha van következő oldal, a cursor az X-Next-Cursor fejlécbe kerül"""
+    if not limit:
+        return (await session.exec(statement)).all()
+
+    events = (await session.exec(statement.limit(limit + 1))).all()
+    if len(events) > limit:
+        events = events[:limit]
+        response.headers["X-Next-Cursor"] = encode_cursor(events[-1])
+    return events
+
 @router.post("", response_model=Event)
 async def create_event(
     event: Event,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_session),
     current_user: User = Depends(get_current_user)
 ):
     """Új esemény létrehozása titkosított leírással"""
     event.owner = current_user.username
     event.title = sanitize(event.title)
+    event.start_date = to_utc(event.start_date)
+    event.end_date = to_utc(event.end_date)
+    set_recurrence(event, event.rrule, event.exdates)
     
     if event.is_meeting:
         event.meeting_link = sanitize(generate_meet_link())
@@ -35,36 +499,204 @@ async def create_event(
     if event.description:
         event.description = encrypt_text(sanitize(event.description))
     
-    event.participants = add_owner_to_participants(event.owner, event.participants)
+    participants = add_owner_to_participants(event.owner, event.participants)
+    check_capacity(event.capacity, participants)
     
     session.add(event)
-    session.commit()
-    session.refresh(event)
+    await session.flush()
+    audience = await sync_participants(session, event, participants)
+    await record_change(session, event, was_public=False)
+    await session.commit()
+    await session.refresh(event)
+    notify_change(event, "created", audience)
     
     event.description = decrypt_text(event.description)
     return event
 
+@router.post("/import")
+async def import_events_file(
+    file: UploadFile = File(...),
+    current_user: User = Depends(get_current_user)
+):
+    """Tömeges esemény import iCalendar (.ics) vagy CSV fájlból, soronkénti hibajelentéssel"""
+    filename = (file.filename or "").lower()
+    if filename.endswith(".ics") or file.content_type == "text/calendar":
+        file_format = "ics"
+    elif filename.endswith(".csv") or file.content_type == "text/csv":
+        file_format = "csv"
+    else:
+        raise HTTPException(status_code=400, detail="Csak .ics vagy .csv fájl tölthető fel")
+
+    # A feldolgozás CPU-igényes, ezért nem az eseményhurkon fut
+    report = await run_in_threadpool(
+        import_events, file.file, file_format, current_user.username, generate_meet_link
+    )
+    audience = report.pop("audience")
+    is_public = report.pop("public")
+
+    log_security_event(
+        f"ESEMENY IMPORT - User: {current_user.username} - Sikeres: {report['imported']} - Hibas: {report['failed']}"
+    )
+
+    if report["imported"]:
+        topics = {f"events:user:{username}" for username in audience}
+        if is_public:
+            topics.add("events:public")
+        hub.publish(topics, {
+            "type": "event",
+            "action": "imported",
+            "count": report["imported"],
+            "version": report["version"]
+        })
+
+    return report
+
+def calendar_feed(target_username: str, viewer: str, joined_ids: Set[int]):
+    """iCalendar feed darabonként, szerver oldali cursorból - a naptár sosem kerül egyben memóriába"""
+    yield ical.calendar_header(f"{target_username} naptára")
+    stamp = datetime.datetime.utcnow()
+
+    with Session(engine) as session:
+        statement = (
+            select(Event)
+            .where(Event.owner == target_username)
+            .order_by(Event.start_date, Event.id)
+            .execution_options(yield_per=FEED_CHUNK_SIZE)
+        )
+        for chunk in session.exec(statement).partitions():
+            visible = {
+                event.id for event in chunk
+                if event.is_public or event.owner == viewer or event.id in joined_ids
+            }
+            plaintexts = decrypt_many([
+                event.description if event.id in visible else None for event in chunk
+            ])
+
+            parts = []
+            for event, description in zip(chunk, plaintexts):
+                if event.id in visible:
+                    parts.append(ical.format_event(
+                        event.id, event.title, event.start_date, event.end_date, stamp,
+                        description=description,
+                        url=event.meeting_link,
+                        is_public=event.is_public,
+                        sequence=event.version,
+                        rrule=event.rrule,
+                        exdates=recurrence.parse_exdates(event.exdates)
+                    ))
+                else:
+                    parts.append(ical.format_event(
+                        event.id, "Foglalt", event.start_date, event.end_date, stamp,
+                        sequence=event.version,
+                        rrule=event.rrule,
+                        exdates=recurrence.parse_exdates(event.exdates)
+                    ))
+            session.expunge_all()
+            yield "".join(parts)
+
+    yield ical.calendar_footer()
+
+@router.post("/feed/token")
+async def rotate_feed_token(
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(get_current_user)
+):
+    """Új feed token külső naptárklienseknek (csak a .ics feedek olvasására jogosít; a korábbiakat visszavonja)"""
+    secret = secrets.token_urlsafe(32)
+    user = await session.get(User, current_user.id)
+    user.feed_secret_hash = hash_token(secret)
+    session.add(user)
+    await session.commit()
+    invalidate_user(user.username)
+
+    token = create_feed_token(user.username, secret)
+    return {
+        "token": token,
+        "url": f"/events/user/{current_user.username}/feed.ics?token={token}"
+    }
+
+@router.get("/user/{target_username}/feed.ics")
+async def read_user_calendar_feed(
+    target_username: str,
+    token: str,
+    request: Request,
+    session: AsyncSession = Depends(get_session)
+):
+    """Feliratkozható iCalendar feed (ugyanazokkal a láthatósági szabályokkal, ETag/Last-Modified támogatással)"""
+    current_user = await get_user_from_token(token, session, scopes=("feed",))
+
+    last_change = (await session.exec(
+        select(EventChange.id, EventChange.changed_at)
+        .where(EventChange.owner == target_username)
+        .order_by(EventChange.id.desc())
+        .limit(1)
+    )).first()
+    version, modified = last_change or (0, datetime.datetime(1970, 1, 1))
+    modified = modified.replace(microsecond=0, tzinfo=datetime.timezone.utc)
+
+    headers = {
+        "ETag": f'W/"{version}"',
+        "Last-Modified": format_datetime(modified, usegmt=True),
+        "Cache-Control": "private, no-cache"
+    }
+
+    if_none_match = request.headers.get("if-none-match")
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_none_match is not None:
+        if headers["ETag"] in [tag.strip() for tag in if_none_match.split(",")]:
+            return Response(status_code=304, headers=headers)
+    elif if_modified_since:
+        try:
+            if modified <= parsedate_to_datetime(if_modified_since):
+                return Response(status_code=304, headers=headers)
+        except (TypeError, ValueError):
+            pass
+
+    joined_ids = set((await session.exec(
+        select(EventParticipant.event_id)
+        .join(Event, Event.id == EventParticipant.event_id)
+        .where(EventParticipant.username == current_user.username)
+        .where(Event.owner == target_username)
+    )).all())
+    # A feed saját sessionből olvas; ez a kapcsolat visszamehet a készletbe a streamelés előtt
+    await session.close()
+
+    return StreamingResponse(
+        calendar_feed(target_username, current_user.username, joined_ids),
+        media_type="text/calendar; charset=utf-8",
+        headers=headers
+    )
+
 @router.get("/user/{target_username}", response_model=List[Event])
 async def read_user_events(
     target_username: str,
-    session: Session = Depends(get_session),
+    response: Response,
+    date_from: Optional[datetime.datetime] = Query(None, alias="from"),
+    date_to: Optional[datetime.datetime] = Query(None, alias="to"),
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    session: AsyncSession = Depends(get_session),
     current_user: User = Depends(get_current_user)
 ):
     """Egy adott felhasználó naptárának lekérése"""
     
-    events = session.exec(select(Event).where(Event.owner == target_username)).all()
+    statement = apply_window(Event.owner == target_username, date_from, date_to, cursor)
+    events = await fetch_page(session, statement, limit, response)
+    # Csak a visszaadott oldal eseményeire (elsődleges kulcsos keresések), nem a tulajdonos teljes múltjára
+    joined_ids = set((await session.exec(
+        select(EventParticipant.event_id).where(
+            EventParticipant.username == current_user.username,
+            EventParticipant.event_id.in_([event.id for event in events])
+        )
+    )).all()) if events else set()
     safe_events = []
+    visible_events = []
     
     for event in events:
-        is_participant = False
-        if event.participants:
-            participant_list = [p.strip() for p in event.participants.split(",")]
-            if current_user.username in participant_list:
-                is_participant = True
+        is_participant = event.id in joined_ids
 
         if event.is_public or event.owner == current_user.username or is_participant:
-            if event.description:
-                event.description = decrypt_text(event.description)
+            visible_events.append(event)
             safe_events.append(event)
         
         else:
@@ -74,43 +706,42 @@ async def read_user_events(
             safe_event.meeting_link = None
             safe_event.participants = None
             safe_events.append(safe_event)
-            
-    return safe_events
+    
+    decrypt_descriptions(visible_events)
+    return expand_series(safe_events, date_from, date_to)
 
 @router.get("", response_model=List[Event])
 async def read_events(
-    session: Session = Depends(get_session),
+    response: Response,
+    date_from: Optional[datetime.datetime] = Query(None, alias="from"),
+    date_to: Optional[datetime.datetime] = Query(None, alias="to"),
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    session: AsyncSession = Depends(get_session),
     current_user: User = Depends(get_current_user)
 ):
     """Események lekérése - CSAK AZOK, AHOL RÉSZTVEVŐ VAGYOK"""
-    all_events = session.exec(select(Event)).all()
-    my_events = []
-    
-    for event in all_events:
-        is_participant = False
-        
-        if event.participants:
-            participant_list = [p.strip() for p in event.participants.split(",")]
-            if current_user.username in participant_list:
-                is_participant = True
-        
-        if is_participant:
-            if event.description:
-                event.description = decrypt_text(event.description)
-            my_events.append(event)
+    # A résztvevő-kapcsolatba másolt időpontokon, az ix_eventparticipant_user_start_event indexen
+    statement = apply_window(
+        EventParticipant.username == current_user.username,
+        date_from, date_to, cursor,
+        PARTICIPANT_WINDOW
+    )
+    my_events = await fetch_page(session, statement, limit, response)
+    decrypt_descriptions(my_events)
     
-    return my_events
+    return expand_series(my_events, date_from, date_to)
 
 
 @router.put("/{event_id}", response_model=Event)
 async def update_event(
     event_id: int,
     event_update: Event,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_session),
     current_user: User = Depends(get_current_user)
 ):
     """Esemény frissítése"""
-    db_event = session.get(Event, event_id)
+    db_event = await session.get(Event, event_id)
     
     if not db_event:
         raise HTTPException(status_code=404, detail="Esemény nem található")
@@ -120,10 +751,12 @@ async def update_event(
     
     log_security_event(f"ESEMENY MODOSITVA - ID: {event_id} - Modosito: {current_user.username}")
     
+    was_public = db_event.is_public
     db_event.title = sanitize(event_update.title)
-    db_event.start_date = event_update.start_date
-    db_event.end_date = event_update.end_date
+    db_event.start_date = to_utc(event_update.start_date)
+    db_event.end_date = to_utc(event_update.end_date)
     db_event.is_public = event_update.is_public
+    set_recurrence(db_event, event_update.rrule, event_update.exdates)
     
     if event_update.is_meeting and not db_event.meeting_link:
         db_event.meeting_link = sanitize(generate_meet_link())
@@ -132,19 +765,29 @@ async def update_event(
         
     db_event.is_meeting = event_update.is_meeting
 
+    invalidate_decrypted(db_event.description)
     if event_update.description:
         db_event.description = encrypt_text(sanitize(event_update.description))
     else:
         db_event.description = None
 
-    db_event.participants = add_owner_to_participants(
-        db_event.owner,
-        event_update.participants
-    )
+    participants = add_owner_to_participants(db_event.owner, event_update.participants)
+    check_capacity(event_update.capacity, participants)
+    db_event.capacity = event_update.capacity
+
+    audience = await sync_participants(session, db_event, participants)
+    session.add(db_event)
+    await session.flush()
+    promoted = await promote_waitlist(session, db_event.id)
+    if promoted:
+        await session.refresh(db_event)
+        audience.update(promoted)
+    await record_change(session, db_event, was_public)
     
     session.add(db_event)
-    session.commit()
-    session.refresh(db_event)
+    await session.commit()
+    await session.refresh(db_event)
+    notify_change(db_event, "updated", audience, was_public)
     
     if db_event.description:
         db_event.description = decrypt_text(db_event.description)
@@ -155,11 +798,11 @@ async def update_event(
 @router.delete("/{event_id}")
 async def delete_event(
     event_id: int,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_session),
     current_user: User = Depends(get_current_user)
 ):
     """Esemény törlése"""
-    event = session.get(Event, event_id)
+    event = await session.get(Event, event_id)
     
     if not event:
         raise HTTPException(status_code=404, detail="Esemény nem található")
@@ -170,93 +813,285 @@ async def delete_event(
     
     log_security_event(f"ESEMENY TOROLVE - ID: {event_id} - Cím: {event.title} - Torolte: {current_user.username}")
     
-    session.delete(event)
-    session.commit()
+    audience = set(split_participants(event.participants)) | {event.owner}
+    invalidate_decrypted(event.description)
+    await session.execute(delete(EventParticipant).where(EventParticipant.event_id == event_id))
+    await session.execute(delete(EventWaitlist).where(EventWaitlist.event_id == event_id))
+    await record_change(session, event, event.is_public, deleted=True)
+    await session.delete(event)
+    await session.commit()
+    notify_change(event, "deleted", audience)
     
     return {"message": "Törölve"}
 
 @router.post("/check-conflict")
 async def check_conflict(
     event: Event,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_session),
     current_user: User = Depends(get_current_user)
 ):
     """Ellenőrzi, hogy az új időpont ütközik-e meglévő eseménnyel"""
-    statement = select(Event).where(
-        Event.owner == current_user.username,
-        Event.start_date < event.end_date,
-        Event.end_date > event.start_date
+    start, end = to_utc(event.start_date), to_utc(event.end_date)
+    candidates = await find_overlapping(
+        session,
+        (Event.title, Event.start_date, Event.end_date, Event.rrule, Event.exdates),
+        current_user.username, start, end, event.id
     )
     
-    if event.id:
-        statement = statement.where(Event.id != event.id)
-        
-    conflicts = session.exec(statement).all()
+    # A sorozatoknál az ablakba eső első alkalom számít
+    conflicts = [
+        (occurrence[0], candidate.title)
+        for candidate in candidates
+        for occurrence in [next(event_occurrences(candidate, start, end), None)]
+        if occurrence
+    ]
     
     if conflicts:
+        conflict_start, title = min(conflicts)
         return {
             "conflict": True,
-            "title": conflicts[0].title,
-            "start_date": conflicts[0].start_date
+            "title": title,
+            "start_date": conflict_start
         }
     
     return {"conflict": False}
 
-@router.get("/public", response_model=List[Event])
-async def get_public_events(session: Session = Depends(get_session)):
-    """Minden publikus esemény lekérése"""
-    events = session.exec(select(Event).where(Event.is_public == True)).all()
+@router.post("/check-conflicts")
+async def check_conflicts(
+    batch: ConflictBatchRequest,
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(get_current_user)
+):
+    """Több időpont ütközésvizsgálata egyetlen lekérdezéssel, minden ütközést visszaadva"""
+    if not batch.slots:
+        return {"results": []}
+
+    slots = [(to_utc(slot.start_date), to_utc(slot.end_date), slot.id) for slot in batch.slots]
+
+    # Indexelt tartomány-lekérdezések a teljes burkoló intervallumra
+    window_start = min(start for start, _, _ in slots)
+    window_end = max(end for _, end, _ in slots)
+    rows = await find_overlapping(
+        session,
+        (Event.id, Event.title, Event.start_date, Event.end_date, Event.rrule, Event.exdates),
+        current_user.username, window_start, window_end
+    )
+
+    # Sorozatok alkalmai csak a burkoló ablakon belül bomlanak ki
+    candidates = sorted(
+        (start, end, row.id, row.title)
+        for row in rows
+        for start, end in event_occurrences(row, window_start, window_end)
+    )
+    starts = [c[0] for c in candidates]
+
+    results = []
+    for index, (start, end, own_id) in enumerate(slots):
+        conflicts = [
+            {"id": c_id, "title": title, "start_date": c_start, "end_date": c_end}
+            for c_start, c_end, c_id, title in candidates[:bisect_left(starts, end)]
+            if c_end > start and c_id != own_id
+        ]
+        results.append({"index": index, "conflict": bool(conflicts), "conflicts": conflicts})
+
+    return {"results": results}
+
+@router.post("/freebusy")
+async def read_free_busy(
+    request: FreeBusyRequest,
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(get_current_user)
+):
+    """Több felhasználó foglaltsága egy kérésben: felhasználónként, összesítve és a közös szabad idősávok"""
+    window_start, window_end = to_utc(request.start), to_utc(request.end)
+    if window_end <= window_start:
+        raise HTTPException(status_code=400, detail="Az időablak vége a kezdete után kell legyen")
+
+    usernames = list(dict.fromkeys(request.usernames))
+    busy = await load_busy(session, usernames, window_start, window_end)
+    combined = scheduling.union(busy.values())
+
+    return {
+        "start": window_start,
+        "end": window_end,
+        "users": {username: scheduling.as_dicts(intervals) for username, intervals in busy.items()},
+        "combined_busy": scheduling.as_dicts(combined),
+        "common_free": scheduling.as_dicts(scheduling.free_intervals(combined, window_start, window_end))
+    }
+
+@router.post("/find-slots")
+async def find_meeting_slots(
+    request: SlotSearchRequest,
+    session: AsyncSession = Depends(get_session),
+    current_user: User = Depends(get_current_user)
+):
+    """A legkorábbi N időpont, amikor minden résztvevő szabad (munkaidőn belül)"""
+    window_start, window_end = to_utc(request.start), to_utc(request.end)
+    if window_end <= window_start:
+        raise HTTPException(status_code=400, detail="Az időablak vége a kezdete után kell legyen")
+    if window_end - window_start > datetime.timedelta(days=366):
+        raise HTTPException(status_code=400, detail="Az időablak legfeljebb egy év lehet")
+    if request.work_end <= request.work_start:
+        raise HTTPException(status_code=400, detail="Érvénytelen munkaidő")
+
+    participants = list(dict.fromkeys(request.participants + [current_user.username]))
+    busy = scheduling.union((await load_busy(session, participants, window_start, window_end)).values())
+
+    slots = scheduling.find_slots(
+        busy,
+        scheduling.working_windows(
+            window_start, window_end, request.work_start, request.work_end, request.weekdays_only
+        ),
+        datetime.timedelta(minutes=request.duration_minutes),
+        datetime.timedelta(minutes=request.step_minutes),
+        request.count
+    )
+    return {"participants": participants, "slots": scheduling.as_dicts(slots)}
+
+@router.get("/stream")
+async def stream_events(token: str):
+    """Eseményváltozások SSE csatornája (EventSource nem küld fejlécet, ezért query tokennel)"""
+    # Rövid életű session: a hosszan nyitott kapcsolat nem foglalhat helyet a kapcsolatkészletben
+    async with AsyncSession(async_engine) as session:
+        current_user = await get_user_from_token(token, session)
+    subscription = hub.subscribe(["events:public", f"events:user:{current_user.username}"])
+
+    async def event_stream():
+        try:
+            yield "retry: 3000\n\n"
+            while True:
+                try:
+                    message = await subscription.get(timeout=15)
+                except asyncio.TimeoutError:
+                    yield ": ping\n\n"
+                    continue
+                yield f"data: {json.dumps(message)}\n\n"
+        finally:
+            hub.unsubscribe(subscription)
+
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@router.get("/public", response_model=Union[List[Event], EventDelta])
+async def get_public_events(
+    request: Request,
+    response: Response,
+    date_from: Optional[datetime.datetime] = Query(None, alias="from"),
+    date_to: Optional[datetime.datetime] = Query(None, alias="to"),
+    cursor: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=1000),
+    since: Optional[int] = Query(None, ge=0),
+    session: AsyncSession = Depends(get_session)
+):
+    """Publikus események lekérése (ETag, időablak, lapozás, ?since= változáscsomag)"""
+    version = await public_version(session)
+    etag = f'W/"{version}"'
     
-    for event in events:
-        if event.description:
-            event.description = decrypt_text(event.description)
+    if etag in [tag.strip() for tag in request.headers.get("if-none-match", "").split(",")]:
+        return Response(status_code=304, headers={"ETag": etag})
+    
+    response.headers["ETag"] = etag
+    response.headers["Cache-Control"] = "private, no-cache"
+    
+    if since is not None:
+        upserts = (await session.exec(
+            select(Event)
+            .where(Event.is_public == True, Event.version > since)
+            .order_by(Event.version)
+        )).all()
+        removed = (await session.exec(
+            select(EventChange.event_id).where(
+                EventChange.public == True,
+                EventChange.removed == True,
+                EventChange.id > since
+            )
+        )).all()
+        
+        decrypt_descriptions(upserts)
+        
+        upsert_ids = {event.id for event in upserts}
+        return EventDelta(
+            version=version,
+            upserts=upserts,
+            deleted=sorted(set(removed) - upsert_ids)
+        )
+    
+    statement = apply_window(Event.is_public == True, date_from, date_to, cursor)
+    events = await fetch_page(session, statement, limit, response)
+    decrypt_descriptions(events)
             
-    return events
+    return expand_series(events, date_from, date_to)
 
 @router.post("/{event_id}/join")
 async def join_event(
     event_id: int,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_session),
     current_user: User = Depends(get_current_user)
 ):
-    """Jelentkezés egy publikus eseményre"""
-    event = session.get(Event, event_id)
+    """Jelentkezés egy publikus eseményre (betelt eseménynél várólistára)"""
+    username = current_user.username
+
+    # Az első utasítás írás, így a tranzakció nem olvasási zárról próbál írásira váltani
+    if await add_participant(session, event_id, username):
+        event = await session.get(Event, event_id)
+        await record_change(session, event, event.is_public)
+        await session.commit()
+        notify_change(event, "joined", set(split_participants(event.participants)))
+        return {"message": "Sikeresen hozzáadva a naptáradhoz!", "status": "joined"}
+
+    event = await session.get(Event, event_id)
     if not event:
         raise HTTPException(status_code=404, detail="Esemény nem található")
 
-    participants = []
-    if event.participants:
-        participants = [p.strip() for p in event.participants.split(",")]
-    
-    if current_user.username not in participants:
-        participants.append(current_user.username)
-        event.participants = ", ".join(participants)
-        session.add(event)
-        session.commit()
-        return {"message": "Sikeresen hozzáadva a naptáradhoz!"}
-    
-    return {"message": "Már hozzáadtad ezt az eseményt."}
+    if await session.get(EventParticipant, (event_id, username)):
+        return {"message": "Már hozzáadtad ezt az eseményt.", "status": "joined"}
+
+    await session.execute(
+        insert(EventWaitlist).prefix_with("OR IGNORE").values(event_id=event_id, username=username)
+    )
+    await session.commit()
+    waiting = (await session.exec(
+        select(EventWaitlist).where(EventWaitlist.event_id == event_id, EventWaitlist.username == username)
+    )).one()
+    position = (await session.exec(
+        select(func.count()).where(EventWaitlist.event_id == event_id, EventWaitlist.id <= waiting.id)
+    )).one()
+    return {
+        "message": f"Az esemény betelt, felkerültél a várólistára ({position}. hely).",
+        "status": "waitlisted",
+        "position": position
+    }
 
 @router.post("/{event_id}/leave")
 async def leave_event(
     event_id: int,
-    session: Session = Depends(get_session),
+    session: AsyncSession = Depends(get_session),
     current_user: User = Depends(get_current_user)
 ):
-    """Leiratkozás egy publikus eseményről"""
-    event = session.get(Event, event_id)
-    if not event:
+    """Leiratkozás egy publikus eseményről; a felszabaduló helyet a várólista első tagja kapja"""
+    username = current_user.username
+
+    if await remove_participant(session, event_id, username):
+        promoted = await promote_waitlist(session, event_id)
+        event = await session.get(Event, event_id)
+        await record_change(session, event, event.is_public)
+        await session.commit()
+        notify_change(
+            event, "left",
+            set(split_participants(event.participants)) | {username} | set(promoted)
+        )
+        return {"message": "Sikeresen leiratkoztál az eseményről."}
+
+    removed = (await session.execute(
+        delete(EventWaitlist).where(EventWaitlist.event_id == event_id, EventWaitlist.username == username)
+    )).rowcount
+    await session.commit()
+    if removed:
+        return {"message": "Lekerültél a várólistáról."}
+
+    if not await session.get(Event, event_id):
         raise HTTPException(status_code=404, detail="Esemény nem található")
-    
-    if event.participants:
-        participant_list = [p.strip() for p in event.participants.split(",")]
-        
-        if current_user.username in participant_list:
-            participant_list.remove(current_user.username)
-            event.participants = ", ".join(participant_list)
-            
-            session.add(event)
-            session.commit()
-            return {"message": "Sikeresen leiratkoztál az eseményről."}
-    
     return {"message": "Nem vagy rajta a résztvevők listáján."}
@@ -0,0 +1,282 @@
+import asyncio, base64, datetime
+from collections import deque
+from typing import Awaitable, Callable, List, Optional
+from fastapi import HTTPException, Response, WebSocket, WebSocketDisconnect
+from starlette.websockets import WebSocketState
+from sqlalchemy import tuple_
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlmodel import select, update
+from sqlmodel.ext.asyncio.session import AsyncSession
+from .database import async_engine
+from .models import ChatMessage, ChatSession
+from .pubsub import hub
+from .config import CHAT_WS_HEARTBEAT, CHAT_WS_QUEUE, CHAT_WS_SEND_TIMEOUT, CHAT_WS_CATCHUP_LIMIT
+
+# Beszélgetés állapotok: AI válaszol / emberre vár / admin válaszolt / admin lezárta
+STATUS_AI = "ai"
+STATUS_WAITING = "waiting"
+STATUS_ADMIN = "admin"
+STATUS_RESOLVED = "resolved"
+
+# Minden chat üzenet ide is publikálódik (admin multiplex socket)
+ADMIN_CHAT_TOPIC = "chat:admin"
+
+
+def chat_topic(session_id: str) -> str:
+    return f"chat:{session_id}"
+
+
+def message_payload(message: ChatMessage) -> dict:
+    return {
+        "id": message.id,
+        "session_id": message.session_id,
+        "sender": message.sender,
+        "message": message.message,
+        "timestamp": message.timestamp.isoformat(),
+        "needs_human": message.needs_human,
+    }
+
+
+def message_status(message: ChatMessage) -> str:
+    if message.sender == "admin":
+        return STATUS_ADMIN
+    if message.sender == "system":
+        return STATUS_RESOLVED
+    return STATUS_WAITING if message.needs_human else STATUS_AI
+
+
+async def add_message(
+    session: AsyncSession,
+    session_id: str,
+    sender: str,
+    message: str,
+    needs_human: bool = False
+) -> ChatMessage:
+    """Üzenet beszúrása és az összesítő sor frissítése ugyanabban a tranzakcióban (a commit a hívóé)"""
+    chat_message = ChatMessage(session_id=session_id, sender=sender, message=message, needs_human=needs_human)
+    session.add(chat_message)
+    await session.flush()
+
+    # Olvasatlan: emberre váró felhasználói üzenet; admin válasz vagy lezárás nullázza
+    if sender in ("admin", "system"):
+        unread = 0
+    elif sender == "user" and needs_human:
+        unread = ChatSession.unread_count + 1
+    else:
+        unread = ChatSession.unread_count
+
+    values = {
+        "status": message_status(chat_message),
+        "needs_human": needs_human,
+        "last_message_at": chat_message.timestamp,
+        "last_message_id": chat_message.id,
+        "last_sender": sender,
+    }
+    statement = sqlite_insert(ChatSession).values(
+        session_id=session_id,
+        unread_count=1 if sender == "user" and needs_human else 0,
+        archived_through_id=0,
+        **values
+    ).on_conflict_do_update(
+        index_elements=["session_id"],
+        set_={**values, "unread_count": unread}
+    )
+    await session.execute(statement)
+    return chat_message
+
+
+async def commit_messages(session: AsyncSession, *messages: ChatMessage):
+    """
+    Commit, majd a teljes üzenet publikálása a beszélgetés és az admin témáján (más workerekbe is):
+    a long-poll kérések felébrednek, a socketek DB lekérdezés nélkül továbbítják
+    """
+    await session.commit()
+    for message in messages:
+        hub.publish([chat_topic(message.session_id), ADMIN_CHAT_TOPIC], {
+            "type": "chat_message",
+            "status": message_status(message),
+            "message": message_payload(message),
+        })
+
+
+async def wait_for_messages(
+    session: AsyncSession,
+    session_id: str,
+    wait: float,
+    fetch: Callable[[], Awaitable[list]]
+) -> list:
+    """
+    Long-poll: ha nincs új üzenet, a kérés legfeljebb wait másodpercig vár a beszélgetés értesítésére.
+    Várakozás közben nincs DB lekérdezés és a session visszaadja a kapcsolatát a készletbe. Lejáratkor még egyszer
+    lekérdez: egy másik worker commitja (LocalBackend mellett) nem érkezik meg a hubon át.
+    """
+    if wait <= 0:
+        return await fetch()
+
+    # Feliratkozás a lekérdezés előtt, hogy a kettő közti commit se vesszen el
+    subscription = hub.subscribe([chat_topic(session_id)], maxsize=10)
+    try:
+        messages = await fetch()
+        if messages:
+            return messages
+        await session.close()
+        try:
+            await subscription.get(timeout=wait)
+        except asyncio.TimeoutError:
+            pass
+        return await fetch()
+    finally:
+        hub.unsubscribe(subscription)
+
+
+async def get_summary(session: AsyncSession, session_id: str) -> Optional[ChatSession]:
+    return await session.get(ChatSession, session_id)
+
+
+async def mark_read(session: AsyncSession, session_id: str):
+    """Az admin megnyitotta a beszélgetést: olvasatlan számláló nullázása (csak ha van mit)"""
+    summary = await get_summary(session, session_id)
+    if summary and summary.unread_count:
+        await session.execute(
+            update(ChatSession).where(ChatSession.session_id == session_id).values(unread_count=0)
+        )
+        await session.commit()
+
+
+def encode_queue_cursor(summary: ChatSession) -> str:
+    """Keyset cursor a support sor utolsó visszaadott sorából"""
+    raw = f"{int(summary.needs_human)}|{summary.last_message_at.isoformat()}|{summary.session_id}"
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+
+def decode_queue_cursor(cursor: str):
+    try:
+        needs_human, last_message_at, session_id = base64.urlsafe_b64decode(cursor.encode()).decode().split("|", 2)
+        return bool(int(needs_human)), datetime.datetime.fromisoformat(last_message_at), session_id
+    except Exception:
+        raise HTTPException(status_code=400, detail="Érvénytelen cursor")
+
+
+async def support_queue(
+    session: AsyncSession,
+    limit: int,
+    cursor: Optional[str],
+    needs_human: Optional[bool],
+    response: Response
+) -> List[ChatSession]:
+    """
+    Support sor: előbb az emberre várók, azon belül a legutóbb aktívak (ix_chatsession_queue indexen,
+    keyset lapozással); ha van következő oldal, a cursor az X-Next-Cursor fejlécbe kerül
+    """
+    order = (ChatSession.needs_human, ChatSession.last_message_at, ChatSession.session_id)
+    statement = select(ChatSession)
+    if needs_human is not None:
+        statement = statement.where(ChatSession.needs_human == needs_human)
+    if cursor:
+        statement = statement.where(tuple_(*order) < decode_queue_cursor(cursor))
+    statement = statement.order_by(*(column.desc() for column in order)).limit(limit + 1)
+
+    rows = (await session.exec(statement)).all()
+    if len(rows) > limit:
+        rows = rows[:limit]
+        response.headers["X-Next-Cursor"] = encode_queue_cursor(rows[-1])
+    return rows
+
+
+async def fetch_messages_after(session_id: Optional[str], after_id: Optional[int]) -> List[dict]:
+    """
+    Socket (újra)csatlakozás utáni pótlás rövid életű sessionnel: after_id utáni üzenetek azonosító szerint,
+    egy oldalnyi (legfeljebb CHAT_WS_CATCHUP_LIMIT darab); session_id nélkül (admin) az összes beszélgetésből.
+    """
+    statement = select(ChatMessage)
+    if session_id is not None:
+        statement = statement.where(ChatMessage.session_id == session_id)
+    if after_id is not None:
+        statement = statement.where(ChatMessage.id > after_id)
+    statement = statement.order_by(ChatMessage.id).limit(CHAT_WS_CATCHUP_LIMIT)
+    async with AsyncSession(async_engine) as session:
+        return [message_payload(m) for m in (await session.exec(statement)).all()]
+
+
+async def serve_chat_socket(websocket: WebSocket, session_id: Optional[str], after_id: Optional[int]):
+    """
+    Egy (már elfogadott) helpdesk socket kiszolgálása: pótlás after_id-tól, utána az új üzenetek a hubból.
+    - lassú kliens: a korlátos sor túlcsordul -> resync -> pótlás az utolsó elküldött id-tól; egy küldés
+      legfeljebb CHAT_WS_SEND_TIMEOUT ideig várhat, utána a kapcsolat bezárul (a kliens folytatja)
+    - szívverés: CHAT_WS_HEARTBEAT tétlenség után ping; ha a kliens két ciklusig néma, a kapcsolat bezárul
+    - tétlen socket nem tart DB kapcsolatot és nem kérdez le semmit
+    """
+    topic = chat_topic(session_id) if session_id is not None else ADMIN_CHAT_TOPIC
+    subscription = hub.subscribe([topic], maxsize=CHAT_WS_QUEUE)
+    loop = asyncio.get_running_loop()
+    last_id = after_id or 0
+    delivered = deque(maxlen=CHAT_WS_QUEUE)
+
+    async def send_frame(frame: dict):
+        # A bontást a párhuzamos receive task is észlelheti, mielőtt a küldés sorra kerül
+        if websocket.client_state == WebSocketState.DISCONNECTED:
+            raise WebSocketDisconnect(code=1006)
+        await websocket.send_json(frame)
+
+    async def send(messages: List[dict]):
+        nonlocal last_id
+        fresh = [m for m in messages if m["id"] not in delivered]
+        if not fresh:
+            return
+        await asyncio.wait_for(send_frame({"type": "messages", "messages": fresh}), CHAT_WS_SEND_TIMEOUT)
+        delivered.extend(m["id"] for m in fresh)
+        last_id = max(last_id, fresh[-1]["id"])
+
+    async def catch_up(from_id: Optional[int]):
+        # Oldalanként, amíg utol nem érjük: hosszabb kiesés után sem marad ki üzenet a kurzor mögött
+        while True:
+            messages = await fetch_messages_after(session_id, from_id)
+            await send(messages)
+            if len(messages) < CHAT_WS_CATCHUP_LIMIT:
+                return
+            from_id = messages[-1]["id"]
+
+    receive = incoming = None
+    try:
+        # Admin socket after_id nélkül csak az új üzeneteket kapja (az állapot a support sorból jön)
+        if session_id is not None or after_id is not None:
+            await catch_up(after_id)
+
+        last_heard = loop.time()
+        receive = asyncio.ensure_future(websocket.receive())
+        incoming = asyncio.ensure_future(subscription.queue.get())
+        while True:
+            # A task állapotát nézzük, nem a visszaadott halmazt: időtúllépés után is befejeződhetett közben
+            await asyncio.wait({receive, incoming}, timeout=CHAT_WS_HEARTBEAT, return_when=asyncio.FIRST_COMPLETED)
+            idle = not (receive.done() or incoming.done())
+
+            if receive.done():
+                if receive.result()["type"] == "websocket.disconnect":
+                    return
+                last_heard = loop.time()  # bármilyen kliens üzenet (pl. pong) életjel
+                receive = asyncio.ensure_future(websocket.receive())
+
+            if incoming.done():
+                event = incoming.result()
+                incoming = asyncio.ensure_future(subscription.queue.get())
+                if event.get("type") == "chat_message":
+                    await send([event["message"]])
+                else:
+                    await catch_up(last_id)
+
+            if idle:
+                if loop.time() - last_heard > 2 * CHAT_WS_HEARTBEAT:
+                    await websocket.close(code=1001)
+                    return
+                await asyncio.wait_for(send_frame({"type": "ping", "last_id": last_id}), CHAT_WS_SEND_TIMEOUT)
+    except WebSocketDisconnect:
+        pass
+    except asyncio.TimeoutError:
+        # Nem olvasó kliens: bontás, a kliens az utolsó kapott id-tól folytatja
+        if websocket.client_state != WebSocketState.DISCONNECTED:
+            await websocket.close(code=1013)
+    finally:
+        for task in (receive, incoming):
+            if task is not None:
+                task.cancel()
+        hub.unsubscribe(subscription)
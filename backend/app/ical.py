@@ -0,0 +1,196 @@
+import datetime, re
+from typing import Iterable, Iterator, Optional, Tuple
+from zoneinfo import ZoneInfo
+
+DURATION_PATTERN = re.compile(
+    r"^(?P<sign>[+-])?P(?:(?P<weeks>\d+)W)?(?:(?P<days>\d+)D)?"
+    r"(?:T(?:(?P<hours>\d+)H)?(?:(?P<minutes>\d+)M)?(?:(?P<seconds>\d+)S)?)?$"
+)
+
+
+def unfold(lines: Iterable[str]) -> Iterator[Tuple[int, str]]:
+    """RFC 5545 sor-visszahajtás: a szóközzel/tabbal kezdődő sor az előző folytatása"""
+    buffer, start = None, 0
+    for number, line in enumerate(lines, start=1):
+        line = line.rstrip("\r\n")
+        if line[:1] in (" ", "\t") and buffer is not None:
+            buffer += line[1:]
+            continue
+        if buffer is not None:
+            yield start, buffer
+        buffer, start = line, number
+    if buffer is not None:
+        yield start, buffer
+
+
+def unescape(value: str) -> str:
+    """TEXT értékek visszaalakítása"""
+    return re.sub(r"\\([\\;,nN])", lambda m: "\n" if m.group(1) in "nN" else m.group(1), value)
+
+
+def escape(value: str) -> str:
+    """TEXT értékek escape-elése"""
+    return (
+        value.replace("\\", "\\\\").replace(";", "\\;").replace(",", "\\,")
+        .replace("\r\n", "\\n").replace("\n", "\\n")
+    )
+
+
+def parse_datetime(value: str, params: dict) -> Tuple[datetime.datetime, bool]:
+    """DTSTART/DTEND értelmezése UTC időpontra; a második elem jelzi az egész napos dátumot"""
+    if params.get("VALUE") == "DATE" or len(value) == 8:
+        return datetime.datetime.strptime(value, "%Y%m%d"), True
+
+    if value.endswith("Z"):
+        parsed = datetime.datetime.strptime(value[:-1], "%Y%m%dT%H%M%S")
+        return parsed, False
+
+    parsed = datetime.datetime.strptime(value, "%Y%m%dT%H%M%S")
+    if "TZID" in params:
+        parsed = parsed.replace(tzinfo=ZoneInfo(params["TZID"]))
+        parsed = parsed.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return parsed, False
+
+
+def parse_duration(value: str) -> datetime.timedelta:
+    match = DURATION_PATTERN.match(value)
+    if not match:
+        raise ValueError(f"Érvénytelen DURATION: {value}")
+    parts = {k: int(v) for k, v in match.groupdict().items() if v and k != "sign"}
+    delta = datetime.timedelta(**parts)
+    return -delta if match.group("sign") == "-" else delta
+
+
+def parse_property(line: str) -> Tuple[str, dict, str]:
+    """NAME;PARAM=x:érték sor felbontása"""
+    head, _, value = line.partition(":")
+    name, *raw_params = head.split(";")
+    params = {}
+    for param in raw_params:
+        key, _, param_value = param.partition("=")
+        params[key.upper()] = param_value.strip('"')
+    return name.upper(), params, value
+
+
+def iter_events(lines: Iterable[str]) -> Iterator[Tuple[int, Optional[dict], Optional[str]]]:
+    """VEVENT blokkok folyamatos feldolgozása: (sorszám, esemény adatok, hibaüzenet)"""
+    current, start_line = None, 0
+    for number, line in unfold(lines):
+        if not line:
+            continue
+        name, params, value = parse_property(line)
+
+        if name == "BEGIN" and value.upper() == "VEVENT":
+            current, start_line = {}, number
+        elif name == "END" and value.upper() == "VEVENT" and current is not None:
+            yield start_line, *finish_event(current)
+            current = None
+        elif name == "EXDATE" and current is not None:
+            current.setdefault(name, []).append((params, value))
+        elif current is not None:
+            current.setdefault(name, (params, value))
+
+
+def finish_event(props: dict) -> Tuple[Optional[dict], Optional[str]]:
+    """Egy VEVENT tulajdonságaiból esemény adatok (vagy hibaüzenet)"""
+    try:
+        if "DTSTART" not in props:
+            return None, "Hiányzó DTSTART"
+        start, all_day = parse_datetime(props["DTSTART"][1], props["DTSTART"][0])
+
+        if "DTEND" in props:
+            end, _ = parse_datetime(props["DTEND"][1], props["DTEND"][0])
+        elif "DURATION" in props:
+            end = start + parse_duration(props["DURATION"][1])
+        else:
+            end = start + (datetime.timedelta(days=1) if all_day else datetime.timedelta())
+
+        exdates = [
+            parse_datetime(value, params)[0].isoformat()
+            for params, values in props.get("EXDATE", [])
+            for value in values.split(",")
+        ]
+    except (ValueError, KeyError) as e:
+        return None, f"Érvénytelen időpont: {e}"
+
+    return {
+        "title": unescape(props.get("SUMMARY", ({}, ""))[1]),
+        "description": unescape(props.get("DESCRIPTION", ({}, ""))[1]) or None,
+        "start_date": start,
+        "end_date": end,
+        "is_public": props.get("CLASS", ({}, ""))[1].upper() == "PUBLIC",
+        "rrule": props.get("RRULE", ({}, None))[1],
+        "exdates": ",".join(exdates) or None,
+    }, None
+
+
+def fold(line: str) -> str:
+    """Sorok hajtogatása 75 oktetenként (UTF-8 karakterhatáron)"""
+    encoded = line.encode()
+    if len(encoded) <= 75:
+        return line + "\r\n"
+
+    parts, current, size, limit = [], [], 0, 75
+    for char in line:
+        char_size = len(char.encode())
+        if size + char_size > limit:
+            parts.append("".join(current))
+            current, size, limit = [], 0, 74
+        current.append(char)
+        size += char_size
+    parts.append("".join(current))
+    return "\r\n ".join(parts) + "\r\n"
+
+
+def format_datetime(value: datetime.datetime) -> str:
+    """UTC időpont iCalendar formában"""
+    return value.strftime("%Y%m%dT%H%M%SZ")
+
+
+def calendar_header(name: str) -> str:
+    return (
+        "BEGIN:VCALENDAR\r\n"
+        "VERSION:2.0\r\n"
+        "PRODID:-//UCC//Esemenykezelo//HU\r\n"
+        "CALSCALE:GREGORIAN\r\n"
+        + fold(f"X-WR-CALNAME:{escape(name)}")
+    )
+
+
+def calendar_footer() -> str:
+    return "END:VCALENDAR\r\n"
+
+
+def format_event(
+    event_id: int,
+    title: str,
+    start: datetime.datetime,
+    end: datetime.datetime,
+    stamp: datetime.datetime,
+    description: Optional[str] = None,
+    url: Optional[str] = None,
+    is_public: bool = False,
+    sequence: int = 0,
+    rrule: Optional[str] = None,
+    exdates: Iterable[datetime.datetime] = ()
+) -> str:
+    """Egy VEVENT blokk (ismétlődő sorozatnál RRULE/EXDATE sorokkal)"""
+    lines = [
+        "BEGIN:VEVENT",
+        f"UID:event-{event_id}@ucc-event-app",
+        f"DTSTAMP:{format_datetime(stamp)}",
+        f"DTSTART:{format_datetime(start)}",
+        f"DTEND:{format_datetime(end)}",
+        f"SEQUENCE:{sequence}",
+        f"SUMMARY:{escape(title)}",
+        f"CLASS:{'PUBLIC' if is_public else 'PRIVATE'}",
+    ]
+    if rrule:
+        lines.append(f"RRULE:{rrule}")
+        lines.extend(f"EXDATE:{format_datetime(exdate)}" for exdate in sorted(exdates))
+    if description:
+        lines.append(f"DESCRIPTION:{escape(description)}")
+    if url:
+        lines.append(f"URL:{url}")
+    lines.append("END:VEVENT")
+    return "".join(fold(line) for line in lines)
@@ -1,13 +1,20 @@
-import uvicorn, os
+import uvicorn, os, asyncio
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
 from .config import ALLOWED_ORIGINS
-from .utils import create_tables, create_admin_user
+from .migrations import run_migrations, apply_online_migrations
 from app import auth, events, chat, voice
 from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
 from starlette.middleware.base import BaseHTTPMiddleware
 from .rate_limiter import limiter
+from .pubsub import hub
+from .database import async_engine
+from .dependencies import listen_user_invalidations
+from .sessions import load_revoked_sessions, listen_revocations, session_sweeper
+from .user_directory import user_directory, listen_directory_changes
+from .user_provisioning import shutdown_process_pool
+from .chat_archive import chat_archiver
 from google import genai
 
 
@@ -28,6 +35,7 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "ETag"],
 )
 
 class SecurityHeadersMiddleware(BaseHTTPMiddleware):
@@ -49,9 +57,33 @@ app.include_router(voice.router)
 
 @app.on_event("startup")
 def on_startup():
-    """Alkalmazás indulásakor futó műveletek"""
-    create_tables()
-    create_admin_user()
+    """Alkalmazás indulásakor futó műveletek (naprakész sémánál egyetlen verzió-lekérdezés)"""
+    app.state.online_migrations = run_migrations()
+    load_revoked_sessions()
+
+
+@app.on_event("startup")
+async def start_background_tasks():
+    """Pub/sub hub és háttér-feladatok indítása (online migrációk, keresőindex, érvénytelenítés-figyelők, munkamenet söprő, chat archiválás)"""
+    await hub.start()
+    app.state.background_tasks = [
+        asyncio.create_task(apply_online_migrations(app.state.online_migrations)),
+        asyncio.create_task(asyncio.to_thread(user_directory.load)),
+        asyncio.create_task(listen_user_invalidations()),
+        asyncio.create_task(listen_revocations()),
+        asyncio.create_task(listen_directory_changes()),
+        asyncio.create_task(session_sweeper()),
+        asyncio.create_task(chat_archiver()),
+    ]
+
+
+@app.on_event("shutdown")
+async def stop_background_tasks():
+    for task in app.state.background_tasks:
+        task.cancel()
+    await hub.stop()
+    shutdown_process_pool()
+    await async_engine.dispose()
 
 
 @app.get("/", tags=["Root"])
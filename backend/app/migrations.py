@@ -0,0 +1,302 @@
+import asyncio, datetime
+from contextlib import contextmanager
+from typing import Callable, List, NamedTuple
+from sqlalchemy import inspect, literal
+from sqlalchemy.engine import Connection
+from sqlalchemy.exc import OperationalError
+from sqlmodel import select, insert, update, text, SQLModel
+from .database import engine
+from .models import SchemaVersion, User, Event, EventParticipant, ChatArchiveEntry, ChatMessage, ChatSession
+from .dependencies import get_password_hash, split_participants
+from .config import ADMIN_USERNAME, ADMIN_PASSWORD
+from .utils import to_utc
+
+
+class Migration(NamedTuple):
+    """
+    Egy sémaverzió: az online migráció (indexépítés) induláskor nem fut, hanem a háttérben,
+    lépésenként külön rövid tranzakcióban, miközben a worker már kiszolgál
+    """
+    version: int
+    name: str
+    apply: Callable[[Connection], None]
+    online: bool = False
+
+
+@contextmanager
+def immediate_transaction(connection: Connection):
+    """
+    BEGIN IMMEDIATE ... COMMIT egy autocommit kapcsolaton: a DDL is tranzakcióban fut, és a
+    párhuzamosan induló workerek közül egyszerre csak egy migrál (a többi a busy_timeout-ig vár)
+    """
+    connection.exec_driver_sql("BEGIN IMMEDIATE")
+    try:
+        yield connection
+    except BaseException:
+        connection.exec_driver_sql("ROLLBACK")
+        raise
+    connection.exec_driver_sql("COMMIT")
+
+
+def create_tables(connection: Connection):
+    """Hiányzó táblák létrehozása (a meglévő táblák és indexeik érintetlenek maradnak)"""
+    SQLModel.metadata.create_all(connection, checkfirst=True)
+
+
+def add_missing_columns(connection: Connection):
+    """Új modellmezők felvétele oszlopként a már létező táblákba"""
+    inspector = inspect(connection)
+    for table in SQLModel.metadata.sorted_tables:
+        existing = {column["name"] for column in inspector.get_columns(table.name)}
+
+        for column in table.columns:
+            if column.name in existing:
+                continue
+
+            ddl = f'ALTER TABLE "{table.name}" ADD COLUMN "{column.name}" {column.type.compile(connection.dialect)}'
+            if column.default is not None and column.default.is_scalar:
+                default = literal(column.default.arg).compile(
+                    dialect=connection.dialect,
+                    compile_kwargs={"literal_binds": True}
+                )
+                ddl += f" DEFAULT {default}"
+
+            connection.execute(text(ddl))
+            print(f"Új oszlop: {table.name}.{column.name}")
+
+
+def migrate_participants(connection: Connection):
+    """A vesszős résztvevő szövegek áttöltése a kapcsolótáblába"""
+    if connection.execute(select(EventParticipant.event_id).limit(1)).first():
+        return
+
+    rows = connection.execute(
+        select(Event.id, Event.participants).where(Event.participants != None)
+    ).all()
+    links = [
+        {"event_id": event_id, "username": username}
+        for event_id, participants in rows
+        for username in split_participants(participants)
+    ]
+
+    if links:
+        connection.execute(insert(EventParticipant), links)
+        print(f"Résztvevők migrálva: {len(links)} kapcsolat")
+
+
+def migrate_participant_counts(connection: Connection):
+    """A résztvevő számláló feltöltése a kapcsolótáblából"""
+    result = connection.execute(text(
+        "UPDATE event SET participant_count = "
+        "(SELECT COUNT(*) FROM eventparticipant WHERE eventparticipant.event_id = event.id) "
+        "WHERE participant_count = 0 "
+        "AND EXISTS (SELECT 1 FROM eventparticipant WHERE eventparticipant.event_id = event.id)"
+    ))
+    if result.rowcount:
+        print(f"Résztvevő számlálók migrálva: {result.rowcount} esemény")
+
+
+def migrate_event_dates(connection: Connection):
+    """A szöveges (ISO) dátumok átírása típusos UTC időpontokra"""
+    pattern = "[0-9][0-9][0-9][0-9]-[0-9][0-9]-[0-9][0-9] [0-9][0-9]:[0-9][0-9]:[0-9][0-9]*"
+    rows = connection.execute(
+        text(
+            "SELECT id, start_date, end_date FROM event "
+            "WHERE start_date NOT GLOB :p OR end_date NOT GLOB :p"
+        ),
+        {"p": pattern}
+    ).all()
+
+    for event_id, start_date, end_date in rows:
+        connection.execute(
+            update(Event).where(Event.id == event_id).values(
+                start_date=to_utc(start_date),
+                end_date=to_utc(end_date)
+            )
+        )
+    if rows:
+        print(f"Esemény dátumok migrálva: {len(rows)} sor")
+
+
+def clear_legacy_reset_tokens(connection: Connection):
+    """A user táblában nyers szövegként tárolt régi visszaállító kódok törlése"""
+    columns = {column["name"] for column in inspect(connection).get_columns("user")}
+    if "reset_token" not in columns:
+        return
+    result = connection.execute(text('UPDATE "user" SET reset_token = NULL WHERE reset_token IS NOT NULL'))
+    if result.rowcount:
+        print(f"Régi visszaállító kódok törölve: {result.rowcount}")
+
+
+def create_admin_user(connection: Connection):
+    """Admin felhasználó létrehozása, ha még nem létezik"""
+    if connection.execute(select(User.id).where(User.username == ADMIN_USERNAME)).first():
+        print("Admin már létezik")
+        return
+    connection.execute(insert(User).values(
+        username=ADMIN_USERNAME,
+        hashed_password=get_password_hash(ADMIN_PASSWORD),
+        role="admin",
+        mfa_enabled=False
+    ))
+    print(f"Admin létrehozva: {ADMIN_USERNAME}")
+
+
+def create_indexes(connection: Connection):
+    """A modellekben deklarált, de az adatbázisban még hiányzó indexek felépítése, indexenként külön tranzakcióban"""
+    # sqlite_master-ből: a reflexió a kifejezés-indexeket kihagyja
+    existing = set(connection.exec_driver_sql("SELECT name FROM sqlite_master WHERE type = 'index'").scalars())
+    for table in SQLModel.metadata.sorted_tables:
+        for index in table.indexes:
+            if index.name in existing:
+                continue
+            with immediate_transaction(connection):
+                index.create(connection)
+            print(f"Index létrehozva: {index.name}")
+
+    # A (session_id, timestamp) index előtagja kiváltja a régi egyoszlopos indexet
+    with immediate_transaction(connection):
+        connection.execute(text("DROP INDEX IF EXISTS ix_chatmessage_session_id"))
+
+
+def create_chat_archive_table(connection: Connection):
+    """Az archivált beszélgetések offset-indexe"""
+    ChatArchiveEntry.__table__.create(connection, checkfirst=True)
+
+
+def create_chat_sessions(connection: Connection):
+    """Beszélgetés összesítő tábla, feltöltve a meglévő üzenetek utolsó állapotából"""
+    ChatSession.__table__.create(connection, checkfirst=True)
+    result = connection.execute(text(
+        "INSERT OR IGNORE INTO chatsession "
+        "(session_id, status, needs_human, last_message_at, last_message_id, last_sender, unread_count, archived_through_id) "
+        "SELECT m.session_id, "
+        "CASE WHEN m.sender = 'admin' THEN 'admin' WHEN m.sender = 'system' THEN 'resolved' "
+        "WHEN m.needs_human THEN 'waiting' ELSE 'ai' END, "
+        "m.needs_human, m.timestamp, m.id, m.sender, 0, "
+        "COALESCE((SELECT MAX(a.last_id) FROM chatarchiveentry a WHERE a.session_id = m.session_id), 0) "
+        "FROM chatmessage m "
+        "JOIN (SELECT session_id, MAX(id) AS last_id FROM chatmessage GROUP BY session_id) latest "
+        "ON m.id = latest.last_id"
+    ))
+    if result.rowcount:
+        print(f"Beszélgetés összesítők feltöltve: {result.rowcount}")
+
+
+def migrate_participant_dates(connection: Connection):
+    """Az esemény időpontjainak (kezdés, vége, sorozat vége) átmásolása a résztvevő-kapcsolatokba"""
+    add_missing_columns(connection)
+    result = connection.execute(text(
+        "UPDATE eventparticipant SET (start_date, end_date, series_end) = "
+        "(SELECT start_date, end_date, series_end FROM event WHERE event.id = eventparticipant.event_id) "
+        "WHERE start_date IS NULL"
+    ))
+    if result.rowcount:
+        print(f"Résztvevő időpontok migrálva: {result.rowcount} kapcsolat")
+
+
+def rebuild_chat_messages(connection: Connection):
+    """
+    A chatmessage tábla újraépítése AUTOINCREMENT kulccsal: az archiválás törli a legnagyobb azonosítójú
+    üzeneteket is, amelyeket a sima rowid újra kiosztana (az after_id kurzorok és az archivált határ elcsúszna)
+    """
+    ddl = connection.exec_driver_sql(
+        "SELECT sql FROM sqlite_master WHERE type = 'table' AND name = 'chatmessage'"
+    ).scalar()
+    if ddl is None or "AUTOINCREMENT" in ddl.upper():
+        return
+
+    table = ChatMessage.__table__
+    columns = ", ".join(f'"{column.name}"' for column in table.columns)
+    connection.exec_driver_sql("ALTER TABLE chatmessage RENAME TO chatmessage_old")
+    for index in table.indexes:
+        connection.exec_driver_sql(f"DROP INDEX IF EXISTS {index.name}")
+    table.create(connection)
+    connection.exec_driver_sql(f"INSERT INTO chatmessage ({columns}) SELECT {columns} FROM chatmessage_old")
+    connection.exec_driver_sql("DROP TABLE chatmessage_old")
+
+    # A már archivált (a táblából törölt) azonosítók se kerüljenek újra kiosztásra
+    connection.exec_driver_sql("DELETE FROM sqlite_sequence WHERE name = 'chatmessage'")
+    connection.exec_driver_sql(
+        "INSERT INTO sqlite_sequence (name, seq) SELECT 'chatmessage', MAX(seq) FROM ("
+        "SELECT COALESCE(MAX(id), 0) AS seq FROM chatmessage "
+        "UNION ALL SELECT COALESCE(MAX(last_id), 0) FROM chatarchiveentry "
+        "UNION ALL SELECT COALESCE(MAX(last_message_id), 0) FROM chatsession)"
+    )
+    print("Chat üzenet tábla újraépítve (AUTOINCREMENT)")
+
+
+# Sorrendben alkalmazandó sémaverziók - új változás mindig új verziót kap, a régiek nem módosulnak
+MIGRATIONS: List[Migration] = [
+    Migration(1, "táblák létrehozása", create_tables),
+    Migration(2, "hiányzó oszlopok", add_missing_columns),
+    Migration(3, "résztvevő kapcsolótábla", migrate_participants),
+    Migration(4, "résztvevő számlálók", migrate_participant_counts),
+    Migration(5, "típusos esemény dátumok", migrate_event_dates),
+    Migration(6, "régi visszaállító kódok törlése", clear_legacy_reset_tokens),
+    Migration(7, "admin felhasználó", create_admin_user),
+    Migration(8, "indexek (tulajdonos, nyilvános, dátumok, chat munkamenet + időpont)", create_indexes, online=True),
+    Migration(9, "chat archívum index", create_chat_archive_table),
+    Migration(10, "beszélgetés összesítők", create_chat_sessions),
+    Migration(11, "ütközésvizsgálat indexei (esemény hossza, sorozatok)", create_indexes, online=True),
+    Migration(12, "felhasználói feed titok", add_missing_columns),
+    Migration(13, "résztvevők foglaltsági időpontjai", migrate_participant_dates),
+    Migration(14, "foglaltság indexei (résztvevő + kezdés, hossz, sorozatok)", create_indexes, online=True),
+    Migration(15, "chat üzenet azonosítók újrahasznosítás nélkül", rebuild_chat_messages),
+    Migration(16, "listázás indexei (tulajdonos + kezdés, nyilvános hossz és sorozatok, résztvevő + kezdés)", create_indexes, online=True),
+]
+
+
+def applied_versions(connection: Connection) -> set:
+    """Az alkalmazott verziók egyetlen lekérdezéssel (üres halmaz, ha még nincs verziótábla)"""
+    try:
+        return set(connection.execute(select(SchemaVersion.version)).scalars().all())
+    except OperationalError:
+        return set()
+
+
+def record_version(connection: Connection, migration: Migration):
+    SchemaVersion.__table__.create(connection, checkfirst=True)
+    connection.execute(insert(SchemaVersion).values(
+        version=migration.version,
+        name=migration.name,
+        applied_at=datetime.datetime.utcnow()
+    ))
+    print(f"Séma migrálva: {migration.version} ({migration.name})")
+
+
+def run_migrations(online: bool = False) -> List[Migration]:
+    """
+    Függőben lévő migrációk futtatása verziósorrendben (online=False: induláskori, blokkoló lépések).
+    Naprakész adatbázisnál ez egyetlen verzió-lekérdezés; a visszatérési érték a még hiányzó online migrációk listája.
+    """
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        applied = applied_versions(connection)
+        pending = [m for m in MIGRATIONS if m.version not in applied]
+        for migration in pending:
+            if migration.online != online:
+                continue
+            if migration.online:
+                # Az online lépés maga kezeli a tranzakcióit, hogy egy index építése se tartsa sokáig az írási zárat
+                migration.apply(connection)
+                with immediate_transaction(connection):
+                    if migration.version not in applied_versions(connection):
+                        record_version(connection, migration)
+                continue
+            with immediate_transaction(connection):
+                # Egy másik worker közben már alkalmazhatta
+                if migration.version in applied_versions(connection):
+                    continue
+                migration.apply(connection)
+                record_version(connection, migration)
+        return [m for m in pending if m.online and not online]
+
+
+async def apply_online_migrations(pending: List[Migration]):
+    """Háttér-feladat: a függő online migrációk (indexépítés) lefuttatása; hiba esetén a következő induláskor újra próbálja"""
+    if not pending:
+        return
+    try:
+        await asyncio.to_thread(run_migrations, True)
+    except OperationalError as e:
+        print(f"Online migráció elhalasztva: {e}")
@@ -1,6 +1,13 @@
 import datetime
 from typing import Optional
-from sqlmodel import SQLModel, Field
+from sqlmodel import SQLModel, Field, Index, text
+
+
+class SchemaVersion(SQLModel, table=True):
+    """Alkalmazott sémamigrációk (app.migrations) - induláskor csak ezt a táblát kell lekérdezni"""
+    version: int = Field(primary_key=True)
+    name: str
+    applied_at: datetime.datetime = Field(default_factory=datetime.datetime.utcnow)
 
 
 class User(SQLModel, table=True):
@@ -9,30 +16,154 @@ class User(SQLModel, table=True):
     username: str = Field(index=True, unique=True)
     hashed_password: str
     role: str = "admin"
-    reset_token: Optional[str] = None
     mfa_secret: Optional[str] = None
     mfa_enabled: bool = False
+    # A naptár-feed tokenek titkának SHA-256 lenyomata (cserével / jelszó-visszaállítással a régi feed URL-ek érvénytelenek)
+    feed_secret_hash: Optional[str] = None
+
+
+class PasswordResetToken(SQLModel, table=True):
+    """Jelszó-visszaállító token - kulcsa a token SHA-256 lenyomata, a nyers token nincs tárolva"""
+    token_hash: str = Field(primary_key=True)
+    username: str = Field(index=True)
+    created_at: datetime.datetime = Field(default_factory=datetime.datetime.utcnow)
+    expires_at: datetime.datetime = Field(index=True)
+
+
+class UserSession(SQLModel, table=True):
+    """Bejelentkezési munkamenet - a refresh token csak SHA-256 lenyomatként tárolva"""
+    id: Optional[int] = Field(default=None, primary_key=True)
+    username: str = Field(index=True)
+    token_hash: str = Field(index=True, unique=True)
+    family_id: str = Field(index=True)
+    created_at: datetime.datetime = Field(default_factory=datetime.datetime.utcnow)
+    expires_at: datetime.datetime = Field(index=True)
+    rotated_at: Optional[datetime.datetime] = None
+    revoked_at: Optional[datetime.datetime] = Field(default=None, index=True)
 
 
 class Event(SQLModel, table=True):
-    """Esemény modell"""
+    """Esemény modell (időpontok UTC-ben tárolva)"""
+    __table_args__ = (
+        Index("ix_event_owner_start_end", "owner", "start_date", "end_date"),
+        # Tulajdonos naptárának listázása (start_date, id) sorrendben, rendezés nélkül
+        Index("ix_event_owner_start_id", "owner", "start_date", "id"),
+        Index("ix_event_public_start", "is_public", "start_date"),
+        Index("ix_event_public_version", "is_public", "version"),
+        # Tulajdonosonként a leghosszabb alkalom (napokban) egyetlen index-olvasással - az ütközéskeresés alsó korlátja
+        Index("ix_event_owner_duration", "owner", text("(julianday(end_date) - julianday(start_date))")),
+        Index("ix_event_owner_series", "owner", "series_end", sqlite_where=text("rrule IS NOT NULL")),
+        # A nyilvános listázás ablakának ugyanez a két tartománya
+        Index("ix_event_public_duration", "is_public", text("(julianday(end_date) - julianday(start_date))")),
+        Index("ix_event_public_series", "is_public", "series_end", sqlite_where=text("rrule IS NOT NULL")),
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
     title: str
-    start_date: str
-    end_date: str
+    start_date: datetime.datetime
+    end_date: datetime.datetime
     description: Optional[str] = None
     owner: Optional[str] = None
     participants: Optional[str] = None
     is_meeting: bool = False
     meeting_link: Optional[str] = None
     is_public: bool = False
+    version: int = 0
+    rrule: Optional[str] = None
+    exdates: Optional[str] = None
+    series_end: Optional[datetime.datetime] = None
+    capacity: Optional[int] = None
+    participant_count: int = 0
+
+
+class EventChange(SQLModel, table=True):
+    """Esemény változásnapló - az azonosító a monoton növekvő változásverzió"""
+    __table_args__ = (
+        Index("ix_eventchange_public_id", "public", "id"),
+        Index("ix_eventchange_owner_id", "owner", "id"),
+        {"sqlite_autoincrement": True},
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    event_id: Optional[int] = Field(default=None, index=True)
+    owner: Optional[str] = None
+    public: bool = False
+    removed: bool = False
+    changed_at: datetime.datetime = Field(default_factory=datetime.datetime.utcnow)
+
+
+class EventParticipant(SQLModel, table=True):
+    """Esemény résztvevő kapcsolótábla - az esemény időpontjai ide másolva, a foglaltság az esemény tábla nélkül olvasható"""
+    __table_args__ = (
+        # Fedő index: az egyszeri alkalmak foglaltsága sorkeresés nélkül
+        Index("ix_eventparticipant_user_start", "username", "start_date", "end_date", "series_end"),
+        # Felhasználónként a leghosszabb alkalom egyetlen index-olvasással - a foglaltság-lekérdezés alsó korlátja
+        Index("ix_eventparticipant_user_duration", "username", text("(julianday(end_date) - julianday(start_date))")),
+        Index("ix_eventparticipant_user_series", "username", "series_end", sqlite_where=text("series_end IS NOT NULL")),
+        # A saját naptár listázása (start_date, event_id) sorrendben, rendezés nélkül
+        Index("ix_eventparticipant_user_start_event", "username", "start_date", "event_id"),
+    )
+
+    event_id: int = Field(foreign_key="event.id", primary_key=True)
+    username: str = Field(primary_key=True, index=True)
+    start_date: Optional[datetime.datetime] = None
+    end_date: Optional[datetime.datetime] = None
+    series_end: Optional[datetime.datetime] = None
+
+
+class EventWaitlist(SQLModel, table=True):
+    """Várólista betelt eseményekhez - az azonosító a jelentkezési sorrend"""
+    __table_args__ = (
+        Index("ix_eventwaitlist_event_user", "event_id", "username", unique=True),
+        {"sqlite_autoincrement": True},
+    )
+
+    id: Optional[int] = Field(default=None, primary_key=True)
+    event_id: int = Field(foreign_key="event.id")
+    username: str
+    created_at: datetime.datetime = Field(default_factory=datetime.datetime.utcnow)
 
 
 class ChatMessage(SQLModel, table=True):
-    """Chat üzenet modell"""
+    """Chat üzenet modell - az azonosító az archivált (törölt) üzenetek után sem használódik újra"""
+    __table_args__ = (
+        Index("ix_chatmessage_session_timestamp", "session_id", "timestamp"),
+        Index("ix_chatmessage_timestamp", "timestamp"),
+        {"sqlite_autoincrement": True},
+    )
+
     id: Optional[int] = Field(default=None, primary_key=True)
-    session_id: str = Field(index=True)
+    session_id: str
     sender: str
     message: str
     timestamp: datetime.datetime = Field(default_factory=datetime.datetime.utcnow)
     needs_human: bool = False
+
+
+class ChatSession(SQLModel, table=True):
+    """Beszélgetés összesítő a support sorhoz - minden üzenet beszúrásával azonos tranzakcióban frissül (app.helpdesk)"""
+    __table_args__ = (
+        Index("ix_chatsession_queue", "needs_human", "last_message_at", "session_id"),
+    )
+
+    session_id: str = Field(primary_key=True)
+    status: str = "ai"
+    needs_human: bool = False
+    last_message_at: datetime.datetime
+    last_message_id: int
+    last_sender: str
+    unread_count: int = 0
+    archived_through_id: int = 0
+
+
+class ChatArchiveEntry(SQLModel, table=True):
+    """Archivált beszélgetés helye a tömörített szegmensfájlokban (app.chat_archive) - egy gzip tag offsetje és hossza"""
+    id: Optional[int] = Field(default=None, primary_key=True)
+    session_id: str = Field(index=True)
+    segment: str
+    offset: int
+    length: int
+    message_count: int
+    first_id: int
+    last_id: int
+    archived_at: datetime.datetime = Field(default_factory=datetime.datetime.utcnow)
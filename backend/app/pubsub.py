@@ -0,0 +1,189 @@
+import asyncio, json, sqlite3, time, uuid
+from typing import Dict, Iterable, List, Set
+from .config import PUBSUB_BACKEND, PUBSUB_DATABASE
+
+
+class Subscription:
+    """Egy kliens feliratkozása - korlátos sor, túlcsordulásnál resync jelzéssel"""
+
+    def __init__(self, topics: Iterable[str], maxsize: int):
+        self.topics = set(topics)
+        self.queue: asyncio.Queue = asyncio.Queue(maxsize)
+
+    def offer(self, message: dict):
+        """Üzenet sorba tétele blokkolás nélkül (lassú fogyasztónál resync)"""
+        try:
+            self.queue.put_nowait(message)
+        except asyncio.QueueFull:
+            # A lemaradt kliensnek úgyis újra kell töltenie az állapotot
+            while not self.queue.empty():
+                self.queue.get_nowait()
+            self.queue.put_nowait({"type": "resync"})
+
+    async def get(self, timeout: float) -> dict:
+        """Következő üzenet; időtúllépésnél asyncio.TimeoutError"""
+        return await asyncio.wait_for(self.queue.get(), timeout)
+
+
+class LocalBackend:
+    """Folyamaton belüli backend - az üzenet azonnal a helyi hubhoz kerül"""
+
+    hub: "Hub"
+
+    async def start(self):
+        pass
+
+    async def stop(self):
+        pass
+
+    def publish(self, topics: list, message: dict):
+        self.hub.dispatch(topics, message)
+
+
+class SQLiteBackend:
+    """Több worker közös backendje egy megosztott SQLite üzenettáblán keresztül"""
+
+    def __init__(self, path: str, poll_interval: float = 0.2, retention: float = 60.0, prune_interval: float = 30.0):
+        self.path = path
+        self.poll_interval = poll_interval
+        self.retention = retention
+        self.prune_interval = prune_interval
+        self.origin = uuid.uuid4().hex
+        self.pending: List[tuple] = []
+        self.wakeup = asyncio.Event()
+        self.closing = False
+        self.task = None
+        self.writer_task = None
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, timeout=5, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS pubsub_message ("
+            "id INTEGER PRIMARY KEY AUTOINCREMENT, origin TEXT, topics TEXT, "
+            "payload TEXT, created REAL)"
+        )
+        return connection
+
+    async def start(self):
+        self.reader = self._connect()
+        self.writer = self._connect()
+        self.last_id = self.reader.execute("SELECT COALESCE(MAX(id), 0) FROM pubsub_message").fetchone()[0]
+        self.next_prune = time.monotonic() + self.prune_interval
+        self.closing = False
+        self.task = asyncio.create_task(self._poll())
+        self.writer_task = asyncio.create_task(self._write())
+        if self.pending:
+            self.wakeup.set()
+
+    async def stop(self):
+        if self.task:
+            self.task.cancel()
+            # Az író még kiírja a függő üzeneteket, utána áll le
+            self.closing = True
+            self.wakeup.set()
+            await self.writer_task
+            self.reader.close()
+            self.writer.close()
+            self.task = self.writer_task = None
+
+    def publish(self, topics: list, message: dict):
+        """Helyi kézbesítés azonnal; a többi workernek szóló sort az író feladat írja ki, nem az eseményhurok"""
+        self.pending.append((self.origin, json.dumps(topics), json.dumps(message, default=str), time.time()))
+        self.wakeup.set()
+        self.hub.dispatch(topics, message)
+
+    def _insert(self, batch: list):
+        with self.writer:
+            self.writer.executemany(
+                "INSERT INTO pubsub_message (origin, topics, payload, created) VALUES (?, ?, ?, ?)", batch
+            )
+
+    async def _write(self):
+        """Egyetlen író feladat workerenként: a közben összegyűlt publikálások egy tranzakcióban, szálon íródnak ki"""
+        while True:
+            await self.wakeup.wait()
+            self.wakeup.clear()
+            batch, self.pending = self.pending, []
+            if batch:
+                try:
+                    await asyncio.to_thread(self._insert, batch)
+                except sqlite3.Error as e:
+                    print(f"Pub/sub hiba: {e}")
+            if self.closing and not self.pending:
+                return
+
+    def _fetch(self, prune: bool):
+        rows = self.reader.execute(
+            "SELECT id, origin, topics, payload FROM pubsub_message WHERE id > ? ORDER BY id",
+            (self.last_id,)
+        ).fetchall()
+        if prune:
+            with self.reader:
+                self.reader.execute("DELETE FROM pubsub_message WHERE created < ?", (time.time() - self.retention,))
+        return rows
+
+    async def _poll(self):
+        """Egyetlen háttér-feladat workerenként, nem kliensenként; a régi sorok törlése ritkább, saját ütemezéssel"""
+        while True:
+            prune = time.monotonic() >= self.next_prune
+            if prune:
+                self.next_prune = time.monotonic() + self.prune_interval
+            try:
+                for message_id, origin, topics, payload in await asyncio.to_thread(self._fetch, prune):
+                    self.last_id = message_id
+                    if origin != self.origin:
+                        self.hub.dispatch(json.loads(topics), json.loads(payload))
+            except sqlite3.Error as e:
+                print(f"Pub/sub hiba: {e}")
+            await asyncio.sleep(self.poll_interval)
+
+
+class Hub:
+    """Téma alapú pub/sub hub - egy publikálás egy lépésben jut el minden feliratkozóhoz"""
+
+    def __init__(self, backend):
+        self.backend = backend
+        self.backend.hub = self
+        self._topics: Dict[str, Set[Subscription]] = {}
+
+    async def start(self):
+        await self.backend.start()
+
+    async def stop(self):
+        await self.backend.stop()
+
+    def subscribe(self, topics: Iterable[str], maxsize: int = 100) -> Subscription:
+        subscription = Subscription(topics, maxsize)
+        for topic in subscription.topics:
+            self._topics.setdefault(topic, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription: Subscription):
+        for topic in subscription.topics:
+            subscribers = self._topics.get(topic)
+            if subscribers is not None:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._topics[topic]
+
+    def publish(self, topics: Iterable[str], message: dict):
+        self.backend.publish(list(topics), message)
+
+    def dispatch(self, topics: Iterable[str], message: dict):
+        """Helyi kézbesítés; több témára feliratkozott kliens is csak egyszer kapja meg"""
+        targets = set()
+        for topic in topics:
+            targets.update(self._topics.get(topic, ()))
+        for subscription in targets:
+            subscription.offer(message)
+
+
+def create_backend():
+    """Backend kiválasztása a PUBSUB_BACKEND környezeti változó alapján"""
+    if PUBSUB_BACKEND == "sqlite":
+        return SQLiteBackend(PUBSUB_DATABASE)
+    return LocalBackend()
+
+
+hub = Hub(create_backend())
@@ -0,0 +1,138 @@
+import sqlite3, threading, time
+from math import floor
+from urllib.parse import urlparse, parse_qs
+from limits.storage import Storage
+from limits.storage.base import SlidingWindowCounterSupport, TimestampedSlidingWindow
+
+
+class SQLiteStorage(Storage, SlidingWindowCounterSupport, TimestampedSlidingWindow):
+    """
+    Több worker közös rate limit tárolója egy SQLite fájlban (Redis nélkül)
+
+    A számlálók lemezen vannak, így a memóriahasználat nem nő a kliens IP-k számával;
+    a lejárt kulcsokat időszakos söprés törli. URI: sqlite:///ratelimit.db?sweep_interval=60
+    """
+
+    STORAGE_SCHEME = ["sqlite"]
+
+    def __init__(self, uri: str, wrap_exceptions: bool = False, sweep_interval: float = 60, **options):
+        parsed = urlparse(uri)
+        query = parse_qs(parsed.query)
+        self.path = parsed.path[1:] if parsed.path.startswith("/") else parsed.path
+        self.sweep_interval = float(query.get("sweep_interval", [sweep_interval])[0])
+        self.next_sweep = 0.0
+        self._lock = threading.Lock()
+        self._connection = self._connect()
+        super().__init__(uri, wrap_exceptions=wrap_exceptions, **options)
+
+    def _connect(self) -> sqlite3.Connection:
+        connection = sqlite3.connect(self.path, timeout=5, isolation_level=None, check_same_thread=False)
+        connection.execute("PRAGMA journal_mode=WAL")
+        connection.execute("PRAGMA synchronous=NORMAL")
+        connection.execute(
+            "CREATE TABLE IF NOT EXISTS ratelimit_counter ("
+            "key TEXT PRIMARY KEY, count INTEGER NOT NULL, expires REAL NOT NULL) WITHOUT ROWID"
+        )
+        connection.execute("CREATE INDEX IF NOT EXISTS ix_ratelimit_counter_expires ON ratelimit_counter (expires)")
+        return connection
+
+    @property
+    def base_exceptions(self):
+        return sqlite3.Error
+
+    def _sweep(self, now: float):
+        """Lejárt kulcsok törlése legfeljebb sweep_interval másodpercenként"""
+        if now >= self.next_sweep:
+            self.next_sweep = now + self.sweep_interval
+            self._connection.execute("DELETE FROM ratelimit_counter WHERE expires <= ?", (now,))
+
+    def _incr(self, key: str, expiry: float, amount: int, now: float) -> int:
+        return self._connection.execute(
+            "INSERT INTO ratelimit_counter (key, count, expires) VALUES (?1, ?2, ?3) "
+            "ON CONFLICT(key) DO UPDATE SET "
+            "count = CASE WHEN expires <= ?4 THEN excluded.count ELSE count + excluded.count END, "
+            "expires = CASE WHEN expires <= ?4 THEN excluded.expires ELSE expires END "
+            "RETURNING count",
+            (key, amount, now + expiry, now)
+        ).fetchone()[0]
+
+    def _get(self, key: str, now: float) -> int:
+        row = self._connection.execute(
+            "SELECT count FROM ratelimit_counter WHERE key = ? AND expires > ?", (key, now)
+        ).fetchone()
+        return row[0] if row else 0
+
+    def incr(self, key: str, expiry: int, amount: int = 1) -> int:
+        now = time.time()
+        with self._lock:
+            self._sweep(now)
+            return self._incr(key, expiry, amount, now)
+
+    def get(self, key: str) -> int:
+        with self._lock:
+            return self._get(key, time.time())
+
+    def get_expiry(self, key: str) -> float:
+        now = time.time()
+        with self._lock:
+            row = self._connection.execute(
+                "SELECT expires FROM ratelimit_counter WHERE key = ? AND expires > ?", (key, now)
+            ).fetchone()
+        return row[0] if row else now
+
+    def check(self) -> bool:
+        try:
+            with self._lock:
+                self._connection.execute("SELECT 1").fetchone()
+            return True
+        except sqlite3.Error:
+            return False
+
+    def reset(self) -> int:
+        with self._lock:
+            return self._connection.execute("DELETE FROM ratelimit_counter").rowcount
+
+    def clear(self, key: str) -> None:
+        with self._lock:
+            self._connection.execute("DELETE FROM ratelimit_counter WHERE key = ?", (key,))
+
+    def _window(self, previous_key: str, current_key: str, expiry: int, now: float):
+        previous_count = self._get(previous_key, now)
+        current_count = self._get(current_key, now)
+        previous_ttl = (1 - (((now - expiry) / expiry) % 1)) * expiry if previous_count else 0.0
+        current_ttl = (1 - ((now / expiry) % 1)) * expiry + expiry
+        return previous_count, previous_ttl, current_count, current_ttl
+
+    def acquire_sliding_window_entry(self, key: str, limit: int, expiry: int, amount: int = 1) -> bool:
+        """Súlyozott csúszóablak: ellenőrzés és növelés egyetlen írási tranzakcióban, így processzek között is atomi"""
+        if amount > limit:
+            return False
+        now = time.time()
+        previous_key, current_key = self.sliding_window_keys(key, expiry, now)
+
+        with self._lock:
+            self._connection.execute("BEGIN IMMEDIATE")
+            try:
+                previous_count, previous_ttl, current_count, _ = self._window(previous_key, current_key, expiry, now)
+                allowed = floor(previous_count * previous_ttl / expiry + current_count) + amount <= limit
+                if allowed:
+                    self._incr(current_key, 2 * expiry, amount, now)
+                self._sweep(now)
+                self._connection.execute("COMMIT")
+            except BaseException:
+                self._connection.execute("ROLLBACK")
+                raise
+        return allowed
+
+    def get_sliding_window(self, key: str, expiry: int):
+        now = time.time()
+        previous_key, current_key = self.sliding_window_keys(key, expiry, now)
+        with self._lock:
+            return self._window(previous_key, current_key, expiry, now)
+
+    def clear_sliding_window(self, key: str, expiry: int) -> None:
+        previous_key, current_key = self.sliding_window_keys(key, expiry, time.time())
+        with self._lock:
+            self._connection.execute(
+                "DELETE FROM ratelimit_counter WHERE key IN (?, ?)", (previous_key, current_key)
+            )
@@ -1,4 +1,10 @@
 from slowapi import Limiter
 from slowapi.util import get_remote_address
+from .config import RATE_LIMIT_STORAGE
+from . import rate_limit_storage  # a "sqlite://" séma regisztrálása a limits könyvtárban
 
-limiter = Limiter(key_func=get_remote_address)
+limiter = Limiter(
+    key_func=get_remote_address,
+    storage_uri=RATE_LIMIT_STORAGE,
+    strategy="sliding-window-counter"
+)
@@ -0,0 +1,235 @@
+import calendar, datetime
+from typing import Iterable, Iterator, List, NamedTuple, Optional, Set, Tuple
+
+FREQUENCIES = ("DAILY", "WEEKLY", "MONTHLY", "YEARLY")
+WEEKDAYS = ("MO", "TU", "WE", "TH", "FR", "SA", "SU")
+
+# Végtelen sorozat "vége" - az ablakos lekérdezésekben a series_end mindig nagyobb nála
+OPEN_ENDED = datetime.datetime(9999, 12, 31)
+
+Interval = Tuple[datetime.datetime, datetime.datetime]
+
+
+class Rule(NamedTuple):
+    """Értelmezett RRULE (RFC 5545 részhalmaz)"""
+    freq: str
+    interval: int = 1
+    count: Optional[int] = None
+    until: Optional[datetime.datetime] = None
+    byday: Tuple[int, ...] = ()
+
+
+def parse_until(value: str) -> datetime.datetime:
+    """UNTIL értelmezése (dátum vagy UTC időpont)"""
+    if len(value) == 8:
+        return datetime.datetime.strptime(value, "%Y%m%d").replace(hour=23, minute=59, second=59)
+    return datetime.datetime.strptime(value.rstrip("Z"), "%Y%m%dT%H%M%S")
+
+
+def parse_rrule(value: str) -> Rule:
+    """RRULE szöveg (pl. FREQ=WEEKLY;BYDAY=MO,WE;COUNT=10) értelmezése; hibánál ValueError"""
+    parts = {}
+    for part in value.strip().removeprefix("RRULE:").split(";"):
+        if part:
+            key, _, part_value = part.partition("=")
+            parts[key.strip().upper()] = part_value.strip().upper()
+
+    freq = parts.pop("FREQ", None)
+    if freq not in FREQUENCIES:
+        raise ValueError("Az RRULE FREQ értéke DAILY, WEEKLY, MONTHLY vagy YEARLY lehet")
+
+    interval = int(parts.pop("INTERVAL", 1))
+    count = int(parts["COUNT"]) if "COUNT" in parts else None
+    parts.pop("COUNT", None)
+    until = parse_until(parts.pop("UNTIL")) if "UNTIL" in parts else None
+    byday = tuple(sorted({WEEKDAYS.index(day) for day in parts.pop("BYDAY").split(",")})) if "BYDAY" in parts else ()
+    parts.pop("WKST", None)
+
+    if interval < 1 or (count is not None and count < 1):
+        raise ValueError("Az INTERVAL és a COUNT pozitív egész kell legyen")
+    if count is not None and until is not None:
+        raise ValueError("A COUNT és az UNTIL nem adható meg együtt")
+    if byday and freq != "WEEKLY":
+        raise ValueError("BYDAY csak heti ismétlődésnél támogatott")
+    if parts:
+        raise ValueError(f"Nem támogatott RRULE elem: {', '.join(parts)}")
+
+    return Rule(freq, interval, count, until, byday)
+
+
+def check_limits(start: datetime.datetime, rule: Rule, max_count: int, max_years: int):
+    """COUNT és UNTIL felső korlátja (korlát nélkül a sorozat vége nem ábrázolható); túllépésnél ValueError"""
+    if rule.count is not None and rule.count > max_count:
+        raise ValueError(f"A COUNT legfeljebb {max_count} lehet")
+    if rule.until is not None and rule.until.year - start.year > max_years:
+        raise ValueError(f"Az UNTIL legfeljebb {max_years} évvel lehet a kezdés után")
+
+
+def format_rrule(rule: Rule) -> str:
+    """Normalizált RRULE szöveg"""
+    parts = [f"FREQ={rule.freq}"]
+    if rule.interval != 1:
+        parts.append(f"INTERVAL={rule.interval}")
+    if rule.count is not None:
+        parts.append(f"COUNT={rule.count}")
+    if rule.until is not None:
+        parts.append(f"UNTIL={rule.until.strftime('%Y%m%dT%H%M%SZ')}")
+    if rule.byday:
+        parts.append("BYDAY=" + ",".join(WEEKDAYS[day] for day in rule.byday))
+    return ";".join(parts)
+
+
+def parse_exdates(value: Optional[str]) -> Set[datetime.datetime]:
+    """Kivételek (elmaradó alkalmak kezdete) vesszővel elválasztott ISO listából"""
+    if not value:
+        return set()
+    return {datetime.datetime.fromisoformat(item.strip()) for item in value.split(",") if item.strip()}
+
+
+def format_exdates(exdates: Iterable[datetime.datetime]) -> Optional[str]:
+    return ",".join(sorted(exdate.isoformat() for exdate in exdates)) or None
+
+
+def _daily(start: datetime.datetime, rule: Rule, not_before: datetime.datetime) -> Iterator[Tuple[int, datetime.datetime]]:
+    step = datetime.timedelta(days=rule.interval)
+    index = max(0, (not_before - start) // step)
+    while True:
+        yield index, start + index * step
+        index += 1
+
+
+def _weekly(start: datetime.datetime, rule: Rule, not_before: datetime.datetime) -> Iterator[Tuple[int, datetime.datetime]]:
+    days = rule.byday or (start.weekday(),)
+    anchor = start - datetime.timedelta(days=start.weekday())
+    period = datetime.timedelta(weeks=rule.interval)
+    first_week = sum(1 for day in days if day >= start.weekday())
+
+    # Az ablak előtti teljes hetek átugrása; a sorszám a COUNT miatt kell
+    week = max(0, (not_before - anchor) // period)
+    index = 0 if week == 0 else first_week + (week - 1) * len(days)
+    while True:
+        for day in days:
+            occurrence = anchor + week * period + datetime.timedelta(days=day)
+            if occurrence < start:
+                continue
+            yield index, occurrence
+            index += 1
+        week += 1
+
+
+def _monthly(start: datetime.datetime, rule: Rule, not_before: datetime.datetime) -> Iterator[Tuple[int, datetime.datetime]]:
+    # A nem létező napú hónapok kimaradnak (RFC 5545), így a sorszám csak bejárással számolható;
+    # havi/éves sorozatnál ez évtizedekre is csak néhány száz lépés
+    months = 12 if rule.freq == "YEARLY" else 1
+    index, step = 0, 0
+    while True:
+        total = start.month - 1 + step * rule.interval * months
+        year, month = start.year + total // 12, total % 12 + 1
+        if year > OPEN_ENDED.year:
+            return
+        if start.day <= calendar.monthrange(year, month)[1]:
+            yield index, start.replace(year=year, month=month)
+            index += 1
+        step += 1
+
+
+GENERATORS = {"DAILY": _daily, "WEEKLY": _weekly, "MONTHLY": _monthly, "YEARLY": _monthly}
+
+
+def occurrences(
+    start: datetime.datetime,
+    end: datetime.datetime,
+    rule: Rule,
+    exdates: Set[datetime.datetime],
+    window_start: datetime.datetime,
+    window_end: datetime.datetime
+) -> Iterator[Interval]:
+    """Az időablakba eső alkalmak lusta előállítása - a sorozat sosem kerül kibontva tárolásra"""
+    duration = end - start
+    for index, occurrence in GENERATORS[rule.freq](start, rule, window_start - duration):
+        if occurrence >= window_end:
+            return
+        if rule.count is not None and index >= rule.count:
+            return
+        if rule.until is not None and occurrence > rule.until:
+            return
+        if occurrence + duration > window_start and occurrence not in exdates:
+            yield occurrence, occurrence + duration
+
+
+def _weekly_occurrence(start: datetime.datetime, rule: Rule, index: int) -> datetime.datetime:
+    """A heti sorozat index-edik alkalma zárt képlettel (az első, csonka hét után minden hét teljes)"""
+    days = rule.byday or (start.weekday(),)
+    anchor = start - datetime.timedelta(days=start.weekday())
+    first_days = [day for day in days if day >= start.weekday()]
+    if index < len(first_days):
+        week, day = 0, first_days[index]
+    else:
+        week, position = divmod(index - len(first_days), len(days))
+        week, day = week + 1, days[position]
+    return anchor + week * datetime.timedelta(weeks=rule.interval) + datetime.timedelta(days=day)
+
+
+def _weekly_last_until(start: datetime.datetime, rule: Rule, until: datetime.datetime) -> datetime.datetime:
+    """Az UNTIL előtti utolsó heti alkalom bejárás nélkül: az UNTIL hete, vagy ha ott nincs, az előző"""
+    days = rule.byday or (start.weekday(),)
+    anchor = start - datetime.timedelta(days=start.weekday())
+    period = datetime.timedelta(weeks=rule.interval)
+    week = (until - anchor) // period
+    for week in (week, week - 1):
+        if week < 0:
+            break
+        candidates = [
+            occurrence for occurrence in (anchor + week * period + datetime.timedelta(days=day) for day in days)
+            if start <= occurrence <= until
+        ]
+        if candidates:
+            return candidates[-1]
+    return start
+
+
+def series_end(start: datetime.datetime, end: datetime.datetime, rule: Rule) -> datetime.datetime:
+    """
+    A sorozat utolsó alkalmának vége (végtelen sorozatnál OPEN_ENDED) - az ablakos szűréshez.
+    Napi és heti sorozatnál zárt képlettel; ha a vége nem ábrázolható, OPEN_ENDED.
+    """
+    if rule.count is None and rule.until is None:
+        return OPEN_ENDED
+
+    duration = end - start
+    last = start
+    limit = rule.until or OPEN_ENDED
+    try:
+        if rule.freq == "DAILY":
+            step = datetime.timedelta(days=rule.interval)
+            steps = rule.count - 1 if rule.count is not None else max(0, (limit - start) // step)
+            last = start + steps * step
+        elif rule.freq == "WEEKLY":
+            if rule.count is not None:
+                last = _weekly_occurrence(start, rule, rule.count - 1)
+            else:
+                last = _weekly_last_until(start, rule, limit)
+        else:
+            for index, occurrence in GENERATORS[rule.freq](start, rule, start):
+                if occurrence > limit or (rule.count is not None and index >= rule.count):
+                    break
+                last = occurrence
+        return min(last + duration, OPEN_ENDED)
+    except OverflowError:
+        return OPEN_ENDED
+
+
+def expand(
+    intervals: Iterable[Tuple[datetime.datetime, datetime.datetime, Optional[str], Optional[str]]],
+    window_start: datetime.datetime,
+    window_end: datetime.datetime
+) -> List[Interval]:
+    """(kezdés, vége, rrule, exdates) sorok alkalmai az ablakban, kezdés szerint rendezve"""
+    result: List[Interval] = []
+    for start, end, rrule, exdates in intervals:
+        if rrule:
+            result.extend(occurrences(start, end, parse_rrule(rrule), parse_exdates(exdates), window_start, window_end))
+        else:
+            result.append((start, end))
+    result.sort()
+    return result
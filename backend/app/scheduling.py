@@ -0,0 +1,101 @@
+import datetime, heapq
+from typing import Iterable, Iterator, List, Tuple
+
+Interval = Tuple[datetime.datetime, datetime.datetime]
+
+
+def merge_intervals(intervals: Iterable[Interval]) -> List[Interval]:
+    """Kezdés szerint rendezett intervallumok összefésülése (sweep-line)"""
+    merged: List[Interval] = []
+    for start, end in intervals:
+        if merged and start <= merged[-1][1]:
+            if end > merged[-1][1]:
+                merged[-1] = (merged[-1][0], end)
+        else:
+            merged.append((start, end))
+    return merged
+
+
+def clip(intervals: Iterable[Interval], window_start: datetime.datetime, window_end: datetime.datetime) -> List[Interval]:
+    """Intervallumok levágása az időablakra"""
+    return [
+        (max(start, window_start), min(end, window_end))
+        for start, end in intervals
+        if start < window_end and end > window_start
+    ]
+
+
+def union(busy_lists: Iterable[List[Interval]]) -> List[Interval]:
+    """Több rendezett foglaltsági lista uniója k-utas heap összefésüléssel"""
+    return merge_intervals(heapq.merge(*busy_lists))
+
+
+def free_intervals(busy: List[Interval], window_start: datetime.datetime, window_end: datetime.datetime) -> List[Interval]:
+    """Összefésült foglaltsági lista komplementere az időablakon belül"""
+    free: List[Interval] = []
+    cursor = window_start
+    for start, end in busy:
+        if start > cursor:
+            free.append((cursor, min(start, window_end)))
+        cursor = max(cursor, end)
+        if cursor >= window_end:
+            break
+    if cursor < window_end:
+        free.append((cursor, window_end))
+    return free
+
+
+def as_dicts(intervals: List[Interval]) -> List[dict]:
+    return [{"start": start, "end": end} for start, end in intervals]
+
+
+def working_windows(
+    window_start: datetime.datetime,
+    window_end: datetime.datetime,
+    work_start: datetime.time,
+    work_end: datetime.time,
+    weekdays_only: bool = True
+) -> Iterator[Interval]:
+    """Munkaidő-sávok napról napra, az időablakra vágva (generátor)"""
+    day = window_start.date()
+    while day <= window_end.date():
+        if not weekdays_only or day.weekday() < 5:
+            start = max(datetime.datetime.combine(day, work_start), window_start)
+            end = min(datetime.datetime.combine(day, work_end), window_end)
+            if start < end:
+                yield start, end
+        day += datetime.timedelta(days=1)
+
+
+def find_slots(
+    busy: List[Interval],
+    windows: Iterable[Interval],
+    duration: datetime.timedelta,
+    step: datetime.timedelta,
+    count: int
+) -> List[Interval]:
+    """A legkorábbi szabad idősávok két mutatós bejárással (foglaltság × munkaidő)"""
+    slots: List[Interval] = []
+    index = 0
+    for window_start, window_end in windows:
+        while index < len(busy) and busy[index][1] <= window_start:
+            index += 1
+
+        cursor = window_start
+        position = index
+        while cursor < window_end:
+            if position < len(busy) and busy[position][0] < window_end:
+                gap_end = max(busy[position][0], cursor)
+                next_cursor = busy[position][1]
+                position += 1
+            else:
+                gap_end, next_cursor = window_end, window_end
+
+            slot_start = cursor
+            while slot_start + duration <= gap_end:
+                slots.append((slot_start, slot_start + duration))
+                if len(slots) >= count:
+                    return slots
+                slot_start += step
+            cursor = max(cursor, next_cursor)
+    return slots
@@ -1,5 +1,7 @@
-from typing import Optional
-from pydantic import BaseModel
+import datetime
+from typing import List, Optional
+from pydantic import BaseModel, Field
+from .models import Event
 
 
 class ChatRequest(BaseModel):
@@ -8,6 +10,16 @@ class ChatRequest(BaseModel):
     message: str
 
 
+class SupportRequest(BaseModel):
+    """Support sor egy sora (beszélgetés összesítő)"""
+    session_id: str
+    status: str
+    needs_human: bool
+    last_message_at: datetime.datetime
+    last_sender: str
+    unread_count: int
+
+
 class LoginRequest(BaseModel):
     """Bejelentkezési kérés DTO"""
     username: str
@@ -15,6 +27,11 @@ class LoginRequest(BaseModel):
     mfa_code: Optional[str] = None
 
 
+class RefreshRequest(BaseModel):
+    """Token frissítési / kijelentkezési kérés DTO"""
+    refresh_token: str
+
+
 class ResetRequest(BaseModel):
     """Jelszó visszaállítási kérés DTO"""
     username: str
@@ -42,3 +59,53 @@ class UserCreate(BaseModel):
     username: str
     password: str
     role: str
+
+
+class UserRoleUpdate(BaseModel):
+    """Szerepkör módosítás DTO"""
+    role: str
+
+
+class ConflictSlot(BaseModel):
+    """Ütközésvizsgálandó időpont DTO"""
+    start_date: datetime.datetime
+    end_date: datetime.datetime
+    id: Optional[int] = None
+
+
+class ConflictBatchRequest(BaseModel):
+    """Több időpont egyidejű ütközésvizsgálata DTO"""
+    slots: List[ConflictSlot]
+
+
+class EventDelta(BaseModel):
+    """Publikus események változáscsomagja (upsert + törlési jelzők)"""
+    version: int
+    upserts: List[Event]
+    deleted: List[int]
+
+
+class FreeBusyRequest(BaseModel):
+    """Több felhasználó foglaltsági lekérdezése DTO"""
+    usernames: List[str] = Field(min_length=1, max_length=200)
+    start: datetime.datetime
+    end: datetime.datetime
+
+
+class SlotSearchRequest(BaseModel):
+    """Közös szabad időpont keresése DTO"""
+    participants: List[str] = Field(min_length=1, max_length=200)
+    duration_minutes: int = Field(gt=0, le=24 * 60)
+    start: datetime.datetime
+    end: datetime.datetime
+    work_start: datetime.time = datetime.time(9, 0)
+    work_end: datetime.time = datetime.time(17, 0)
+    weekdays_only: bool = True
+    step_minutes: int = Field(default=30, gt=0, le=24 * 60)
+    count: int = Field(default=5, gt=0, le=50)
+
+
+class UserSearchPage(BaseModel):
+    """Felhasználókeresés egy oldala; a next_cursor-ral kérhető a folytatás"""
+    items: List[str]
+    next_cursor: Optional[str] = None
@@ -0,0 +1,179 @@
+import asyncio, datetime, hashlib, secrets, threading, time, uuid
+from typing import Dict, Iterable, List, Optional, Tuple
+from fastapi import HTTPException
+from sqlmodel import Session, select, update, delete
+from sqlmodel.ext.asyncio.session import AsyncSession
+from .database import engine
+from .models import PasswordResetToken, UserSession
+from .pubsub import hub
+from .config import ACCESS_TOKEN_MINUTES, REFRESH_TOKEN_DAYS, SESSION_SWEEP_INTERVAL
+
+REVOCATION_TOPIC = "sessions:revoke"
+
+
+def hash_token(token: str) -> str:
+    """Refresh token lenyomata - a nyers token sosem kerül az adatbázisba"""
+    return hashlib.sha256(token.encode()).hexdigest()
+
+
+class RevocationList:
+    """Visszavont munkamenet-családok memóriában, amíg a hozzájuk kiadott access tokenek élhetnek"""
+
+    def __init__(self, ttl: float):
+        self.ttl = ttl
+        self._items: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def add(self, family_id: str, until: Optional[float] = None):
+        with self._lock:
+            self._items[family_id] = until if until is not None else time.time() + self.ttl
+
+    def __contains__(self, family_id: Optional[str]) -> bool:
+        if family_id is None:
+            return False
+        until = self._items.get(family_id)
+        if until is None:
+            return False
+        if until < time.time():
+            with self._lock:
+                self._items.pop(family_id, None)
+            return False
+        return True
+
+    def purge(self):
+        now = time.time()
+        with self._lock:
+            for family_id in [f for f, until in self._items.items() if until < now]:
+                del self._items[family_id]
+
+    def __len__(self) -> int:
+        return len(self._items)
+
+
+revoked_sessions = RevocationList(ACCESS_TOKEN_MINUTES * 60)
+
+
+def create_session(session: AsyncSession, username: str, family_id: Optional[str] = None) -> Tuple[str, UserSession]:
+    """Új refresh token kiadása (a hívó commitol)"""
+    token = secrets.token_urlsafe(32)
+    user_session = UserSession(
+        username=username,
+        token_hash=hash_token(token),
+        family_id=family_id or uuid.uuid4().hex,
+        expires_at=datetime.datetime.utcnow() + datetime.timedelta(days=REFRESH_TOKEN_DAYS)
+    )
+    session.add(user_session)
+    return token, user_session
+
+
+async def rotate_session(session: AsyncSession, refresh_token: str) -> Tuple[str, UserSession]:
+    """Refresh token cseréje egyetlen indexelt lenyomat-kereséssel; újrafelhasznált tokennél az egész család visszavonódik"""
+    now = datetime.datetime.utcnow()
+    current = (await session.exec(
+        select(UserSession).where(UserSession.token_hash == hash_token(refresh_token))
+    )).first()
+
+    if not current or current.revoked_at or current.expires_at <= now:
+        raise HTTPException(status_code=401, detail="Érvénytelen vagy lejárt munkamenet")
+
+    # Feltételes UPDATE: két párhuzamos csere közül csak az egyik nyerhet
+    rotated = (await session.execute(
+        update(UserSession)
+        .where(UserSession.id == current.id, UserSession.rotated_at == None)
+        .values(rotated_at=now)
+    )).rowcount
+    if not rotated:
+        await revoke_family(session, current.family_id)
+        await session.commit()
+        announce_revoked([current.family_id])
+        raise HTTPException(status_code=401, detail="A munkamenet visszavonva, jelentkezz be újra!")
+
+    return create_session(session, current.username, current.family_id)
+
+
+async def revoke_family(session: AsyncSession, family_id: str):
+    """Egy munkamenet-család (egy bejelentkezés összes refresh tokenje) visszavonása"""
+    await session.execute(
+        update(UserSession)
+        .where(UserSession.family_id == family_id, UserSession.revoked_at == None)
+        .values(revoked_at=datetime.datetime.utcnow())
+    )
+
+
+async def revoke_user_sessions(session: AsyncSession, username: str) -> List[str]:
+    """A felhasználó összes élő munkamenetének visszavonása (pl. jelszócsere után)"""
+    family_ids = list(set((await session.exec(
+        select(UserSession.family_id).where(
+            UserSession.username == username,
+            UserSession.revoked_at == None,
+            UserSession.expires_at > datetime.datetime.utcnow()
+        )
+    )).all()))
+    for family_id in family_ids:
+        await revoke_family(session, family_id)
+    return family_ids
+
+
+def announce_revoked(family_ids: Iterable[str]):
+    """Visszavonás felvétele a helyi listára és továbbítása a többi workernek (commit után hívandó)"""
+    family_ids = list(family_ids)
+    if not family_ids:
+        return
+    for family_id in family_ids:
+        revoked_sessions.add(family_id)
+    hub.publish([REVOCATION_TOPIC], {"type": "sessions_revoked", "family_ids": family_ids})
+
+
+def load_revoked_sessions():
+    """Induláskor a még élő access tokenekhez tartozó visszavonások betöltése"""
+    since = datetime.datetime.utcnow() - datetime.timedelta(minutes=ACCESS_TOKEN_MINUTES)
+    with Session(engine) as session:
+        rows = session.exec(
+            select(UserSession.family_id, UserSession.revoked_at).where(UserSession.revoked_at >= since)
+        ).all()
+    for family_id, revoked_at in rows:
+        revoked_sessions.add(
+            family_id,
+            revoked_at.replace(tzinfo=datetime.timezone.utc).timestamp() + revoked_sessions.ttl
+        )
+
+
+def sweep_sessions() -> int:
+    """Lejárt munkamenetek és jelszó-visszaállító tokenek törlése (indexelt lejárati időre)"""
+    now = datetime.datetime.utcnow()
+    with Session(engine) as session:
+        removed = session.execute(delete(UserSession).where(UserSession.expires_at < now)).rowcount
+        removed += session.execute(delete(PasswordResetToken).where(PasswordResetToken.expires_at < now)).rowcount
+        session.commit()
+    return removed
+
+
+async def session_sweeper():
+    """Háttér-feladat: lejárt munkamenetek és visszavonások időszakos takarítása"""
+    while True:
+        try:
+            removed = await asyncio.to_thread(sweep_sessions)
+            if removed:
+                print(f"Lejárt munkamenetek/tokenek törölve: {removed}")
+        except Exception as e:
+            print(f"Munkamenet söprés hiba: {e}")
+        revoked_sessions.purge()
+        await asyncio.sleep(SESSION_SWEEP_INTERVAL)
+
+
+async def listen_revocations():
+    """Háttér-feladat: más workerek visszavonásainak alkalmazása"""
+    subscription = hub.subscribe([REVOCATION_TOPIC], maxsize=1000)
+    try:
+        while True:
+            try:
+                message = await subscription.get(timeout=60)
+            except asyncio.TimeoutError:
+                continue
+            if message.get("type") == "resync":
+                await asyncio.to_thread(load_revoked_sessions)
+            else:
+                for family_id in message["family_ids"]:
+                    revoked_sessions.add(family_id)
+    finally:
+        hub.unsubscribe(subscription)
@@ -0,0 +1,145 @@
+import asyncio, threading
+from bisect import bisect_left, bisect_right
+from typing import List, Optional, Tuple
+from sqlmodel import Session, select
+from .database import engine
+from .models import User
+from .pubsub import hub
+from .dependencies import USER_INVALIDATION_TOPIC
+
+Entry = Tuple[str, str]  # (kisbetűs név, eredeti név)
+
+
+class UserDirectory:
+    """
+    Felhasználónév-index a kereséshez, memóriában
+
+    Rendezett (kisbetűs név, név) lista: prefix keresés bisecttel O(log n + k); a részszó
+    ("fuzzy") találatok egyetlen összefűzött szövegen futó str.find hívásokkal jönnek. Az írás
+    új pillanatképet készít, így az olvasók zár nélkül dolgoznak.
+    """
+
+    def __init__(self):
+        self._entries: List[Entry] = []
+        self._blob: Optional[Tuple[List[Entry], str, List[int]]] = None
+        self._lock = threading.Lock()
+        self._changes: Optional[List[Tuple[bool, str]]] = None
+
+    def load(self):
+        """Teljes újratöltés az adatbázisból (a közben érkező add/remove hívások nem vesznek el)"""
+        with self._lock:
+            self._changes = []
+        with Session(engine) as session:
+            usernames = session.exec(select(User.username)).all()
+        entries = sorted((name.lower(), name) for name in usernames)
+        with self._lock:
+            changes, self._changes = self._changes, None
+            self._entries, self._blob = entries, None
+        for added, username in changes:
+            if added:
+                self.add(username)
+            else:
+                self.remove(username)
+
+    def add(self, username: str):
+        entry = (username.lower(), username)
+        with self._lock:
+            if self._changes is not None:
+                self._changes.append((True, username))
+            index = bisect_left(self._entries, entry)
+            if index < len(self._entries) and self._entries[index] == entry:
+                return
+            self._entries = self._entries[:index] + [entry] + self._entries[index:]
+            self._blob = None
+
+    def remove(self, username: str):
+        entry = (username.lower(), username)
+        with self._lock:
+            if self._changes is not None:
+                self._changes.append((False, username))
+            index = bisect_left(self._entries, entry)
+            if index < len(self._entries) and self._entries[index] == entry:
+                self._entries = self._entries[:index] + self._entries[index + 1:]
+                self._blob = None
+
+    def refresh(self, username: str):
+        """Egy felhasználó állapotának átvétele az adatbázisból (létrejött / törölve)"""
+        with Session(engine) as session:
+            exists = session.exec(select(User.username).where(User.username == username)).first()
+        if exists:
+            self.add(username)
+        else:
+            self.remove(username)
+
+    def _substring_index(self, entries: List[Entry]) -> Tuple[str, List[int]]:
+        """A kisbetűs nevek "\\n"-nel összefűzve és a kezdőpozícióik (lustán, módosítás után újraépítve)"""
+        cached = self._blob
+        if cached is not None and cached[0] is entries:
+            return cached[1], cached[2]
+        offsets, position = [], 0
+        for lower, _ in entries:
+            offsets.append(position)
+            position += len(lower) + 1
+        blob = "\n".join(lower for lower, _ in entries) + "\n"
+        self._blob = (entries, blob, offsets)
+        return blob, offsets
+
+    def search(self, query: str, limit: int, cursor: Optional[str] = None) -> Tuple[List[str], Optional[str]]:
+        """
+        Előbb a prefix-, utána a névben máshol előforduló találatok, ábécérendben.
+        A kurzor ("p:<név>" vagy "s:<név>") az előző oldal utolsó eleme.
+        """
+        entries = self._entries
+        prefix = query.strip().lower()
+        phase, after = "p", None
+        if cursor and cursor[:2] in ("p:", "s:"):
+            phase, after = cursor[0], (cursor[2:].lower(), cursor[2:])
+
+        items: List[str] = []
+        if phase == "p":
+            index = bisect_right(entries, after) if after else bisect_left(entries, (prefix,))
+            while index < len(entries) and len(items) < limit and entries[index][0].startswith(prefix):
+                items.append(entries[index][1])
+                index += 1
+            if len(items) == limit:
+                return items, f"p:{items[-1]}"
+            phase, after = "s", None
+
+        if not prefix or "\n" in prefix:
+            return items, None
+
+        blob, offsets = self._substring_index(entries)
+        position = 0
+        if after:
+            start = bisect_right(entries, after)
+            position = offsets[start] if start < len(entries) else len(blob)
+        while len(items) < limit:
+            found = blob.find(prefix, position)
+            if found < 0:
+                return items, None
+            index = bisect_right(offsets, found) - 1
+            lower, name = entries[index]
+            if not lower.startswith(prefix):
+                items.append(name)
+            position = offsets[index] + len(lower) + 1
+        return items, f"s:{items[-1]}"
+
+
+user_directory = UserDirectory()
+
+
+async def listen_directory_changes():
+    """Háttér-feladat: a felhasználó-változások (más workerekből is) átvezetése a keresőindexbe"""
+    subscription = hub.subscribe([USER_INVALIDATION_TOPIC], maxsize=1000)
+    try:
+        while True:
+            try:
+                message = await subscription.get(timeout=60)
+            except asyncio.TimeoutError:
+                continue
+            if message.get("type") == "resync":
+                await asyncio.to_thread(user_directory.load)
+            else:
+                await asyncio.to_thread(user_directory.refresh, message["username"])
+    finally:
+        hub.unsubscribe(subscription)
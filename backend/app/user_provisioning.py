@@ -0,0 +1,151 @@
+import csv, io, json
+from concurrent.futures import ProcessPoolExecutor
+from typing import IO, Iterator, List, Optional, Tuple
+from sqlalchemy.dialects.sqlite import insert as sqlite_insert
+from sqlmodel import Session, select
+from .database import engine
+from .models import User
+from .dependencies import get_password_hash
+from .config import PROVISION_WORKERS
+
+PROVISION_BATCH_SIZE = 500
+HASH_CHUNK_SIZE = 8
+ROLES = {"admin", "user"}
+MAX_USERNAME_LENGTH = 64
+
+_process_pool: Optional[ProcessPoolExecutor] = None
+
+
+def get_process_pool() -> ProcessPoolExecutor:
+    """Lustán indított processzkészlet a bcrypt hasheléshez (a GIL-t megkerülve minden magot kihasznál)"""
+    global _process_pool
+    if _process_pool is None:
+        _process_pool = ProcessPoolExecutor(max_workers=PROVISION_WORKERS)
+    return _process_pool
+
+
+def shutdown_process_pool():
+    global _process_pool
+    if _process_pool is not None:
+        _process_pool.shutdown(cancel_futures=True)
+        _process_pool = None
+
+
+def iter_csv(stream: IO[str]) -> Iterator[Tuple[int, dict]]:
+    """CSV sorok (fejléc: username,password[,role])"""
+    reader = csv.DictReader(stream)
+    for row in reader:
+        yield reader.line_num, row
+
+
+def iter_json(stream: IO[str]) -> Iterator[Tuple[int, dict]]:
+    """JSON tömb ([{"username": ..., "password": ..., "role": ...}, ...]); a sorszám a tömbindex + 1"""
+    try:
+        items = json.load(stream)
+    except json.JSONDecodeError as e:
+        raise ValueError(f"Érvénytelen JSON: {e}")
+    if not isinstance(items, list):
+        raise ValueError("A JSON fájlnak felhasználók tömbjét kell tartalmaznia")
+    for number, item in enumerate(items, start=1):
+        yield number, item if isinstance(item, dict) else {}
+
+
+def validate_row(data: dict, seen: set) -> Tuple[Optional[dict], Optional[str]]:
+    """Egy sor ellenőrzése hashelés előtt: (felhasználó adatai, hiba)"""
+    username = str(data.get("username") or "").strip()
+    password = data.get("password") or ""
+    role = str(data.get("role") or "user").strip().lower()
+
+    if not username:
+        return None, "Hiányzó felhasználónév"
+    if len(username) > MAX_USERNAME_LENGTH or any(c in username for c in ",\r\n"):
+        return None, "Érvénytelen felhasználónév"
+    if not isinstance(password, str) or not password:
+        return None, "Hiányzó jelszó"
+    if role not in ROLES:
+        return None, f"Érvénytelen szerepkör: {role}"
+    if username in seen:
+        return None, "Ismétlődő felhasználónév a fájlban"
+    seen.add(username)
+    return {"username": username, "password": password, "role": role}, None
+
+
+def existing_usernames(session: Session, usernames: List[str]) -> set:
+    """Már létező felhasználónevek, kötegelt IN lekérdezésekkel"""
+    existing = set()
+    for i in range(0, len(usernames), PROVISION_BATCH_SIZE):
+        chunk = usernames[i:i + PROVISION_BATCH_SIZE]
+        existing.update(session.exec(select(User.username).where(User.username.in_(chunk))).all())
+    return existing
+
+
+def flush_batch(session: Session, batch: List[Tuple[dict, dict]]) -> List[str]:
+    """Egy köteg beszúrása saját tranzakcióban, a soronkénti eredmények kitöltésével; a létrejött neveket adja vissza"""
+    # Az ellenőrzés óta máshol felvett nevek ütközése nem bontja el a köteget
+    statement = (
+        sqlite_insert(User.__table__)
+        .on_conflict_do_nothing(index_elements=["username"])
+        .returning(User.__table__.c.username)
+    )
+    created = set(session.connection().execute(statement, [row for _, row in batch]).scalars().all())
+    session.commit()
+
+    for result, row in batch:
+        if row["username"] in created:
+            result["status"] = "created"
+        else:
+            result["error"] = "Ez a felhasználónév már foglalt"
+    return [row["username"] for _, row in batch if row["username"] in created]
+
+
+def provision_users(stream: IO[bytes], file_format: str) -> dict:
+    """Előzetes validálás, bcrypt a processzkészletben, kötegelt beszúrás és soronkénti eredmény"""
+    text_stream = io.TextIOWrapper(stream, encoding="utf-8-sig", newline="")
+    parsed = iter_json(text_stream) if file_format == "json" else iter_csv(text_stream)
+
+    results = []
+    valid: List[Tuple[dict, dict]] = []
+    seen: set = set()
+    for number, data in parsed:
+        user, error = validate_row(data, seen)
+        result = {"row": number, "username": user["username"] if user else data.get("username"), "status": "error"}
+        results.append(result)
+        if error:
+            result["error"] = error
+        else:
+            valid.append((result, user))
+
+    created = []
+    with Session(engine) as session:
+        existing = existing_usernames(session, [user["username"] for _, user in valid])
+        pending = []
+        for result, user in valid:
+            if user["username"] in existing:
+                result["error"] = "Ez a felhasználónév már foglalt"
+            else:
+                pending.append((result, user))
+
+        # A hashek sorrendben, folyamatosan érkeznek: a kötegek beszúrása átfedi a további hashelést
+        hashes = get_process_pool().map(
+            get_password_hash, [user["password"] for _, user in pending], chunksize=HASH_CHUNK_SIZE
+        )
+        batch: List[Tuple[dict, dict]] = []
+        for (result, user), hashed_password in zip(pending, hashes):
+            batch.append((result, {
+                "username": user["username"],
+                "hashed_password": hashed_password,
+                "role": user["role"],
+                "mfa_enabled": False,
+            }))
+            if len(batch) >= PROVISION_BATCH_SIZE:
+                created.extend(flush_batch(session, batch))
+                batch = []
+        if batch:
+            created.extend(flush_batch(session, batch))
+
+    return {
+        "created": len(created),
+        "failed": len(results) - len(created),
+        "results": results,
+        "usernames": created,
+    }
@@ -1,36 +1,20 @@
-import bleach, logging
-from sqlmodel import Session, select, SQLModel
-from .database import engine
-from .models import User
-from .dependencies import get_password_hash
-from .config import ADMIN_USERNAME, ADMIN_PASSWORD
+import bleach, logging, datetime, hashlib, sys, threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from typing import List, Optional, Union
 from cryptography.fernet import Fernet
-from .config import ENCRYPTION_KEY
+from .config import ENCRYPTION_KEY, DECRYPT_CACHE_MAX_BYTES, DECRYPT_WORKERS, DECRYPT_BATCH_THRESHOLD
 
 cipher_suite = Fernet(ENCRYPTION_KEY.encode())
 
-def create_tables():
-    """Adatbázis táblák létrehozása"""
-    SQLModel.metadata.create_all(engine)
-    print("Adatbázis táblák létrehozva")
-
-
-def create_admin_user():
-    """Admin felhasználó létrehozása, ha még nem létezik"""
-    with Session(engine) as session:
-        user = session.exec(select(User).where(User.username == "admin")).first()
-        
-        if not user:
-            print("Admin felhasználó generálása...")
-            admin_user = User(
-                username=ADMIN_USERNAME,
-                hashed_password=get_password_hash(ADMIN_PASSWORD)
-            )
-            session.add(admin_user)
-            session.commit()
-            print(f"Admin létrehozva: {ADMIN_USERNAME}")
-        else:
-            print("Admin már létezik")
+def to_utc(value: Union[str, datetime.datetime]) -> datetime.datetime:
+    """Időpont (vagy ISO szöveg) normalizálása UTC-re, időzóna nélküli érték UTC-nek számít"""
+    if isinstance(value, str):
+        value = datetime.datetime.fromisoformat(value)
+    if value.tzinfo is not None:
+        value = value.astimezone(datetime.timezone.utc).replace(tzinfo=None)
+    return value
+
 
 if not ENCRYPTION_KEY:
     raise ValueError("Nincs ENCRYPTION_KEY beállítva a környezeti változók között!")
@@ -41,14 +25,133 @@ def encrypt_text(text: str) -> str:
         return text
     return cipher_suite.encrypt(text.encode()).decode()
 
-def decrypt_text(text: str) -> str:
-    """Titkosított szöveg dekódolása"""
-    if not text:
-        return text
+class DecryptCache:
+    """Memóriakorlátos LRU gyorsítótár a visszafejtett szövegekhez (kulcs: a titkosított szöveg SHA-256 lenyomata)"""
+
+    ENTRY_OVERHEAD = 200
+
+    def __init__(self, max_bytes: int):
+        self.max_bytes = max_bytes
+        self.size = 0
+        self.hits = 0
+        self.misses = 0
+        self._items: "OrderedDict[bytes, str]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def key(ciphertext: str) -> bytes:
+        return hashlib.sha256(ciphertext.encode()).digest()
+
+    @classmethod
+    def cost(cls, plaintext: str) -> int:
+        return sys.getsizeof(plaintext) + cls.ENTRY_OVERHEAD
+
+    def get(self, ciphertext: str) -> Optional[str]:
+        key = self.key(ciphertext)
+        with self._lock:
+            plaintext = self._items.get(key)
+            if plaintext is None:
+                self.misses += 1
+                return None
+            self._items.move_to_end(key)
+            self.hits += 1
+            return plaintext
+
+    def put(self, ciphertext: str, plaintext: str):
+        key = self.key(ciphertext)
+        cost = self.cost(plaintext)
+        if cost > self.max_bytes:
+            return
+        with self._lock:
+            old = self._items.pop(key, None)
+            if old is not None:
+                self.size -= self.cost(old)
+            self._items[key] = plaintext
+            self.size += cost
+            while self.size > self.max_bytes:
+                _, evicted = self._items.popitem(last=False)
+                self.size -= self.cost(evicted)
+
+    def invalidate(self, ciphertext: str):
+        with self._lock:
+            old = self._items.pop(self.key(ciphertext), None)
+            if old is not None:
+                self.size -= self.cost(old)
+
+    def clear(self):
+        with self._lock:
+            self._items.clear()
+            self.size = 0
+            self.hits = 0
+            self.misses = 0
+
+    def stats(self) -> dict:
+        total = self.hits + self.misses
+        return {
+            "entries": len(self._items),
+            "bytes": self.size,
+            "hits": self.hits,
+            "misses": self.misses,
+            "hit_rate": self.hits / total if total else 0.0
+        }
+
+
+decrypt_cache = DecryptCache(DECRYPT_CACHE_MAX_BYTES)
+decrypt_pool = ThreadPoolExecutor(max_workers=DECRYPT_WORKERS, thread_name_prefix="decrypt")
+
+def _fernet_decrypt(text: str) -> Optional[str]:
     try:
         return cipher_suite.decrypt(text.encode()).decode()
     except Exception:
+        return None
+
+def _decrypt_chunk(chunk: List[str]) -> List[Optional[str]]:
+    return [_fernet_decrypt(text) for text in chunk]
+
+def decrypt_text(text: str) -> str:
+    """Titkosított szöveg dekódolása (gyorsítótárral)"""
+    if not text:
         return text
+    plaintext = decrypt_cache.get(text)
+    if plaintext is None:
+        plaintext = _fernet_decrypt(text)
+        if plaintext is None:
+            return text
+        decrypt_cache.put(text, plaintext)
+    return plaintext
+
+def decrypt_many(texts: List[Optional[str]]) -> List[Optional[str]]:
+    """Több szöveg dekódolása; nagy elemszámnál a cache-ben nem lévők darabokban, szálkészleten futnak"""
+    results = list(texts)
+    missing = []
+    for index, text in enumerate(texts):
+        if not text:
+            continue
+        plaintext = decrypt_cache.get(text)
+        if plaintext is None:
+            missing.append(index)
+        else:
+            results[index] = plaintext
+
+    pending = [texts[index] for index in missing]
+    if len(pending) < DECRYPT_BATCH_THRESHOLD or DECRYPT_WORKERS < 2:
+        plaintexts = _decrypt_chunk(pending)
+    else:
+        size = -(-len(pending) // DECRYPT_WORKERS)
+        chunks = [pending[i:i + size] for i in range(0, len(pending), size)]
+        plaintexts = [p for chunk in decrypt_pool.map(_decrypt_chunk, chunks) for p in chunk]
+
+    for index, text, plaintext in zip(missing, pending, plaintexts):
+        if plaintext is not None:
+            decrypt_cache.put(text, plaintext)
+            results[index] = plaintext
+
+    return results
+
+def invalidate_decrypted(text: Optional[str]):
+    """Módosított/törölt leírás kivétele a gyorsítótárból"""
+    if text:
+        decrypt_cache.invalidate(text)
 
 def sanitize_input(text: str) -> str:
     if text:
@@ -1,12 +1,14 @@
 import io, base64
 from fastapi import APIRouter, UploadFile, File, Form, HTTPException, Depends
 from fastapi.responses import JSONResponse
-from sqlmodel import Session, select
+from sqlmodel import select
+from sqlmodel.ext.asyncio.session import AsyncSession
 from google.genai import types
 from gtts import gTTS
 from .database import get_session
 from .models import ChatMessage
 from .ai_client import client, has_ai
+from .helpdesk import add_message, commit_messages
 
 router = APIRouter(prefix="/voice", tags=["Voice"])
 
@@ -53,7 +55,7 @@ FONTOS SZABÁLYOK:
 async def process_voice(
     file: UploadFile = File(...),
     session_id: str = Form(...),
-    db: Session = Depends(get_session)
+    db: AsyncSession = Depends(get_session)
 ):
     if not has_ai:
         return JSONResponse({
@@ -81,11 +83,11 @@ async def process_voice(
         user_text = response.text
         
         # 2. Előzmények betöltése
-        history_msgs = db.exec(
+        history_msgs = (await db.exec(
             select(ChatMessage)
             .where(ChatMessage.session_id == session_id)
             .order_by(ChatMessage.timestamp)
-        ).all()
+        )).all()
 
         # 3. Előzmények formázása
         formatted_history = []
@@ -109,12 +111,9 @@ async def process_voice(
         ai_response_text = response.text
         
         # Mentés adatbázisba
-        user_msg = ChatMessage(session_id=session_id, sender="user", message=user_text)
-        db.add(user_msg)
-        
-        ai_msg = ChatMessage(session_id=session_id, sender="bot", message=ai_response_text)
-        db.add(ai_msg)
-        db.commit()
+        user_msg = await add_message(db, session_id, "user", user_text)
+        ai_msg = await add_message(db, session_id, "bot", ai_response_text)
+        await commit_messages(db, user_msg, ai_msg)
         
         # 6. TTS
         mp3_fp = io.BytesIO()
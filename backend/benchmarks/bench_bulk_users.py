@@ -0,0 +1,55 @@
+"""
+Tömeges felhasználó-felvétel benchmark: felhasználó/másodperc 1, 2, ... N hashelő processzel
+(az átviteli sebességnek a magok számával kell nőnie)
+
+Futtatás a backend mappából: python -m benchmarks.bench_bulk_users [felhasználók száma]
+"""
+import io, os, sys, tempfile, time
+from concurrent.futures import ProcessPoolExecutor
+from cryptography.fernet import Fernet
+
+os.environ.setdefault("ENCRYPTION_KEY", Fernet.generate_key().decode())
+os.chdir(tempfile.mkdtemp())
+
+from sqlmodel import SQLModel
+from app.database import engine
+from app import user_provisioning
+
+USERS = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+
+
+def worker_counts():
+    cores = os.cpu_count() or 1
+    counts, n = [], 1
+    while n < cores:
+        counts.append(n)
+        n *= 2
+    return counts + [cores]
+
+
+def main():
+    SQLModel.metadata.create_all(engine)
+    baseline = None
+
+    for workers in worker_counts():
+        user_provisioning.shutdown_process_pool()
+        user_provisioning._process_pool = ProcessPoolExecutor(max_workers=workers)
+        list(user_provisioning._process_pool.map(abs, range(workers)))  # processzek elindítása
+
+        body = "username,password,role\n" + "".join(
+            f"w{workers}-user{i},Jelszo-{i},user\n" for i in range(USERS)
+        )
+        start = time.perf_counter()
+        report = user_provisioning.provision_users(io.BytesIO(body.encode()), "csv")
+        elapsed = time.perf_counter() - start
+        assert report["created"] == USERS, report["failed"]
+
+        rate = USERS / elapsed
+        baseline = baseline or rate
+        print(f"{workers:>2} processz: {rate:7.1f} felhasználó/s  ({elapsed:.2f} s, {rate / baseline:.1f}x)")
+
+    user_provisioning.shutdown_process_pool()
+
+
+if __name__ == "__main__":
+    main()
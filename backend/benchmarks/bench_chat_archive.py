@@ -0,0 +1,111 @@
+"""
+Chat archiválás benchmark: régi, lezárt beszélgetések áthelyezése a szegmensfájlokba, miközben
+egy másik szál folyamatosan új üzeneteket ír - mért értékek: archiválási sebesség, tömörítési arány,
+az egyidejű beszúrások p99/max késleltetése (mennyi ideig tartja az archiváló az írási zárat)
+
+Futtatás a backend mappából: python -m benchmarks.bench_chat_archive [beszélgetések száma]
+"""
+import datetime, os, sys, tempfile, threading, time
+from cryptography.fernet import Fernet
+
+os.environ.setdefault("ENCRYPTION_KEY", Fernet.generate_key().decode())
+os.chdir(tempfile.mkdtemp())
+
+from sqlmodel import Session, SQLModel, insert, func, select
+from app.database import engine
+from app.models import ChatMessage, ChatArchiveEntry, ChatSession
+from app.chat_archive import archive_chats, read_archived_messages
+from app.config import CHAT_ARCHIVE_DIR
+
+SESSIONS = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+MESSAGES_PER_SESSION = 10
+
+
+def seed():
+    SQLModel.metadata.create_all(engine)
+    old = datetime.datetime.utcnow() - datetime.timedelta(days=365)
+    rows = []
+    for s in range(SESSIONS):
+        for i in range(MESSAGES_PER_SESSION - 1):
+            rows.append({
+                "session_id": f"session-{s}", "sender": "user" if i % 2 == 0 else "bot",
+                "message": f"Hogyan tudok eseményt létrehozni? ({s}/{i})" if i % 2 == 0
+                else "Az Új esemény gombbal, a cím, kezdés és befejezés megadásával.",
+                "timestamp": old + datetime.timedelta(seconds=s * MESSAGES_PER_SESSION + i),
+                "needs_human": False,
+            })
+        # Az admin lezárta: csak a lezárt beszélgetés archiválható
+        rows.append({
+            "session_id": f"session-{s}", "sender": "system",
+            "message": "A beszélgetést az adminisztrátor lezárta. Visszatérés AI módba.",
+            "timestamp": old + datetime.timedelta(seconds=(s + 1) * MESSAGES_PER_SESSION - 1),
+            "needs_human": False,
+        })
+    with Session(engine) as session:
+        session.execute(insert(ChatMessage), rows)
+        session.execute(insert(ChatSession), [
+            {
+                "session_id": f"session-{s}", "status": "resolved", "needs_human": False,
+                "last_message_at": old + datetime.timedelta(seconds=(s + 1) * MESSAGES_PER_SESSION - 1),
+                "last_message_id": (s + 1) * MESSAGES_PER_SESSION, "last_sender": "system",
+                "unread_count": 0, "archived_through_id": 0,
+            }
+            for s in range(SESSIONS)
+        ])
+        session.commit()
+
+
+def hot_rows() -> int:
+    with Session(engine) as session:
+        return session.exec(select(func.count()).select_from(ChatMessage)).one()
+
+
+def percentile(values, p: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))] * 1000 if values else 0.0
+
+
+def main():
+    seed()
+    before = hot_rows()
+    stop = threading.Event()
+    latencies = []
+
+    def writer():
+        n = 0
+        while not stop.is_set():
+            start = time.perf_counter()
+            with Session(engine) as session:
+                session.add(ChatMessage(session_id=f"live-{n % 50}", sender="user", message="élő üzenet"))
+                session.commit()
+            latencies.append(time.perf_counter() - start)
+            n += 1
+            time.sleep(0.002)
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    start = time.perf_counter()
+    archived = archive_chats()
+    elapsed = time.perf_counter() - start
+    stop.set()
+    thread.join()
+
+    size = sum(os.path.getsize(os.path.join(CHAT_ARCHIVE_DIR, n)) for n in os.listdir(CHAT_ARCHIVE_DIR))
+    with Session(engine) as session:
+        entries = session.exec(select(ChatArchiveEntry).where(ChatArchiveEntry.session_id == "session-7")).all()
+    start_read = time.perf_counter()
+    transcript = read_archived_messages(entries)
+    read_ms = (time.perf_counter() - start_read) * 1000
+    assert len(transcript) == MESSAGES_PER_SESSION
+
+    print(f"{SESSIONS} beszélgetés, {before} üzenet a forró táblában")
+    print(f"Archiválva: {archived} üzenet {elapsed:.2f} s alatt ({archived / elapsed:,.0f} üzenet/s), "
+          f"forró tábla utána: {hot_rows()} sor")
+    print(f"Archívum mérete: {size / 1024:.0f} KB ({size / archived:.1f} bájt/üzenet)")
+    print(f"Egyidejű beszúrás ({len(latencies)} db): p99 {percentile(latencies, 0.99):.1f} ms, "
+          f"max {max(latencies) * 1000:.1f} ms")
+    print(f"Archivált beszélgetés visszaolvasása: {read_ms:.2f} ms")
+
+
+if __name__ == "__main__":
+    main()
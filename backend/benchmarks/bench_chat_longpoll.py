@@ -0,0 +1,125 @@
+"""
+Chat előzmények benchmark tétlen helpdesk ablakokkal: N nyitott widget, M másodpercig
+- előtte: 3 másodpercenként a teljes előzmény lekérése (GET /chat/history/{id})
+- utána: after_id + long-poll (wait), az ébresztés a hub értesítéséből jön
+
+Mért értékek (az első betöltés után): DB lekérdezések, válaszbájtok, és egy tétlen widget
+ébredési késleltetése új üzenetnél.
+
+Futtatás a backend mappából: python -m benchmarks.bench_chat_longpoll [widgetek száma] [másodperc]
+"""
+import asyncio, datetime, os, sys, tempfile, time
+from cryptography.fernet import Fernet
+
+os.environ.setdefault("ENCRYPTION_KEY", Fernet.generate_key().decode())
+os.chdir(tempfile.mkdtemp())
+
+import httpx
+from fastapi import FastAPI
+from sqlalchemy import event
+from sqlmodel import Session, SQLModel, insert
+from app.database import engine, async_engine
+from app.models import ChatMessage
+from app.pubsub import hub
+from app import chat
+
+WIDGETS = int(sys.argv[1]) if len(sys.argv) > 1 else 200
+DURATION = float(sys.argv[2]) if len(sys.argv) > 2 else 9
+MESSAGES_PER_SESSION = 30
+POLL_INTERVAL = 3
+WAIT = 25
+WARMUP = 3
+
+statements = 0
+
+
+def count_statement(*args):
+    global statements
+    statements += 1
+
+
+def seed():
+    SQLModel.metadata.create_all(engine)
+    start = datetime.datetime(2026, 1, 1)
+    with Session(engine) as session:
+        session.execute(insert(ChatMessage), [
+            {
+                "session_id": f"w{w}", "sender": "user" if i % 2 == 0 else "bot", "needs_human": False,
+                "message": "Hogyan tudok eseményt létrehozni? Az Új esemény gombbal.",
+                "timestamp": start + datetime.timedelta(seconds=w * MESSAGES_PER_SESSION + i),
+            }
+            for w in range(WIDGETS) for i in range(MESSAGES_PER_SESSION)
+        ])
+        session.commit()
+
+
+async def polling(client: httpx.AsyncClient, widget: int, stop: asyncio.Event, totals: dict):
+    while not stop.is_set():
+        response = await client.get(f"/chat/history/w{widget}")
+        totals["bytes"] += len(response.content)
+        try:
+            await asyncio.wait_for(stop.wait(), POLL_INTERVAL)
+        except asyncio.TimeoutError:
+            pass
+
+
+async def long_polling(client: httpx.AsyncClient, widget: int, stop: asyncio.Event, totals: dict):
+    response = await client.get(f"/chat/history/w{widget}")
+    totals["bytes"] += len(response.content)
+    after_id = response.json()[-1]["id"]
+    while not stop.is_set():
+        response = await client.get(f"/chat/history/w{widget}", params={"after_id": after_id, "wait": WAIT})
+        totals["bytes"] += len(response.content)
+        messages = response.json()
+        if messages:
+            after_id = messages[-1]["id"]
+            totals["received"] = time.perf_counter()
+
+
+async def run(client: httpx.AsyncClient, widget_loop) -> dict:
+    """A widgetek első (teljes) betöltése után csak a tétlen állapot költségét számolja"""
+    global statements
+    totals = {"bytes": 0, "received": None}
+    stop = asyncio.Event()
+    tasks = [asyncio.create_task(widget_loop(client, w, stop, totals)) for w in range(WIDGETS)]
+    await asyncio.sleep(WARMUP)
+    statements, totals["bytes"] = 0, 0
+    await asyncio.sleep(DURATION)
+
+    # Egy új üzenet az első widgetnek: mennyi idő alatt ér oda
+    sent = time.perf_counter()
+    async with chat.AsyncSession(async_engine, expire_on_commit=False) as session:
+        message = await chat.add_message(session, "w0", "admin", "Itt vagyok, segítek.", needs_human=True)
+        await chat.commit_messages(session, message)
+    await asyncio.sleep(0.2)
+    wakeup = (totals["received"] - sent) * 1000 if totals["received"] else None
+
+    stop.set()
+    for task in tasks:
+        task.cancel()
+    await asyncio.gather(*tasks, return_exceptions=True)
+    return {"statements": statements, "bytes": totals["bytes"], "wakeup": wakeup}
+
+
+async def main():
+    seed()
+    event.listen(async_engine.sync_engine, "before_cursor_execute", count_statement)
+    bench = FastAPI()
+    bench.include_router(chat.router)
+    transport = httpx.ASGITransport(app=bench)
+    await hub.start()
+
+    print(f"{WIDGETS} tétlen widget, {DURATION:.0f} s, {MESSAGES_PER_SESSION} üzenet/beszélgetés\n")
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench", timeout=60) as client:
+        old = await run(client, polling)
+        new = await run(client, long_polling)
+
+    print(f"előtte (3 mp-es polling):  {old['statements']:6d} DB lekérdezés  {old['bytes'] / 1024:9.1f} KB")
+    print(f"utána (after_id + long-poll): {new['statements']:3d} DB lekérdezés  {new['bytes'] / 1024:9.1f} KB  "
+          f"ébredés: {new['wakeup']:.1f} ms")
+    await hub.stop()
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,156 @@
+"""
+Helpdesk WebSocket benchmark: N tétlen widget socket + egy admin multiplex socket egy valódi uvicorn
+szerveren - mért értékek: memória és taskok socketenként, DB lekérdezések tétlen állapotban (szívveréssel),
+kézbesítési késleltetés (commit -> widget és admin), és egy nem olvasó kliens hatása a többiekre
+
+Futtatás a backend mappából: python -m benchmarks.bench_chat_ws [socketek száma] [másodperc]
+"""
+import asyncio, json, os, socket, sys, tempfile, time
+from cryptography.fernet import Fernet
+
+os.environ.setdefault("ENCRYPTION_KEY", Fernet.generate_key().decode())
+os.environ.setdefault("CHAT_WS_HEARTBEAT", "2")
+os.chdir(tempfile.mkdtemp())
+
+import uvicorn, websockets
+from fastapi import FastAPI
+from sqlalchemy import event
+from sqlmodel import Session, SQLModel
+from app.database import engine, async_engine
+from app.dependencies import create_access_token
+from app.models import User
+from app.pubsub import hub
+from app import chat, helpdesk
+
+SOCKETS = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+IDLE = float(sys.argv[2]) if len(sys.argv) > 2 else 6
+DELIVERIES = 200
+SLOW_BURST = 500
+
+statements = 0
+
+
+def count_statement(*args):
+    global statements
+    statements += 1
+
+
+def rss_kb() -> int:
+    with open("/proc/self/status") as status:
+        for line in status:
+            if line.startswith("VmRSS:"):
+                return int(line.split()[1])
+    return 0
+
+
+def percentile(values, p: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))] * 1000 if values else 0.0
+
+
+async def widget(url: str, received: dict, ready: asyncio.Event, counter: list):
+    """Tétlen widget: válaszol a pingre, és rögzíti, mikor kapta meg az egyes üzeneteket"""
+    async with websockets.connect(url, max_queue=None) as ws:
+        counter[0] += 1
+        if counter[0] == counter[1]:
+            ready.set()
+        async for raw in ws:
+            frame = json.loads(raw)
+            if frame["type"] == "ping":
+                await ws.send(json.dumps({"type": "pong"}))
+            elif frame["type"] == "messages":
+                now = time.perf_counter()
+                for message in frame["messages"]:
+                    received[message["message"]] = now
+
+
+async def post(session_id: str, text: str):
+    async with chat.AsyncSession(async_engine, expire_on_commit=False) as session:
+        message = await helpdesk.add_message(session, session_id, "admin", text, needs_human=True)
+        await helpdesk.commit_messages(session, message)
+
+
+async def main():
+    global statements
+    SQLModel.metadata.create_all(engine)
+    with Session(engine) as session:
+        session.add(User(username="bench-admin", hashed_password="-", role="admin"))
+        session.commit()
+    bench = FastAPI()
+    bench.include_router(chat.router)
+    with socket.socket() as probe:
+        probe.bind(("127.0.0.1", 0))
+        port = probe.getsockname()[1]
+    server = uvicorn.Server(uvicorn.Config(bench, host="127.0.0.1", port=port, log_level="error"))
+    await hub.start()
+    serving = asyncio.create_task(server.serve())
+    while not server.started:
+        await asyncio.sleep(0.05)
+
+    base = f"ws://127.0.0.1:{port}"
+    rss_before, tasks_before = rss_kb(), len(asyncio.all_tasks())
+    received, admin_received = {}, {}
+    ready = asyncio.Event()
+    counter = [0, SOCKETS + 1]
+    clients = [asyncio.create_task(widget(f"{base}/ws/chat/w{w}", received, ready, counter)) for w in range(SOCKETS)]
+    admin_url = f"{base}/ws/admin/chat?token={create_access_token({'sub': 'bench-admin'})}"
+    clients.append(asyncio.create_task(widget(admin_url, admin_received, ready, counter)))
+    await asyncio.wait_for(ready.wait(), 120)
+    await asyncio.sleep(1)
+    opened = time.perf_counter()
+    print(f"{SOCKETS} widget socket + 1 admin socket, tétlen {IDLE:.0f} s, szívverés {os.environ['CHAT_WS_HEARTBEAT']} s\n")
+    rss_per_socket = (rss_kb() - rss_before) / (SOCKETS + 1)
+    tasks_per_socket = (len(asyncio.all_tasks()) - tasks_before) / (SOCKETS + 1)
+
+    event.listen(async_engine.sync_engine, "before_cursor_execute", count_statement)
+    statements = 0
+    await asyncio.sleep(IDLE)
+    idle_statements = statements
+
+    # Kézbesítés: minden üzenet a widgetjéhez és az admin sockethez is
+    sent = {}
+    for i in range(DELIVERIES):
+        text = f"m{i}"
+        sent[text] = time.perf_counter()
+        await post(f"w{i * 7 % SOCKETS}", text)
+        await asyncio.sleep(0.005)
+    await asyncio.sleep(0.5)
+    widget_latency = [received[t] - s for t, s in sent.items() if t in received]
+    admin_latency = [admin_received[t] - s for t, s in sent.items() if t in admin_received]
+
+    # Nem olvasó kliens: SLOW_BURST üzenet a beszélgetésébe; a többiek késleltetése közben
+    reader = await websockets.connect(f"{base}/ws/chat/slow", max_queue=1)
+    reader.transport.pause_reading()
+    slow_latency, start = [], time.perf_counter()
+    for i in range(SLOW_BURST):
+        await post("slow", "x" * 2000)
+        if i % 50 == 0:
+            text = f"probe{i}"
+            sent_at = time.perf_counter()
+            await post("w1", text)
+            await asyncio.sleep(0.02)
+            if text in received:
+                slow_latency.append(received[text] - sent_at)
+    slow_elapsed = time.perf_counter() - start
+    reader.transport.abort()
+
+    print(f"memória: {rss_per_socket:.1f} KB/socket (kliens + szerver oldal együtt), taskok: {tasks_per_socket:.1f}/socket")
+    print(f"tétlen állapot: {idle_statements} DB lekérdezés {IDLE:.0f} s alatt ({time.perf_counter() - opened:.0f} s nyitva)")
+    print(f"kézbesítés widgetnek ({len(widget_latency)}/{DELIVERIES}): p50 {percentile(widget_latency, 0.5):.1f} ms, "
+          f"p99 {percentile(widget_latency, 0.99):.1f} ms")
+    print(f"kézbesítés adminnak ({len(admin_latency)}/{DELIVERIES}): p50 {percentile(admin_latency, 0.5):.1f} ms, "
+          f"p99 {percentile(admin_latency, 0.99):.1f} ms")
+    print(f"nem olvasó kliens mellett ({SLOW_BURST} üzenet {slow_elapsed:.1f} s alatt): többi widget "
+          f"p99 {percentile(slow_latency, 0.99):.1f} ms ({len(slow_latency)} minta)")
+
+    for client in clients:
+        client.cancel()
+    await asyncio.gather(*clients, return_exceptions=True)
+    server.should_exit = True
+    await serving
+    await hub.stop()
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,98 @@
+"""
+Ütközésvizsgálat benchmark egy tulajdonos nagy előzményével (POST /events/check-conflict lekérdezései)
+- előtte: egyetlen feltétel (owner=? AND start_date<? AND (end_date>? OR series_end>?)) - az indexen a
+  tulajdonos teljes múltja végigolvasódik az ablakig
+- utána: app.events.find_overlapping - egy, előre felépített lekérdezés; a kezdés alulról is korlátos (leghosszabb alkalom a
+  kifejezés-indexből), a sorozatok külön ágon, a series_end részleges indexén
+
+Futtatás a backend mappából: python -m benchmarks.bench_conflict_check [események száma]
+"""
+import asyncio, datetime, os, random, sys, tempfile, time
+from cryptography.fernet import Fernet
+
+os.environ.setdefault("ENCRYPTION_KEY", Fernet.generate_key().decode())
+os.chdir(tempfile.mkdtemp())
+
+from sqlmodel import Session, SQLModel, insert, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.database import engine, async_engine
+from app.models import Event
+from app.events import overlaps, find_overlapping
+from app.recurrence import parse_rrule, series_end
+
+EVENTS = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+SERIES = 20
+CHECKS = 500
+OWNER = "sok_esemeny"
+START = datetime.datetime(2015, 1, 1, 8)
+
+
+def seed():
+    SQLModel.metadata.create_all(engine)
+    random.seed(7)
+    rows = []
+    for i in range(EVENTS):
+        start = START + datetime.timedelta(hours=i)
+        rows.append({
+            "title": f"esemény {i}", "owner": OWNER, "start_date": start,
+            "end_date": start + datetime.timedelta(minutes=random.randint(15, 90)),
+            "is_public": False, "is_meeting": False, "version": 0, "participant_count": 1,
+        })
+    for i in range(SERIES):
+        start = START + datetime.timedelta(days=30 * i, hours=3)
+        end = start + datetime.timedelta(hours=1)
+        rrule = "FREQ=WEEKLY;BYDAY=MO,TH" if i % 2 else "FREQ=DAILY;COUNT=200"
+        rows.append({
+            "title": f"sorozat {i}", "owner": OWNER, "start_date": start, "end_date": end,
+            "rrule": rrule, "series_end": series_end(start, end, parse_rrule(rrule)),
+            "is_public": False, "is_meeting": False, "version": 0, "participant_count": 1,
+        })
+    with Session(engine) as session:
+        session.execute(insert(Event), rows)
+        session.commit()
+
+
+def windows():
+    random.seed(3)
+    span = EVENTS * 3600
+    result = []
+    for _ in range(CHECKS):
+        start = START + datetime.timedelta(seconds=random.randint(0, span))
+        result.append((start, start + datetime.timedelta(minutes=45)))
+    return result
+
+
+async def legacy(session: AsyncSession, start, end):
+    return (await session.exec(select(Event.id).where(Event.owner == OWNER, overlaps(start, end)))).all()
+
+
+async def bounded(session: AsyncSession, start, end):
+    return [row.id for row in await find_overlapping(session, (Event.id,), OWNER, start, end)]
+
+
+async def timed(function, checks) -> tuple:
+    timings, found = [], []
+    async with AsyncSession(async_engine) as session:
+        for start, end in checks:
+            began = time.perf_counter()
+            ids = await function(session, start, end)
+            timings.append((time.perf_counter() - began) * 1000)
+            found.append(sorted(ids))
+    timings.sort()
+    return timings[len(timings) // 2], timings[int(len(timings) * 0.99)], found
+
+
+async def main():
+    seed()
+    checks = windows()
+    print(f"{EVENTS} esemény + {SERIES} sorozat egy tulajdonosnál, {CHECKS} ütközésvizsgálat véletlen időpontokra\n")
+    old_p50, old_p99, old_found = await timed(legacy, checks)
+    new_p50, new_p99, new_found = await timed(bounded, checks)
+    assert old_found == new_found, "az eredmények eltérnek"
+    print(f"előtte (egy feltétel, múlt végigolvasása): p50 {old_p50:7.3f} ms  p99 {old_p99:7.3f} ms")
+    print(f"utána (alsó korlát + külön sorozatok):   p50 {new_p50:7.3f} ms  p99 {new_p99:7.3f} ms")
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
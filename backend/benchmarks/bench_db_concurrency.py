@@ -0,0 +1,165 @@
+"""
+Adatbázis-réteg konkurencia benchmark: ugyanaz a vegyes (olvasás + írás) terhelés
+- előtte: szinkron Session az async kezelőben, hangolatlan create_engine (rollback journal)
+- utána: aiosqlite AsyncSession, WAL + synchronous=NORMAL + busy_timeout + mmap (app.database)
+
+Mért értékek: kérés/s, a DB-kérések p50/p99 ideje, valamint egy adatbázist nem használó
+végpont p99 késleltetése a terhelés alatt (mennyire blokkol az eseményhurok).
+
+A régi beállítás alapértelmezett kapcsolatkészlete (5 + 10) felett a szinkron változat
+megakad: a készletre váró kérés blokkolja az eseményhurkot, így a kapcsolatot tartó többi
+kérés sem tud befejeződni (30 mp várakozás, majd hiba). Ezért az alapértelmezett egyidejűség 12.
+
+Futtatás a backend mappából: python -m benchmarks.bench_db_concurrency [kérések száma] [egyidejű kérések]
+"""
+import asyncio, datetime, os, random, sys, tempfile, time
+from cryptography.fernet import Fernet
+
+os.environ.setdefault("ENCRYPTION_KEY", Fernet.generate_key().decode())
+os.chdir(tempfile.mkdtemp())
+
+import httpx
+from fastapi import Depends, FastAPI
+from sqlmodel import Session, SQLModel, create_engine, insert, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.database import engine, async_engine, get_session
+from app.models import ChatMessage, Event, EventParticipant
+
+REQUESTS = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+CONCURRENCY = int(sys.argv[2]) if len(sys.argv) > 2 else 12
+EVENTS = 5000
+USERS = 50
+WRITE_RATIO = 0.2
+PROBE_INTERVAL = 0.005
+
+legacy_engine = create_engine("sqlite:///legacy.db")
+
+
+def seed(target_engine):
+    SQLModel.metadata.create_all(target_engine)
+    start = datetime.datetime(2026, 1, 1, 9)
+    with Session(target_engine) as session:
+        session.execute(insert(Event), [
+            {
+                "id": i, "title": f"Esemény {i}", "owner": f"user{i % USERS}",
+                "start_date": start + datetime.timedelta(hours=i), "end_date": start + datetime.timedelta(hours=i, minutes=30),
+                "participants": f"user{i % USERS}", "participant_count": 1, "version": 0,
+            }
+            for i in range(1, EVENTS + 1)
+        ])
+        session.execute(insert(EventParticipant), [
+            {"event_id": i, "username": f"user{i % USERS}"} for i in range(1, EVENTS + 1)
+        ])
+        session.commit()
+
+
+def events_query(username: str):
+    return (
+        select(Event)
+        .join(EventParticipant, EventParticipant.event_id == Event.id)
+        .where(EventParticipant.username == username)
+        .order_by(Event.start_date, Event.id)
+        .limit(50)
+    )
+
+
+def create_bench_app() -> FastAPI:
+    bench = FastAPI()
+
+    def get_legacy_session():
+        with Session(legacy_engine) as session:
+            yield session
+
+    @bench.get("/ping")
+    async def ping():
+        return {"ok": True}
+
+    @bench.get("/legacy/events/{username}")
+    async def legacy_read(username: str, session: Session = Depends(get_legacy_session)):
+        return len(session.exec(events_query(username)).all())
+
+    @bench.post("/legacy/chat/{session_id}")
+    async def legacy_write(session_id: str, session: Session = Depends(get_legacy_session)):
+        session.add(ChatMessage(session_id=session_id, sender="user", message="benchmark"))
+        session.commit()
+        return {"status": "ok"}
+
+    @bench.get("/async/events/{username}")
+    async def async_read(username: str, session: AsyncSession = Depends(get_session)):
+        return len((await session.exec(events_query(username))).all())
+
+    @bench.post("/async/chat/{session_id}")
+    async def async_write(session_id: str, session: AsyncSession = Depends(get_session)):
+        session.add(ChatMessage(session_id=session_id, sender="user", message="benchmark"))
+        await session.commit()
+        return {"status": "ok"}
+
+    return bench
+
+
+def percentile(values, p: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))] * 1000 if values else 0.0
+
+
+async def load(client: httpx.AsyncClient, prefix: str) -> dict:
+    rng = random.Random(1)
+    plan = [rng.random() < WRITE_RATIO for _ in range(REQUESTS)]
+    latencies, probes = [], []
+    semaphore = asyncio.Semaphore(CONCURRENCY)
+    done = asyncio.Event()
+
+    async def one(index: int, write: bool):
+        async with semaphore:
+            start = time.perf_counter()
+            if write:
+                response = await client.post(f"/{prefix}/chat/s{index % 100}")
+            else:
+                response = await client.get(f"/{prefix}/events/user{index % USERS}")
+            assert response.status_code == 200, response.text
+            latencies.append(time.perf_counter() - start)
+
+    async def probe():
+        while not done.is_set():
+            start = time.perf_counter()
+            await client.get("/ping")
+            probes.append(time.perf_counter() - start)
+            await asyncio.sleep(PROBE_INTERVAL)
+
+    probe_task = asyncio.create_task(probe())
+    start = time.perf_counter()
+    await asyncio.gather(*(one(i, write) for i, write in enumerate(plan)))
+    elapsed = time.perf_counter() - start
+    done.set()
+    await probe_task
+
+    return {
+        "rps": REQUESTS / elapsed,
+        "p50": percentile(latencies, 0.50),
+        "p99": percentile(latencies, 0.99),
+        "probe_p99": percentile(probes, 0.99),
+    }
+
+
+async def main():
+    seed(legacy_engine)
+    seed(engine)
+    transport = httpx.ASGITransport(app=create_bench_app())
+
+    print(f"{REQUESTS} kérés ({WRITE_RATIO:.0%} írás), {CONCURRENCY} egyidejű, {EVENTS} esemény\n")
+    results = {}
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        for label, prefix in (("előtte (sync Session)", "legacy"), ("utána (AsyncSession)", "async")):
+            results[prefix] = result = await load(client, prefix)
+            print(
+                f"{label:<24} {result['rps']:8.1f} kérés/s   DB p50 {result['p50']:7.1f} ms   "
+                f"p99 {result['p99']:7.1f} ms   /ping p99 {result['probe_p99']:7.1f} ms"
+            )
+    await async_engine.dispose()
+
+    print(f"\nÁtviteli arány: {results['async']['rps'] / results['legacy']['rps']:.2f}x, "
+          f"/ping p99: {results['legacy']['probe_p99']:.1f} ms -> {results['async']['probe_p99']:.1f} ms")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
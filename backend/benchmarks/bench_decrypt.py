@@ -0,0 +1,54 @@
+"""
+Leírás-visszafejtés benchmark: gyorsítótár nélkül, hideg és meleg cache-sel, kötegelve
+
+Futtatás a backend mappából: python -m benchmarks.bench_decrypt
+"""
+import os, time
+from cryptography.fernet import Fernet
+
+os.environ.setdefault("ENCRYPTION_KEY", Fernet.generate_key().decode())
+
+from app.utils import cipher_suite, encrypt_text, decrypt_text, decrypt_many, decrypt_cache
+
+ROWS = 5000
+POLLS = 20
+
+
+def timed(label: str, func) -> float:
+    start = time.perf_counter()
+    func()
+    elapsed = time.perf_counter() - start
+    print(f"{label:<38} {elapsed * 1000:9.2f} ms  ({elapsed / ROWS * 1e6:6.2f} µs/sor)")
+    return elapsed
+
+
+def main():
+    descriptions = [encrypt_text(f"Esemény leírás #{i} " + "x" * 200) for i in range(ROWS)]
+    print(f"{ROWS} titkosított leírás, {POLLS} ismételt lekérés\n")
+
+    baseline = timed("cache nélkül (Fernet soronként)", lambda: [
+        cipher_suite.decrypt(text.encode()).decode() for text in descriptions
+    ])
+
+    decrypt_cache.clear()
+    timed("hideg cache, soronként", lambda: [decrypt_text(text) for text in descriptions])
+
+    decrypt_cache.clear()
+    timed("hideg cache, decrypt_many (szálkészlet)", lambda: decrypt_many(descriptions))
+
+    def polls():
+        for _ in range(POLLS):
+            decrypt_many(descriptions)
+
+    start = time.perf_counter()
+    polls()
+    warm = (time.perf_counter() - start) / POLLS
+    print(f"{'meleg cache, decrypt_many / lekérés':<38} {warm * 1000:9.2f} ms  ({warm / ROWS * 1e6:6.2f} µs/sor)")
+
+    stats = decrypt_cache.stats()
+    print(f"\nGyorsulás meleg cache-sel: {baseline / warm:.1f}x")
+    print(f"Találati arány: {stats['hit_rate']:.1%} ({stats['entries']} bejegyzés, {stats['bytes'] / 1024:.0f} KiB)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,137 @@
+"""
+Naptár listázás benchmark egy nagy előzményű tulajdonossal (GET /events/public, /events/user/{név}, /events)
+- előtte: start_date < to ÉS overlaps(from) - az OR miatt csak a felső határ indexelt, az ablak előtti teljes
+  múlt végigolvasódik; a /events a résztvevő-index után ideiglenes B-fán rendez, a joined_ids a tulajdonos összes eseménye
+- utána: app.events.apply_window - alulról is korlátos kezdés (a kör leghosszabb alkalma a kifejezés-indexből),
+  sorozatok külön ágon, a /events a résztvevő-kapcsolat másolt időpontjain; a joined_ids csak az oldal eseményei
+
+Futtatás a backend mappából: python -m benchmarks.bench_event_window [események száma]
+"""
+import asyncio, datetime, os, random, sys, tempfile, time
+from cryptography.fernet import Fernet
+
+os.environ.setdefault("ENCRYPTION_KEY", Fernet.generate_key().decode())
+os.chdir(tempfile.mkdtemp())
+
+from sqlmodel import Session, SQLModel, insert, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.database import engine, async_engine
+from app.models import Event, EventParticipant
+from app.events import PARTICIPANT_WINDOW, apply_window, overlaps
+from app.recurrence import parse_rrule, series_end
+
+EVENTS = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+SERIES = 20
+CHECKS = 200
+LIMIT = 50
+OWNER = "sok_esemeny"
+START = datetime.datetime(2015, 1, 1, 8)
+POSITIONS = {"eleje": 0.05, "közepe": 0.5, "vége": 0.95}
+
+
+def seed():
+    SQLModel.metadata.create_all(engine)
+    random.seed(7)
+    rows = []
+    for i in range(EVENTS):
+        start = START + datetime.timedelta(hours=i)
+        rows.append({
+            "id": i + 1, "title": f"esemény {i}", "owner": OWNER, "start_date": start,
+            "end_date": start + datetime.timedelta(minutes=random.randint(15, 90)),
+            "is_public": i % 2 == 0, "is_meeting": False, "version": 0, "participant_count": 1,
+        })
+    for i in range(SERIES):
+        start = START + datetime.timedelta(days=150 * i, hours=3)
+        end = start + datetime.timedelta(hours=1)
+        rrule = "FREQ=WEEKLY;BYDAY=MO,TH" if i % 2 else "FREQ=DAILY;COUNT=200"
+        rows.append({
+            "id": EVENTS + i + 1, "title": f"sorozat {i}", "owner": OWNER, "start_date": start, "end_date": end,
+            "rrule": rrule, "series_end": series_end(start, end, parse_rrule(rrule)),
+            "is_public": True, "is_meeting": False, "version": 0, "participant_count": 1,
+        })
+    links = [
+        {"event_id": row["id"], "username": OWNER, "start_date": row["start_date"],
+         "end_date": row["end_date"], "series_end": row.get("series_end")}
+        for row in rows
+    ]
+    with Session(engine) as session:
+        session.execute(insert(Event), rows)
+        session.execute(insert(EventParticipant), links)
+        session.commit()
+
+
+def legacy_window(statement, date_from, date_to):
+    return statement.where(overlaps(date_from), Event.start_date < date_to).order_by(Event.start_date, Event.id)
+
+
+async def legacy(session: AsyncSession, scope: str, date_from, date_to):
+    if scope == "public":
+        statement = legacy_window(select(Event).where(Event.is_public == True), date_from, date_to)
+    elif scope == "owner":
+        statement = legacy_window(select(Event).where(Event.owner == OWNER), date_from, date_to)
+    else:
+        statement = legacy_window(
+            select(Event).join(EventParticipant, EventParticipant.event_id == Event.id)
+            .where(EventParticipant.username == OWNER), date_from, date_to
+        )
+    events = (await session.exec(statement.limit(LIMIT + 1))).all()
+    if scope == "owner":
+        (await session.exec(
+            select(EventParticipant.event_id).join(Event, Event.id == EventParticipant.event_id)
+            .where(EventParticipant.username == OWNER, Event.owner == OWNER)
+        )).all()
+    return [event.id for event in events]
+
+
+async def bounded(session: AsyncSession, scope: str, date_from, date_to):
+    if scope == "public":
+        statement = apply_window(Event.is_public == True, date_from, date_to, None)
+    elif scope == "owner":
+        statement = apply_window(Event.owner == OWNER, date_from, date_to, None)
+    else:
+        statement = apply_window(EventParticipant.username == OWNER, date_from, date_to, None, PARTICIPANT_WINDOW)
+    events = (await session.exec(statement.limit(LIMIT + 1))).all()
+    if scope == "owner" and events:
+        (await session.exec(select(EventParticipant.event_id).where(
+            EventParticipant.username == OWNER, EventParticipant.event_id.in_([event.id for event in events])
+        ))).all()
+    return [event.id for event in events]
+
+
+def windows(position: float):
+    random.seed(3)
+    span = EVENTS * 3600
+    result = []
+    for _ in range(CHECKS):
+        start = START + datetime.timedelta(seconds=int(span * position) + random.randint(-86400, 86400))
+        result.append((start, start + datetime.timedelta(days=1)))
+    return result
+
+
+async def timed(function, scope, checks) -> tuple:
+    timings, found = [], []
+    async with AsyncSession(async_engine) as session:
+        for date_from, date_to in checks:
+            began = time.perf_counter()
+            ids = await function(session, scope, date_from, date_to)
+            timings.append((time.perf_counter() - began) * 1000)
+            found.append(ids)
+    timings.sort()
+    return timings[len(timings) // 2], found
+
+
+async def main():
+    seed()
+    print(f"{EVENTS} esemény + {SERIES} sorozat egy tulajdonosnál, 1 napos ablakok, oldalméret {LIMIT}\n")
+    for scope in ("public", "owner", "participant"):
+        for label, position in POSITIONS.items():
+            checks = windows(position)
+            old_p50, old_found = await timed(legacy, scope, checks)
+            new_p50, new_found = await timed(bounded, scope, checks)
+            assert old_found == new_found, f"az eredmények eltérnek ({scope}, {label})"
+            print(f"{scope:12} előzmény {label:7} előtte p50 {old_p50:8.3f} ms   utána p50 {new_p50:7.3f} ms")
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,115 @@
+"""
+Foglaltság-lekérdezés benchmark (POST /events/freebusy, /events/find-slots - app.events.load_busy) nagy előzménnyel
+- előtte: résztvevő-kapcsolat (username index) JOIN esemény, időablak-feltétel az eseményen - a felhasználók teljes
+  múltja végigolvasódik, és minden kapcsolathoz egy esemény-sorkeresés tartozik
+- utána: az időpontok a kapcsolatban, fedő (username, start_date, end_date, series_end) index, felhasználónként
+  alulról korlátos tartomány (leghosszabb alkalom a kifejezés-indexből), a sorozatok külön ágon
+
+Futtatás a backend mappából: python -m benchmarks.bench_freebusy [események száma]
+"""
+import asyncio, datetime, os, random, sys, tempfile, time
+from cryptography.fernet import Fernet
+
+os.environ.setdefault("ENCRYPTION_KEY", Fernet.generate_key().decode())
+os.chdir(tempfile.mkdtemp())
+
+from sqlmodel import Session, SQLModel, insert, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.database import engine, async_engine
+from app.models import Event, EventParticipant
+from app.events import load_busy, overlaps
+from app import recurrence, scheduling
+from app.recurrence import parse_rrule, series_end
+
+EVENTS = int(sys.argv[1]) if len(sys.argv) > 1 else 100000
+USERS = [f"felhasznalo{i}" for i in range(20)]
+SERIES = 40
+CHECKS = 300
+START = datetime.datetime(2015, 1, 1, 8)
+
+
+def seed():
+    SQLModel.metadata.create_all(engine)
+    random.seed(7)
+    events, links = [], []
+    for i in range(EVENTS + SERIES):
+        if i < EVENTS:
+            start = START + datetime.timedelta(minutes=40 * i)
+            end = start + datetime.timedelta(minutes=random.randint(15, 120))
+            rrule = ends = None
+        else:
+            start = START + datetime.timedelta(days=60 * (i - EVENTS), hours=3)
+            end = start + datetime.timedelta(hours=1)
+            rrule = "FREQ=WEEKLY;BYDAY=TU" if i % 2 else "FREQ=DAILY;COUNT=300"
+            ends = series_end(start, end, parse_rrule(rrule))
+        members = random.sample(USERS, 3)
+        events.append({
+            "id": i + 1, "title": f"esemény {i}", "owner": members[0], "start_date": start, "end_date": end,
+            "rrule": rrule, "series_end": ends, "is_public": False, "is_meeting": False, "version": 0,
+            "participant_count": len(members),
+        })
+        links.extend(
+            {"event_id": i + 1, "username": username, "start_date": start, "end_date": end, "series_end": ends}
+            for username in members
+        )
+    with Session(engine) as session:
+        session.execute(insert(Event), events)
+        session.execute(insert(EventParticipant), links)
+        session.commit()
+
+
+def windows():
+    random.seed(3)
+    span = EVENTS * 40 * 60
+    result = []
+    for _ in range(CHECKS):
+        start = START + datetime.timedelta(seconds=random.randint(0, span))
+        result.append((random.sample(USERS, 5), start, start + datetime.timedelta(days=7)))
+    return result
+
+
+async def legacy(session: AsyncSession, usernames, window_start, window_end):
+    rows = (await session.exec(
+        select(EventParticipant.username, Event.start_date, Event.end_date, Event.rrule, Event.exdates)
+        .join(Event, Event.id == EventParticipant.event_id)
+        .where(EventParticipant.username.in_(usernames), overlaps(window_start, window_end))
+        .order_by(EventParticipant.username, Event.start_date)
+    )).all()
+    intervals = {username: [] for username in usernames}
+    for username, *interval in rows:
+        intervals[username].append(interval)
+    return {
+        username: scheduling.merge_intervals(scheduling.clip(
+            recurrence.expand(busy, window_start, window_end), window_start, window_end
+        ))
+        for username, busy in intervals.items()
+    }
+
+
+async def timed(function, checks) -> tuple:
+    timings, found = [], []
+    async with AsyncSession(async_engine) as session:
+        for usernames, start, end in checks:
+            began = time.perf_counter()
+            busy = await function(session, usernames, start, end)
+            timings.append((time.perf_counter() - began) * 1000)
+            found.append(busy)
+    timings.sort()
+    return timings[len(timings) // 2], timings[int(len(timings) * 0.99)], found
+
+
+async def main():
+    seed()
+    checks = windows()
+    print(f"{EVENTS} esemény + {SERIES} sorozat, {len(USERS)} felhasználó (eseményenként 3 résztvevő), "
+          f"{CHECKS} lekérdezés: 5 felhasználó, 1 hetes ablak\n")
+    old_p50, old_p99, old_found = await timed(legacy, checks)
+    new_p50, new_p99, new_found = await timed(load_busy, checks)
+    assert old_found == new_found, "az eredmények eltérnek"
+    print(f"előtte (username index + esemény sorkeresés): p50 {old_p50:7.3f} ms  p99 {old_p99:7.3f} ms")
+    print(f"utána (fedő index, alsó korlát):            p50 {new_p50:7.3f} ms  p99 {new_p99:7.3f} ms")
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
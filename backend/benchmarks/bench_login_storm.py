@@ -0,0 +1,101 @@
+"""
+Bejelentkezési roham benchmark: egy független végpont (GET /events/public) p50/p99
+késleltetése, miközben párhuzamos bejelentkezések futnak - a bcrypt közvetlenül az
+eseményhurkon (korábbi viselkedés) és a korlátos szálkészletben
+
+Futtatás a backend mappából: python -m benchmarks.bench_login_storm [bejelentkezések száma]
+"""
+import asyncio, os, sys, tempfile, time
+from cryptography.fernet import Fernet
+
+os.environ.setdefault("ENCRYPTION_KEY", Fernet.generate_key().decode())
+os.environ.setdefault("SECRET_KEY", "benchmark-secret-key-" + "x" * 32)
+os.environ.setdefault("ADMIN_USERNAME", "admin")
+os.environ.setdefault("ADMIN_PASSWORD", "benchmark-password")
+os.chdir(tempfile.mkdtemp())
+
+import httpx
+from app.main import app
+from app.rate_limiter import limiter
+from app.dependencies import hash_pool
+from app.migrations import run_migrations
+
+PROBE_INTERVAL = 0.005
+
+
+def percentile(values, p: float) -> float:
+    values = sorted(values)
+    return values[min(len(values) - 1, int(len(values) * p))] * 1000
+
+
+async def storm(client: httpx.AsyncClient, logins: int) -> dict:
+    probes = []
+    done = asyncio.Event()
+
+    async def probe():
+        while not done.is_set():
+            start = time.perf_counter()
+            response = await client.get("/events/public")
+            assert response.status_code == 200
+            probes.append(time.perf_counter() - start)
+            await asyncio.sleep(PROBE_INTERVAL)
+
+    async def login():
+        response = await client.post("/login", json={
+            "username": os.environ["ADMIN_USERNAME"],
+            "password": os.environ["ADMIN_PASSWORD"]
+        })
+        return response.status_code
+
+    probe_task = asyncio.create_task(probe())
+    await asyncio.sleep(0.05)
+    start = time.perf_counter()
+    statuses = await asyncio.gather(*(login() for _ in range(logins)))
+    elapsed = time.perf_counter() - start
+    done.set()
+    await probe_task
+
+    return {
+        "elapsed": elapsed,
+        "ok": statuses.count(200),
+        "probes": len(probes),
+        "p50": percentile(probes, 0.50),
+        "p99": percentile(probes, 0.99),
+        "max": max(probes) * 1000,
+    }
+
+
+def report(label: str, result: dict):
+    print(
+        f"{label:<28} roham: {result['elapsed'] * 1000:8.0f} ms ({result['ok']} sikeres)  "
+        f"független kérés: p50 {result['p50']:7.1f} ms  p99 {result['p99']:7.1f} ms  "
+        f"max {result['max']:7.1f} ms  ({result['probes']} minta)"
+    )
+
+
+async def main():
+    logins = int(sys.argv[1]) if len(sys.argv) > 1 else 20
+    run_migrations()
+    limiter.enabled = False
+
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        print(f"{logins} párhuzamos bejelentkezés, bcrypt szálak: {hash_pool.workers}\n")
+
+        # Korábbi viselkedés: a bcrypt közvetlenül az eseményhurkon fut
+        pooled_run = hash_pool.run
+
+        async def inline_run(func, *args):
+            return func(*args)
+
+        hash_pool.run = inline_run
+        report("eseményhurkon (régi)", await storm(client, logins))
+
+        hash_pool.run = pooled_run
+        report("korlátos szálkészletben", await storm(client, logins))
+
+    print(f"\nSzálkészlet metrikák: {hash_pool.stats()}")
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
@@ -0,0 +1,81 @@
+"""
+Worker-indítás benchmark növekvő adatbázison
+- előtte: minden induláskor lefutó create_all + oszlop-, index- és adatmigrációk + admin lekérdezés
+- utána: run_migrations() naprakész sémán (egyetlen verzió-lekérdezés)
+
+Futtatás a backend mappából: python -m benchmarks.bench_startup [események száma]
+"""
+import datetime, os, sys, tempfile, time
+from cryptography.fernet import Fernet
+
+os.environ.setdefault("ENCRYPTION_KEY", Fernet.generate_key().decode())
+os.environ.setdefault("ADMIN_USERNAME", "admin")
+os.environ.setdefault("ADMIN_PASSWORD", "benchmark-password")
+os.chdir(tempfile.mkdtemp())
+
+from sqlmodel import Session, insert
+from app.database import engine
+from app.models import ChatMessage, Event, EventParticipant
+from app.migrations import MIGRATIONS, run_migrations, immediate_transaction
+
+EVENTS = int(sys.argv[1]) if len(sys.argv) > 1 else 200000
+MESSAGES_PER_EVENT = 2
+ROUNDS = 5
+
+
+def seed():
+    start = datetime.datetime(2026, 1, 1, 9)
+    with Session(engine) as session:
+        session.execute(insert(Event), [
+            {
+                "id": i, "title": f"Esemény {i}", "owner": f"user{i % 100}",
+                "start_date": start + datetime.timedelta(minutes=i), "end_date": start + datetime.timedelta(minutes=i + 30),
+                "participants": f"user{i % 100}", "participant_count": 1, "version": 0,
+            }
+            for i in range(1, EVENTS + 1)
+        ])
+        session.execute(insert(EventParticipant), [
+            {"event_id": i, "username": f"user{i % 100}"} for i in range(1, EVENTS + 1)
+        ])
+        session.execute(insert(ChatMessage), [
+            {"session_id": f"s{i % 5000}", "sender": "user", "message": "benchmark", "needs_human": False,
+             "timestamp": start + datetime.timedelta(seconds=i)}
+            for i in range(EVENTS * MESSAGES_PER_EVENT)
+        ])
+        session.commit()
+
+
+def legacy_startup():
+    """A korábbi on_startup: minden lépés minden induláskor (az idempotens migrációk is végigolvasnak)"""
+    with engine.connect().execution_options(isolation_level="AUTOCOMMIT") as connection:
+        for migration in MIGRATIONS:
+            if migration.online:
+                migration.apply(connection)
+            else:
+                with immediate_transaction(connection):
+                    migration.apply(connection)
+
+
+def timed(function) -> float:
+    timings = []
+    for _ in range(ROUNDS):
+        start = time.perf_counter()
+        function()
+        timings.append((time.perf_counter() - start) * 1000)
+    return sorted(timings)[len(timings) // 2]
+
+
+def main():
+    run_migrations()
+    run_migrations(online=True)
+    seed()
+    print(f"{EVENTS} esemény, {EVENTS * MESSAGES_PER_EVENT} chat üzenet\n")
+
+    legacy = timed(legacy_startup)
+    versioned = timed(run_migrations)
+    print(f"előtte (minden lépés induláskor): {legacy:9.2f} ms")
+    print(f"utána (verzió-ellenőrzés):        {versioned:9.2f} ms  ({legacy / versioned:.0f}x)")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,80 @@
+"""
+Support sor benchmark: GET /admin/support-requests egy oldala
+- előtte: minden ChatMessage betöltése, időrendezés és Python oldali deduplikálás
+- utána: az összesítő tábla indexelt, lapozott lekérdezése (app.helpdesk.support_queue)
+
+Futtatás a backend mappából: python -m benchmarks.bench_support_queue [beszélgetések száma]
+"""
+import asyncio, datetime, os, sys, tempfile, time
+from cryptography.fernet import Fernet
+
+os.environ.setdefault("ENCRYPTION_KEY", Fernet.generate_key().decode())
+os.chdir(tempfile.mkdtemp())
+
+from fastapi import Response
+from sqlmodel import Session, SQLModel, insert, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.database import engine, async_engine
+from app.models import ChatMessage, ChatSession
+from app.helpdesk import support_queue
+
+SESSIONS = int(sys.argv[1]) if len(sys.argv) > 1 else 20000
+MESSAGES_PER_SESSION = 10
+PAGE = 50
+ROUNDS = 20
+
+
+def seed():
+    SQLModel.metadata.create_all(engine)
+    start = datetime.datetime(2026, 1, 1)
+    messages, summaries = [], []
+    for s in range(SESSIONS):
+        for i in range(MESSAGES_PER_SESSION):
+            messages.append({
+                "session_id": f"session-{s}", "sender": "user" if i % 2 == 0 else "bot", "message": "üzenet",
+                "timestamp": start + datetime.timedelta(seconds=s * MESSAGES_PER_SESSION + i),
+                "needs_human": s % 20 == 0,
+            })
+        summaries.append({
+            "session_id": f"session-{s}", "status": "waiting" if s % 20 == 0 else "ai",
+            "needs_human": s % 20 == 0, "last_message_at": messages[-1]["timestamp"],
+            "last_message_id": (s + 1) * MESSAGES_PER_SESSION, "last_sender": "bot",
+            "unread_count": 0, "archived_through_id": 0,
+        })
+    with Session(engine) as session:
+        session.execute(insert(ChatMessage), messages)
+        session.execute(insert(ChatSession), summaries)
+        session.commit()
+
+
+async def legacy_queue(session: AsyncSession):
+    all_msgs = (await session.exec(select(ChatMessage).order_by(ChatMessage.timestamp.desc()))).all()
+    status = {}
+    for msg in all_msgs:
+        if msg.session_id not in status:
+            status[msg.session_id] = msg.needs_human
+    return [{"session_id": sid, "needs_human": needs_human} for sid, needs_human in status.items()]
+
+
+async def timed(function) -> float:
+    timings = []
+    for _ in range(ROUNDS):
+        async with AsyncSession(async_engine, expire_on_commit=False) as session:
+            start = time.perf_counter()
+            await function(session)
+            timings.append((time.perf_counter() - start) * 1000)
+    return sorted(timings)[len(timings) // 2]
+
+
+async def main():
+    seed()
+    print(f"{SESSIONS} beszélgetés, {SESSIONS * MESSAGES_PER_SESSION} üzenet, oldalméret {PAGE}\n")
+    legacy = await timed(legacy_queue)
+    paged = await timed(lambda session: support_queue(session, PAGE, None, None, Response()))
+    print(f"előtte (összes üzenet betöltése): {legacy:9.2f} ms")
+    print(f"utána (összesítő tábla, 1 oldal): {paged:9.2f} ms  ({legacy / paged:.0f}x)")
+    await async_engine.dispose()
+
+
+if __name__ == "__main__":
+    asyncio.run(main())
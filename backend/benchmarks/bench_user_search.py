@@ -0,0 +1,70 @@
+"""
+Felhasználókereső mikrobenchmark: billentyűleütésenkénti keresési idő 50k felhasználónál
+(memóriabeli index vs. a régi teljes /users/list lista + kliensoldali szűrés)
+
+Futtatás a backend mappából: python -m benchmarks.bench_user_search [felhasználók száma]
+"""
+import os, random, string, sys, tempfile, time
+from cryptography.fernet import Fernet
+
+os.environ.setdefault("ENCRYPTION_KEY", Fernet.generate_key().decode())
+os.chdir(tempfile.mkdtemp())
+
+from sqlmodel import Session, SQLModel, insert, select
+from app.database import engine
+from app.models import User
+from app.user_directory import user_directory
+
+USERS = int(sys.argv[1]) if len(sys.argv) > 1 else 50000
+QUERIES = 200
+LIMIT = 20
+BUDGET_MS = 5
+
+random.seed(1)
+
+
+def random_name() -> str:
+    first = random.choice(["anna", "bela", "csaba", "dora", "erik", "fanni", "gabor", "hajnal", "ivan", "judit"])
+    return f"{first}.{''.join(random.choices(string.ascii_lowercase, k=6))}{random.randint(0, 999)}"
+
+
+def main():
+    SQLModel.metadata.create_all(engine)
+    names = list({random_name() for _ in range(USERS)})
+    with Session(engine) as session:
+        session.execute(insert(User), [{"username": n, "hashed_password": "x", "role": "user"} for n in names])
+        session.commit()
+
+    start = time.perf_counter()
+    user_directory.load()
+    print(f"Index betöltése: {(time.perf_counter() - start) * 1000:.1f} ms ({len(names)} felhasználó)")
+
+    # Gépelés szimulálása: egy név első 1..6 karaktere, illetve névközépi részletek
+    keystrokes = []
+    for name in random.sample(names, QUERIES // 2):
+        keystrokes += [name[:n] for n in range(1, 7)]
+        keystrokes += [name[5:5 + n] for n in range(2, 5)]
+
+    timings = []
+    for query in keystrokes:
+        t = time.perf_counter()
+        user_directory.search(query, LIMIT)
+        timings.append((time.perf_counter() - t) * 1000)
+    timings.sort()
+    p50, p99 = timings[len(timings) // 2], timings[int(len(timings) * 0.99)]
+    print(f"Index keresés:    p50 {p50:.3f} ms, p99 {p99:.3f} ms  ({len(keystrokes)} leütés)")
+
+    # Régi út: teljes névlista lekérése és szűrés minden leütésnél
+    t = time.perf_counter()
+    for query in keystrokes[:20]:
+        with Session(engine) as session:
+            everyone = session.exec(select(User.username)).all()
+        [n for n in everyone if query in n.lower()]
+    old = (time.perf_counter() - t) / 20 * 1000
+    print(f"Teljes lista:     {old:.1f} ms/leütés (+ {sum(len(n) + 3 for n in names) / 1024:.0f} KB válasz)")
+
+    print("OK" if p99 < BUDGET_MS else f"LASSÚ: p99 > {BUDGET_MS} ms")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,156 @@
+"""
+Párhuzamos jelentkezés terheléses teszt: 500 egyidejű join egy népszerű eseményre
+
+Minden kérés saját kapcsolattal dolgozik (mint több worker): a régi minta szálakon, az atomi
+aszinkron sessionökkel egy eseményhurkon. A végén ellenőrzi, hogy
+nincs elveszett frissítés: számláló = kapcsolatok száma = résztvevő szöveg elemei,
+a létszámkorlát nem sérül, és minden elutasított jelentkező a várólistára került.
+
+Futtatás a backend mappából: python -m benchmarks.load_join [egyidejű kérések száma]
+"""
+import asyncio, datetime, os, sys, tempfile, time
+from concurrent.futures import ThreadPoolExecutor
+from cryptography.fernet import Fernet
+
+os.environ.setdefault("ENCRYPTION_KEY", Fernet.generate_key().decode())
+os.chdir(tempfile.mkdtemp())
+
+from sqlalchemy.ext.asyncio import create_async_engine
+from sqlmodel import Session, SQLModel, create_engine, select, func, insert
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.models import Event, EventParticipant, EventWaitlist
+from app.dependencies import split_participants
+from app.events import add_participant, remove_participant, promote_waitlist
+
+JOINS = 500
+CAPACITY = 300
+
+engine = create_engine("sqlite:///load_join.db", connect_args={"timeout": 60, "check_same_thread": False})
+async_engine = create_async_engine("sqlite+aiosqlite:///load_join.db", connect_args={"timeout": 60}, pool_size=64)
+
+
+def create_event(capacity) -> int:
+    with Session(engine) as session:
+        event = Event(
+            title="Népszerű esemény", owner="owner", participants="owner",
+            participant_count=1, capacity=capacity, is_public=True,
+            start_date=datetime.datetime(2030, 1, 1, 10), end_date=datetime.datetime(2030, 1, 1, 12)
+        )
+        session.add(event)
+        session.flush()
+        session.add(EventParticipant(event_id=event.id, username="owner"))
+        session.commit()
+        return event.id
+
+
+async def atomic_join(event_id: int, username: str) -> str:
+    async with AsyncSession(async_engine) as session:
+        if await add_participant(session, event_id, username):
+            await session.commit()
+            return "joined"
+        await session.execute(
+            insert(EventWaitlist).prefix_with("OR IGNORE").values(event_id=event_id, username=username)
+        )
+        await session.commit()
+        return "waitlisted"
+
+
+async def gather_limited(func, args, concurrency: int) -> list:
+    """Aszinkron hívások legfeljebb `concurrency` egyidejű futással; a végén a kapcsolatkészlet lezárul"""
+    semaphore = asyncio.Semaphore(concurrency)
+
+    async def limited(arg):
+        async with semaphore:
+            return await func(arg)
+
+    try:
+        return await asyncio.gather(*(limited(arg) for arg in args))
+    finally:
+        await async_engine.dispose()
+
+
+def legacy_join(event_id: int, username: str) -> str:
+    """A korábbi olvasás-módosítás-írás minta, összehasonlításként"""
+    try:
+        with Session(engine) as session:
+            event = session.get(Event, event_id)
+            time.sleep(0)
+            event.participants = ", ".join(filter(None, [event.participants, username]))
+            event.participant_count += 1
+            session.add(event)
+            session.commit()
+            return "joined"
+    except Exception:
+        return "error"
+
+
+def verify(event_id: int) -> dict:
+    with Session(engine) as session:
+        event = session.get(Event, event_id)
+        links = session.exec(select(func.count()).where(EventParticipant.event_id == event_id)).one()
+        waiting = session.exec(select(func.count()).where(EventWaitlist.event_id == event_id)).one()
+        return {
+            "counter": event.participant_count,
+            "links": links,
+            "names": len(split_participants(event.participants)),
+            "waitlist": waiting,
+        }
+
+
+def run(label: str, join, capacity, threads: int) -> dict:
+    event_id = create_event(capacity)
+    users = [f"user{i}" for i in range(JOINS)]
+
+    start = time.perf_counter()
+    if asyncio.iscoroutinefunction(join):
+        results = asyncio.run(gather_limited(lambda username: join(event_id, username), users, threads))
+    else:
+        with ThreadPoolExecutor(threads) as pool:
+            results = list(pool.map(lambda username: join(event_id, username), users))
+    elapsed = time.perf_counter() - start
+
+    state = verify(event_id)
+    print(
+        f"{label:<32} {elapsed * 1000:8.1f} ms  "
+        f"joined={results.count('joined'):<4} waitlisted={results.count('waitlisted'):<4} errors={results.count('error'):<4} "
+        f"számláló={state['counter']:<4} kapcsolat={state['links']:<4} név={state['names']:<4} várólista={state['waitlist']}"
+    )
+    return {"event_id": event_id, "results": results, **state}
+
+
+def main():
+    threads = int(sys.argv[1]) if len(sys.argv) > 1 else 64
+    SQLModel.metadata.create_all(engine)
+    print(f"{JOINS} párhuzamos jelentkezés, {threads} egyidejű kérés\n")
+
+    legacy = run("régi (read-modify-write)", legacy_join, None, threads)
+    lost = legacy["results"].count("joined") + 1 - legacy["names"]
+    print(f"  -> elveszett frissítés: {lost}, hibás kérés: {legacy['results'].count('error')}\n")
+
+    unlimited = run("atomi, korlát nélkül", atomic_join, None, threads)
+    assert unlimited["counter"] == unlimited["links"] == unlimited["names"] == JOINS + 1
+
+    limited = run(f"atomi, {CAPACITY} fős korláttal", atomic_join, CAPACITY, threads)
+    assert limited["counter"] == limited["links"] == limited["names"] == CAPACITY
+    assert limited["results"].count("joined") == CAPACITY - 1
+    assert limited["waitlist"] == JOINS - (CAPACITY - 1)
+
+    # Leiratkozások: minden felszabaduló hely a várólista elejéről töltődik fel
+    async def leave(username: str):
+        async with AsyncSession(async_engine) as session:
+            await remove_participant(session, limited["event_id"], username)
+            await promote_waitlist(session, limited["event_id"])
+            await session.commit()
+
+    joined = [f"user{i}" for i, result in enumerate(limited["results"]) if result == "joined"]
+    asyncio.run(gather_limited(leave, joined[:100], threads))
+    after = verify(limited["event_id"])
+    print(f"100 párhuzamos leiratkozás után: {after}")
+    assert after["counter"] == after["links"] == after["names"] == CAPACITY
+    assert after["waitlist"] == JOINS - (CAPACITY - 1) - 100
+
+    print("\nOK - nincs elveszett frissítés, a létszámkorlát és a várólista konzisztens")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,93 @@
+"""
+Közös tesztkörnyezet: ideiglenes munkakönyvtár (database.db, pubsub, chat archívum), memóriás rate limit,
+egyetlen, a teljes futásra elindított alkalmazás. A tesztek egyedi felhasználókkal és azonosítókkal dolgoznak,
+így nem zavarják egymást.
+"""
+import itertools, os, tempfile
+from typing import Optional
+from cryptography.fernet import Fernet
+
+os.environ.setdefault("ENCRYPTION_KEY", Fernet.generate_key().decode())
+os.environ.setdefault("SECRET_KEY", "test-secret-key-test-secret-key-0123456789")
+os.environ.setdefault("ADMIN_USERNAME", "admin")
+os.environ.setdefault("ADMIN_PASSWORD", "adminpw")
+os.environ["RATE_LIMIT_STORAGE"] = "memory://"
+# Az engine az importáláskor abszolút útvonalra oldja fel a database.db-t, ezért előtte kell
+os.chdir(tempfile.mkdtemp(prefix="ucc-tests-"))
+
+import pytest
+from fastapi.testclient import TestClient
+from sqlmodel import Session
+from app.main import app
+from app.database import engine
+from app.dependencies import create_access_token, get_password_hash
+from app.models import User
+from app.sessions import create_session
+
+PASSWORD = "jelszo-123"
+EVENT = {"title": "esemény", "start_date": "2026-03-02T09:00:00", "end_date": "2026-03-02T10:00:00"}
+_names = itertools.count(1)
+
+
+@pytest.fixture(scope="session")
+def client():
+    with TestClient(app) as test_client:
+        yield test_client
+
+
+@pytest.fixture(scope="session")
+def password_hash():
+    return get_password_hash(PASSWORD)
+
+
+@pytest.fixture
+def run(client):
+    """Korutin futtatása az alkalmazás eseményhurkán (az async engine kapcsolatai ahhoz kötődnek)"""
+    return lambda function, *args: client.portal.call(function, *args)
+
+
+class LoggedInUser:
+    def __init__(self, username: str, refresh_token: str, access_token: str):
+        self.username = username
+        self.refresh_token = refresh_token
+        self.access_token = access_token
+
+    @property
+    def headers(self) -> dict:
+        return {"Authorization": f"Bearer {self.access_token}"}
+
+
+@pytest.fixture
+def make_user(client, password_hash):
+    """Új felhasználó munkamenettel, bejelentkezés (és rate limit) nélkül"""
+    def factory(role: str = "user", prefix: str = "user") -> LoggedInUser:
+        username = f"{prefix}{next(_names)}"
+        with Session(engine) as session:
+            session.add(User(username=username, hashed_password=password_hash, role=role))
+            refresh_token, user_session = create_session(session, username)
+            session.commit()
+            family_id = user_session.family_id
+        access_token = create_access_token({"sub": username, "sid": family_id})
+        return LoggedInUser(username, refresh_token, access_token)
+    return factory
+
+
+@pytest.fixture
+def create_event(client):
+    """Esemény létrehozása a POST /events végponton; a megadott mezők felülírják az alapértelmezetteket"""
+    def factory(user: LoggedInUser, start: Optional[str] = None, end: Optional[str] = None, **fields) -> dict:
+        payload = {**EVENT, **fields}
+        if start:
+            payload["start_date"] = start
+        if end:
+            payload["end_date"] = end
+        response = client.post("/events", json=payload, headers=user.headers)
+        assert response.status_code == 200, response.text
+        return response.json()
+    return factory
+
+
+@pytest.fixture
+def unique():
+    """Egyedi szöveges azonosító (chat munkamenet, cím stb.)"""
+    return lambda prefix="id": f"{prefix}-{next(_names)}"
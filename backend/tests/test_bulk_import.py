@@ -0,0 +1,82 @@
+from sqlmodel import Session, select
+from app import bulk_import
+from app.database import engine
+from app.models import Event, EventParticipant
+
+HEADER = "title,start_date,end_date,description,participants,is_public,is_meeting,rrule,exdates\n"
+
+
+def upload(client, user, name: str, body: str, content_type: str = "text/csv"):
+    return client.post("/events/import", files={"file": (name, body.encode(), content_type)}, headers=user.headers)
+
+
+def test_csv_import_reports_bad_rows_and_keeps_good_ones(client, make_user):
+    user, guest = make_user(), make_user()
+    body = HEADER + (
+        f"Első,2026-03-02T09:00:00,2026-03-02T10:00:00,titok,{guest.username},igen,,,\n"
+        ",2026-03-02T09:00:00,2026-03-02T10:00:00,,,,,,\n"
+        "Fordított,2026-03-02T10:00:00,2026-03-02T09:00:00,,,,,,\n"
+        "Rossz dátum,holnap,2026-03-02T09:00:00,,,,,,\n"
+        "Végtelen,2026-03-02T09:00:00,2026-03-02T10:00:00,,,,,FREQ=DAILY;COUNT=1000000000,\n"
+        "Heti,2026-03-02T12:00:00,2026-03-02T13:00:00,,,,,FREQ=WEEKLY;COUNT=3,20260309T120000\n"
+    )
+    response = upload(client, user, "naptar.csv", body)
+    assert response.status_code == 200, response.text
+    report = response.json()
+
+    assert report["imported"] == 2 and report["failed"] == 4
+    assert [error["row"] for error in report["errors"]] == [3, 4, 5, 6]
+    assert report["errors"][0]["error"] == "Hiányzó cím"
+    assert report["errors"][3]["error"].startswith("Érvénytelen ismétlődés")
+
+    events = {e["title"]: e for e in client.get("/events", headers=user.headers).json()}
+    assert set(events) == {"Első", "Heti"}
+    assert events["Első"]["description"] == "titok" and events["Első"]["is_public"] is True
+    assert events["Heti"]["series_end"] == "2026-03-16T13:00:00"
+    assert [e["title"] for e in client.get("/events", headers=guest.headers).json()] == ["Első"]
+
+
+def test_batches_get_consecutive_ids_and_participant_links(client, make_user, monkeypatch):
+    monkeypatch.setattr(bulk_import, "IMPORT_BATCH_SIZE", 2)
+    user, guest = make_user(), make_user()
+    body = HEADER + "".join(
+        f"E{i},2026-04-0{i}T09:00:00,2026-04-0{i}T10:00:00,,{guest.username},,,,\n" for i in range(1, 6)
+    )
+    report = upload(client, user, "naptar.csv", body).json()
+    assert report["imported"] == 5 and report["failed"] == 0
+
+    with Session(engine) as session:
+        events = session.exec(select(Event).where(Event.owner == user.username).order_by(Event.id)).all()
+        assert [e.title for e in events] == [f"E{i}" for i in range(1, 6)]
+        assert all(e.participant_count == 2 for e in events)
+        # Kötegenként egy változásverzió
+        assert len({e.version for e in events}) == 3 and max(e.version for e in events) == report["version"]
+        linked = session.exec(
+            select(EventParticipant.event_id).where(EventParticipant.username == guest.username)
+        ).all()
+    assert sorted(linked) == [e.id for e in events]
+
+
+def test_ics_import(client, make_user):
+    user = make_user()
+    body = (
+        "BEGIN:VCALENDAR\r\nVERSION:2.0\r\n"
+        "BEGIN:VEVENT\r\nSUMMARY:Naptárból\r\nDTSTART:20260502T070000Z\r\nDTEND:20260502T080000Z\r\n"
+        "DESCRIPTION:Leírás\\, vesszővel\r\nEND:VEVENT\r\n"
+        "BEGIN:VEVENT\r\nSUMMARY:Ismétlődő\r\nDTSTART:20260504T070000Z\r\nDTEND:20260504T080000Z\r\n"
+        "RRULE:FREQ=DAILY;COUNT=2\r\nEND:VEVENT\r\n"
+        "END:VCALENDAR\r\n"
+    )
+    response = upload(client, user, "naptar.ics", body, "text/calendar")
+    assert response.status_code == 200, response.text
+    assert response.json()["imported"] == 2
+
+    events = {e["title"]: e for e in client.get("/events", headers=user.headers).json()}
+    assert events["Naptárból"]["start_date"] == "2026-05-02T07:00:00"
+    assert events["Naptárból"]["description"] == "Leírás, vesszővel"
+    assert events["Ismétlődő"]["rrule"] == "FREQ=DAILY;COUNT=2"
+
+
+def test_unsupported_file_type_is_rejected(client, make_user):
+    user = make_user()
+    assert upload(client, user, "naptar.xlsx", "x", "application/octet-stream").status_code == 400
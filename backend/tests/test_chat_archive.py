@@ -0,0 +1,125 @@
+import datetime, gzip, json
+from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app import chat_archive
+from app.chat_archive import archive_batch, archive_chats, segment_path
+from app.database import async_engine, engine
+from app.helpdesk import add_message
+from app.models import ChatArchiveEntry, ChatMessage, ChatSession
+
+
+def reply(client, admin, session_id: str, message: str):
+    assert client.post("/admin/reply", json={"target_session_id": session_id, "message": message},
+                       headers=admin.headers).status_code == 200
+
+
+def resolve(client, admin, session_id: str):
+    assert client.post("/admin/resolve", json={"target_session_id": session_id}, headers=admin.headers).status_code == 200
+
+
+def age(session_id: str, days: int = 40):
+    """A beszélgetés üzeneteinek és összesítőjének visszadátumozása (a sorrend és a tárolt formátum megmarad)"""
+    shift = datetime.timedelta(days=days)
+    with Session(engine) as session:
+        for message in session.exec(select(ChatMessage).where(ChatMessage.session_id == session_id)).all():
+            message.timestamp -= shift
+            session.add(message)
+        summary = session.get(ChatSession, session_id)
+        summary.last_message_at -= shift
+        session.add(summary)
+        session.commit()
+
+
+def history(client, admin, session_id: str, after_id=None) -> list:
+    params = {} if after_id is None else {"after_id": after_id}
+    response = client.get(f"/admin/chat/{session_id}", params=params, headers=admin.headers)
+    assert response.status_code == 200
+    return [(m["id"], m["sender"], m["message"]) for m in response.json()]
+
+
+def stored(session_id: str):
+    with Session(engine) as session:
+        live = session.exec(select(ChatMessage.id).where(ChatMessage.session_id == session_id)).all()
+        entries = session.exec(select(ChatArchiveEntry).where(ChatArchiveEntry.session_id == session_id)
+                               .order_by(ChatArchiveEntry.id)).all()
+        return live, entries
+
+
+def test_closed_old_conversation_moves_to_the_archive(client, make_user, unique):
+    admin, sid = make_user(role="admin"), unique("archiv")
+    reply(client, admin, sid, "Szia, miben segíthetek? ő")
+    reply(client, admin, sid, "Megoldottuk.")
+    resolve(client, admin, sid)
+    age(sid)
+    before = history(client, admin, sid)
+
+    archive_chats(retention_days=30)
+    live, entries = stored(sid)
+    assert live == [] and len(entries) == 1
+    entry = entries[0]
+    assert (entry.message_count, entry.first_id, entry.last_id) == (3, before[0][0], before[-1][0])
+
+    assert history(client, admin, sid) == before
+    assert history(client, admin, sid, after_id=before[0][0]) == before[1:]
+    with gzip.open(segment_path(entry.segment), "rt", encoding="utf-8") as segment:
+        archived = [json.loads(line) for line in segment]
+    assert [m["message"] for m in archived if m["session_id"] == sid][0] == "Szia, miben segíthetek? ő"
+
+
+def test_waiting_live_and_recent_conversations_stay(client, make_user, unique, run):
+    admin, waiting, live, recent = make_user(role="admin"), unique("varo"), unique("ai-mod"), unique("friss")
+    reply(client, admin, waiting, "Mindjárt jövök")
+    age(waiting)
+
+    async def ai_conversation():
+        async with AsyncSession(async_engine) as session:
+            await add_message(session, live, "user", "Hogyan hozok létre eseményt?")
+            await add_message(session, live, "bot", "A Naptár fülön.")
+            await session.commit()
+
+    run(ai_conversation)
+    age(live)
+    with Session(engine) as session:
+        assert session.get(ChatSession, live).status == "ai"
+    reply(client, admin, recent, "Kész")
+    resolve(client, admin, recent)
+
+    archive_chats(retention_days=30)
+    for sid in (waiting, live, recent):
+        live, entries = stored(sid)
+        assert live and entries == []
+
+
+def test_continued_conversation_is_archived_again_in_a_new_segment(client, make_user, unique, monkeypatch):
+    monkeypatch.setattr(chat_archive, "CHAT_ARCHIVE_SEGMENT_BYTES", 1)
+    admin, sid = make_user(role="admin"), unique("folytatott")
+    reply(client, admin, sid, "Első kör")
+    resolve(client, admin, sid)
+    age(sid)
+    archive_chats(retention_days=30)
+
+    reply(client, admin, sid, "Újra itt")
+    assert [m[2] for m in history(client, admin, sid)][-1] == "Újra itt"
+    with Session(engine) as session:
+        assert session.get(ChatSession, sid).needs_human
+    resolve(client, admin, sid)
+    age(sid)
+    full = history(client, admin, sid)
+    archive_chats(retention_days=30)
+
+    live, entries = stored(sid)
+    assert live == [] and [e.message_count for e in entries] == [2, 2]
+    assert entries[0].segment != entries[1].segment
+    assert history(client, admin, sid) == full
+
+
+def test_repeated_batch_does_not_duplicate(client, make_user, unique):
+    admin, sid = make_user(role="admin"), unique("ismetelt")
+    reply(client, admin, sid, "Egyszer")
+    resolve(client, admin, sid)
+    with Session(engine) as session:
+        last_id = session.get(ChatSession, sid).last_message_id
+
+    assert archive_batch([(sid, last_id)]) == 2
+    assert archive_batch([(sid, last_id)]) == 0
+    assert len(stored(sid)[1]) == 1
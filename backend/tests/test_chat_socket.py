@@ -0,0 +1,107 @@
+import pytest
+from starlette.websockets import WebSocketDisconnect
+from sqlmodel import Session, func, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app import helpdesk
+from app.database import async_engine, engine
+from app.helpdesk import add_message, chat_topic
+from app.models import ChatMessage
+from app.pubsub import hub
+
+
+def reply(client, admin, session_id: str, message: str):
+    assert client.post("/admin/reply", json={"target_session_id": session_id, "message": message},
+                       headers=admin.headers).status_code == 200
+
+
+def texts(frame: dict) -> list:
+    assert frame["type"] == "messages"
+    return [m["message"] for m in frame["messages"]]
+
+
+def test_widget_catches_up_then_streams(client, make_user, unique):
+    admin, sid = make_user(role="admin"), unique("widget")
+    reply(client, admin, sid, "első")
+    reply(client, admin, sid, "második")
+
+    with client.websocket_connect(f"/ws/chat/{sid}?after_id=0") as ws:
+        catch_up = ws.receive_json()
+        assert texts(catch_up) == ["első", "második"]
+        reply(client, admin, sid, "harmadik")
+        assert texts(ws.receive_json()) == ["harmadik"]
+        reply(client, admin, unique("mas-beszelgetes"), "nem ide")
+        reply(client, admin, sid, "negyedik")
+        live = ws.receive_json()
+        assert texts(live) == ["negyedik"]
+
+    # Újracsatlakozás az utolsó kapott azonosítótól: nincs ismétlés
+    with client.websocket_connect(f"/ws/chat/{sid}?after_id={live['messages'][-1]['id']}") as ws:
+        reply(client, admin, sid, "ötödik")
+        assert texts(ws.receive_json()) == ["ötödik"]
+
+
+def test_resync_fills_in_messages_missed_by_the_hub(client, make_user, unique, run):
+    admin, sid = make_user(role="admin"), unique("resync")
+    with client.websocket_connect(f"/ws/chat/{sid}") as ws:
+        reply(client, admin, sid, "látott")
+        assert texts(ws.receive_json()) == ["látott"]
+
+        async def commit_silently_then_resync():
+            async with AsyncSession(async_engine) as session:
+                await add_message(session, sid, "admin", "kimaradt", needs_human=True)
+                await session.commit()
+            hub.publish([chat_topic(sid)], {"type": "resync"})
+
+        run(commit_silently_then_resync)
+        assert texts(ws.receive_json()) == ["kimaradt"]
+
+
+def test_admin_socket_requires_an_admin_token_and_sees_every_session(client, make_user, unique):
+    for token in ("rossz-token", make_user().access_token):
+        with pytest.raises(WebSocketDisconnect) as closed:
+            with client.websocket_connect(f"/ws/admin/chat?token={token}") as ws:
+                ws.receive_json()
+        assert closed.value.code == 1008
+
+    admin = make_user(role="admin")
+    with client.websocket_connect(f"/ws/admin/chat?token={admin.access_token}") as ws:
+        first, second = unique("admin-a"), unique("admin-b")
+        reply(client, admin, first, "egyik")
+        reply(client, admin, second, "másik")
+        frames = [ws.receive_json(), ws.receive_json()]
+        assert [(m["session_id"], m["message"]) for f in frames for m in f["messages"]] == [
+            (first, "egyik"), (second, "másik")
+        ]
+
+
+def test_admin_catch_up_pages_until_current(client, make_user, unique, monkeypatch):
+    monkeypatch.setattr(helpdesk, "CHAT_WS_CATCHUP_LIMIT", 3)
+    admin = make_user(role="admin")
+    with Session(engine) as session:
+        before = session.exec(select(func.max(ChatMessage.id))).one() or 0
+    sent = [(unique("kieses"), f"üzenet {i}") for i in range(7)]
+    for sid, text in sent:
+        reply(client, admin, sid, text)
+
+    with client.websocket_connect(f"/ws/admin/chat?token={admin.access_token}&after_id={before}") as ws:
+        frames = [ws.receive_json() for _ in range(3)]
+        assert [len(f["messages"]) for f in frames] == [3, 3, 1]
+        assert [(m["session_id"], m["message"]) for f in frames for m in f["messages"]] == sent
+        reply(client, admin, sent[0][0], "élő")
+        assert texts(ws.receive_json()) == ["élő"]
+
+
+def test_heartbeat_pings_and_closes_silent_clients(client, unique, monkeypatch):
+    monkeypatch.setattr(helpdesk, "CHAT_WS_HEARTBEAT", 0.1)
+    with client.websocket_connect(f"/ws/chat/{unique('szivveres')}") as ws:
+        for _ in range(5):
+            assert ws.receive_json() == {"type": "ping", "last_id": 0}
+            ws.send_json({"type": "pong"})
+
+    with client.websocket_connect(f"/ws/chat/{unique('nema')}") as ws:
+        pings = 0
+        with pytest.raises(WebSocketDisconnect) as closed:
+            while True:
+                assert ws.receive_json()["type"] == "ping"
+                pings += 1
+        assert closed.value.code == 1001 and pings >= 1
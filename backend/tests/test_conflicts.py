@@ -0,0 +1,125 @@
+import datetime
+from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.database import engine, async_engine
+from app.events import find_overlapping, overlaps
+from app.models import Event
+
+
+def check(client, user, start: str, end: str, event_id=None) -> dict:
+    payload = {"title": "új", "start_date": start, "end_date": end}
+    if event_id:
+        payload["id"] = event_id
+    response = client.post("/events/check-conflict", json=payload, headers=user.headers)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_no_conflict_in_empty_calendar(client, make_user):
+    user = make_user()
+    assert check(client, user, "2026-05-04T09:00:00", "2026-05-04T10:00:00") == {"conflict": False}
+
+
+def test_long_event_started_well_before_window_conflicts(client, make_user, create_event):
+    user = make_user()
+    # Sok rövid esemény a hosszú előtt és után: az alsó korlát a leghosszabb alkalomhoz igazodik
+    for day in range(1, 20):
+        create_event(user, f"2026-04-{day:02d}T08:00:00", f"2026-04-{day:02d}T08:30:00")
+    create_event(user, "2026-04-01T12:00:00", "2026-04-30T12:00:00", title="konferencia")
+
+    result = check(client, user, "2026-04-25T09:00:00", "2026-04-25T10:00:00")
+    assert result["conflict"] is True
+    assert result["title"] == "konferencia"
+    assert check(client, user, "2026-04-30T12:00:00", "2026-04-30T13:00:00") == {"conflict": False}
+
+
+def test_touching_events_do_not_conflict(client, make_user, create_event):
+    user = make_user()
+    create_event(user, "2026-06-01T09:00:00", "2026-06-01T10:00:00")
+    assert check(client, user, "2026-06-01T10:00:00", "2026-06-01T11:00:00") == {"conflict": False}
+    assert check(client, user, "2026-06-01T08:00:00", "2026-06-01T09:00:00") == {"conflict": False}
+    assert check(client, user, "2026-06-01T09:59:59", "2026-06-01T11:00:00")["conflict"] is True
+
+
+def test_recurring_series_conflicts_on_its_occurrences_only(client, make_user, create_event):
+    user = make_user()
+    # hétfőnként 9-10, a sorozat kezdete jóval az ablak előtt
+    create_event(user, "2025-01-06T09:00:00", "2025-01-06T10:00:00", title="heti", rrule="FREQ=WEEKLY;BYDAY=MO")
+
+    result = check(client, user, "2026-05-04T09:30:00", "2026-05-04T11:00:00")
+    assert result == {"conflict": True, "title": "heti", "start_date": "2026-05-04T09:00:00"}
+    assert check(client, user, "2026-05-05T09:30:00", "2026-05-05T11:00:00") == {"conflict": False}
+
+
+def test_finished_series_does_not_conflict(client, make_user, create_event):
+    user = make_user()
+    create_event(user, "2026-01-05T09:00:00", "2026-01-05T10:00:00", rrule="FREQ=WEEKLY;COUNT=3")
+    assert check(client, user, "2026-01-19T09:00:00", "2026-01-19T09:30:00")["conflict"] is True
+    assert check(client, user, "2026-01-26T09:00:00", "2026-01-26T09:30:00") == {"conflict": False}
+
+
+def test_own_event_is_excluded(client, make_user, create_event):
+    user = make_user()
+    event = create_event(user, "2026-07-01T09:00:00", "2026-07-01T10:00:00")
+    assert check(client, user, "2026-07-01T09:30:00", "2026-07-01T10:30:00", event["id"]) == {"conflict": False}
+
+
+def test_other_owners_events_are_ignored(client, make_user, create_event):
+    user, other = make_user(), make_user()
+    create_event(other, "2026-07-01T09:00:00", "2026-07-02T09:00:00")
+    assert check(client, user, "2026-07-01T12:00:00", "2026-07-01T13:00:00") == {"conflict": False}
+
+
+def test_batch_check_reports_every_conflict(client, make_user, create_event):
+    user = make_user()
+    long = create_event(user, "2026-08-01T00:00:00", "2026-08-10T00:00:00", title="szabadság")
+    short = create_event(user, "2026-08-05T09:00:00", "2026-08-05T10:00:00", title="megbeszélés")
+    series = create_event(user, "2026-07-06T14:00:00", "2026-07-06T15:00:00", title="heti", rrule="FREQ=WEEKLY")
+
+    response = client.post("/events/check-conflicts", json={"slots": [
+        {"start_date": "2026-08-05T09:30:00", "end_date": "2026-08-05T10:30:00"},
+        {"start_date": "2026-08-05T09:30:00", "end_date": "2026-08-05T10:30:00", "id": short["id"]},
+        {"start_date": "2026-08-17T14:30:00", "end_date": "2026-08-17T16:00:00"},
+        {"start_date": "2026-08-18T14:30:00", "end_date": "2026-08-18T16:00:00"},
+    ]}, headers=user.headers)
+    assert response.status_code == 200
+    results = response.json()["results"]
+
+    assert [sorted(c["id"] for c in r["conflicts"]) for r in results] == [
+        sorted([long["id"], short["id"]]), [long["id"]], [series["id"]], []
+    ]
+    assert results[2]["conflicts"][0]["start_date"] == "2026-08-17T14:00:00"
+    assert [r["conflict"] for r in results] == [True, True, True, False]
+
+
+def test_bounded_query_matches_full_scan(client, make_user, run):
+    """A korlátos lekérdezés ugyanazt adja, mint a teljes múlt végigolvasása"""
+    user = make_user()
+    start = datetime.datetime(2026, 9, 1)
+    with Session(engine) as session:
+        for hour in range(0, 24 * 20, 5):
+            began = start + datetime.timedelta(hours=hour)
+            session.add(Event(title="e", owner=user.username, start_date=began,
+                              end_date=began + datetime.timedelta(minutes=30 + hour % 400)))
+        session.commit()
+        windows = [(start + datetime.timedelta(hours=h), start + datetime.timedelta(hours=h, minutes=45))
+                   for h in range(0, 24 * 22, 7)]
+        expected = [
+            sorted(session.exec(select(Event.id).where(Event.owner == user.username, overlaps(a, b))).all())
+            for a, b in windows
+        ]
+
+    async def bounded():
+        async with AsyncSession(async_engine) as session:
+            return [sorted(row.id for row in await find_overlapping(session, (Event.id,), user.username, a, b))
+                    for a, b in windows]
+
+    assert run(bounded) == expected
+
+
+def test_dates_are_stored_as_utc(client, make_user, create_event):
+    user = make_user()
+    event = create_event(user, "2026-10-01T11:00:00+02:00", "2026-10-01T12:00:00+02:00")
+    assert (event["start_date"], event["end_date"]) == ("2026-10-01T09:00:00", "2026-10-01T10:00:00")
+    # Eltérő időzónában megadott, de azonos pillanat is ütközik
+    assert check(client, user, "2026-10-01T05:30:00-04:00", "2026-10-01T06:30:00-04:00")["conflict"] is True
@@ -0,0 +1,60 @@
+import time
+from sqlalchemy import text
+from sqlmodel import Session, select
+from app.config import DB_BUSY_TIMEOUT_MS, DB_MMAP_SIZE
+from app.database import async_engine, engine, get_session
+from app.models import User
+
+PRAGMAS = ["journal_mode", "synchronous", "busy_timeout", "mmap_size", "temp_store"]
+EXPECTED = ["wal", 1, DB_BUSY_TIMEOUT_MS, DB_MMAP_SIZE, 2]
+
+
+def test_both_engines_use_the_same_tuned_file(run):
+    with engine.connect() as connection:
+        assert [connection.execute(text(f"PRAGMA {name}")).scalar() for name in PRAGMAS] == EXPECTED
+        sync_file = connection.execute(text("PRAGMA database_list")).all()[0][2]
+
+    async def read_async():
+        async with async_engine.connect() as connection:
+            values = [(await connection.execute(text(f"PRAGMA {name}"))).scalar() for name in PRAGMAS]
+            return values, (await connection.execute(text("PRAGMA database_list"))).all()[0][2]
+
+    values, async_file = run(read_async)
+    assert values == EXPECTED and async_file == sync_file
+
+
+def test_session_objects_stay_loaded_after_commit(run, unique):
+    username = unique("munkamenet")
+
+    async def create_and_read():
+        sessions = get_session()
+        session = await anext(sessions)
+        user = User(username=username, hashed_password="-", role="user")
+        session.add(user)
+        await session.commit()
+        # expire_on_commit=False: az attribútum olvasása nem indít (async környezetben tiltott) lekérdezést
+        role = user.role
+        await sessions.aclose()
+        return role
+
+    assert run(create_and_read) == "user"
+
+
+def test_readers_are_not_blocked_by_an_open_write(run, unique):
+    username = unique("olvaso")
+
+    async def read_count():
+        async with async_engine.connect() as connection:
+            started = time.perf_counter()
+            count = (await connection.execute(text("SELECT count(*) FROM user WHERE username = :u"), {"u": username})).scalar()
+            return count, time.perf_counter() - started
+
+    with Session(engine) as writer:
+        writer.add(User(username=username, hashed_password="-", role="user"))
+        writer.flush()
+        count, elapsed = run(read_count)
+        assert count == 0 and elapsed < DB_BUSY_TIMEOUT_MS / 1000 / 10
+        writer.commit()
+    assert run(read_count)[0] == 1
+    with Session(engine) as session:
+        assert session.exec(select(User.role).where(User.username == username)).one() == "user"
@@ -0,0 +1,76 @@
+from sqlmodel import Session
+from app import utils
+from app.database import engine
+from app.models import Event
+from app.utils import DecryptCache, decrypt_many, decrypt_text, encrypt_text
+
+
+def test_cache_evicts_least_recently_used_by_size():
+    entry = DecryptCache.cost("a" * 10)
+    cache = DecryptCache(max_bytes=entry * 2)
+    cache.put("c1", "a" * 10)
+    cache.put("c2", "b" * 10)
+    assert cache.get("c1") == "a" * 10
+    cache.put("c3", "c" * 10)
+
+    assert cache.get("c2") is None
+    assert cache.get("c1") == "a" * 10 and cache.get("c3") == "c" * 10
+    assert cache.size <= cache.max_bytes
+    assert cache.stats()["entries"] == 2
+
+
+def test_cache_skips_oversized_entries_and_invalidates():
+    cache = DecryptCache(max_bytes=DecryptCache.cost("x"))
+    cache.put("nagy", "x" * 1000)
+    assert cache.get("nagy") is None and cache.size == 0
+
+    cache.put("kicsi", "x")
+    cache.invalidate("kicsi")
+    assert cache.get("kicsi") is None and cache.size == 0
+
+
+def test_cache_counts_hits_and_misses():
+    cache = DecryptCache(max_bytes=10_000)
+    cache.get("nincs")
+    cache.put("van", "szöveg")
+    cache.get("van")
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (1, 1, 0.5)
+
+
+def test_decrypt_text_round_trip_and_plaintext_fallback():
+    ciphertext = encrypt_text("titok")
+    assert ciphertext != "titok"
+    assert decrypt_text(ciphertext) == "titok"
+    assert decrypt_text(ciphertext) == "titok"
+    # Régi, titkosítatlan leírás változatlanul jön vissza
+    assert decrypt_text("sima szöveg") == "sima szöveg"
+    assert decrypt_text("") == "" and decrypt_text(None) is None
+
+
+def test_decrypt_many_parallel_matches_sequential(monkeypatch):
+    monkeypatch.setattr(utils, "DECRYPT_BATCH_THRESHOLD", 4)
+    monkeypatch.setattr(utils, "DECRYPT_WORKERS", 3)
+    utils.decrypt_cache.clear()
+    plaintexts = [f"leírás {i}" for i in range(25)]
+    texts = [encrypt_text(p) for p in plaintexts] + [None, "", "nem titkosított"]
+
+    assert decrypt_many(texts) == plaintexts + [None, "", "nem titkosított"]
+    # Másodszorra minden a gyorsítótárból jön
+    misses = utils.decrypt_cache.misses
+    assert decrypt_many(texts) == plaintexts + [None, "", "nem titkosított"]
+    assert utils.decrypt_cache.misses == misses + 1
+
+
+def test_descriptions_are_encrypted_at_rest_and_decrypted_on_read(client, make_user, create_event):
+    user = make_user()
+    payload = {"title": "t", "start_date": "2026-03-02T09:00:00", "end_date": "2026-03-02T10:00:00",
+               "description": "bizalmas"}
+    event = create_event(user, **payload)
+    with Session(engine) as session:
+        assert session.get(Event, event["id"]).description != "bizalmas"
+
+    assert [e["description"] for e in client.get("/events", headers=user.headers).json()] == ["bizalmas"]
+
+    client.put(f"/events/{event['id']}", json={**payload, "description": "új leírás"}, headers=user.headers)
+    assert [e["description"] for e in client.get("/events", headers=user.headers).json()] == ["új leírás"]
@@ -0,0 +1,114 @@
+import datetime, jwt
+from sqlmodel import Session
+from app.config import ALGORITHM, SECRET_KEY
+from app.database import engine
+from app.models import PasswordResetToken
+from app.sessions import hash_token
+
+
+def issue_feed_token(client, user) -> str:
+    response = client.post("/events/feed/token", headers=user.headers)
+    assert response.status_code == 200
+    body = response.json()
+    assert body["url"] == f"/events/user/{user.username}/feed.ics?token={body['token']}"
+    return body["token"]
+
+
+def read_feed(client, user, token: str, headers=None):
+    return client.get(f"/events/user/{user.username}/feed.ics", params={"token": token}, headers=headers or {})
+
+
+def test_feed_token_reads_calendar(client, make_user, create_event):
+    user = make_user()
+    create_event(user, "2026-05-04T09:00:00", "2026-05-04T10:00:00", title="Feedben")
+    token = issue_feed_token(client, user)
+
+    payload = jwt.decode(token, SECRET_KEY, algorithms=[ALGORITHM])
+    assert payload["scope"] == "feed" and payload["exp"] > datetime.datetime.utcnow().timestamp()
+
+    response = read_feed(client, user, token)
+    assert response.status_code == 200
+    assert response.headers["content-type"].startswith("text/calendar")
+    assert "SUMMARY:Feedben" in response.text
+    assert read_feed(client, user, token, {"If-None-Match": response.headers["etag"]}).status_code == 304
+
+
+def test_feed_rejects_access_tokens(client, make_user):
+    user = make_user()
+    assert read_feed(client, user, user.access_token).status_code == 401
+
+
+def test_feed_token_is_not_an_access_token(client, make_user):
+    user = make_user()
+    token = issue_feed_token(client, user)
+    assert client.get("/events", headers={"Authorization": f"Bearer {token}"}).status_code == 401
+
+
+def test_unsigned_secret_and_legacy_tokens_are_rejected(client, make_user):
+    user = make_user()
+    issue_feed_token(client, user)
+    legacy = jwt.encode({"sub": user.username, "scope": "feed"}, SECRET_KEY, algorithm=ALGORITHM)
+    forged = jwt.encode({"sub": user.username, "scope": "feed", "fsec": "kitalalt"}, SECRET_KEY, algorithm=ALGORITHM)
+    assert read_feed(client, user, legacy).status_code == 401
+    assert read_feed(client, user, forged).status_code == 401
+
+
+def test_rotation_revokes_previous_feed_token(client, make_user):
+    user = make_user()
+    old = issue_feed_token(client, user)
+    new = issue_feed_token(client, user)
+    assert read_feed(client, user, old).status_code == 401
+    assert read_feed(client, user, new).status_code == 200
+
+
+def test_password_reset_revokes_feed_token(client, make_user):
+    user = make_user()
+    token = issue_feed_token(client, user)
+    assert read_feed(client, user, token).status_code == 200
+
+    with Session(engine) as session:
+        session.add(PasswordResetToken(
+            token_hash=hash_token("visszaallito-kod"), username=user.username,
+            expires_at=datetime.datetime.utcnow() + datetime.timedelta(minutes=5)
+        ))
+        session.commit()
+    response = client.post("/confirm-reset", json={"token": "visszaallito-kod", "new_password": "uj-jelszo-456"})
+    assert response.status_code == 200
+
+    assert read_feed(client, user, token).status_code == 401
+
+
+def test_other_users_feed_masks_private_events(client, make_user, create_event):
+    owner, guest, viewer = make_user(), make_user(), make_user()
+    for title, extra in [("Titkos", {}), ("Közös", {"participants": guest.username}), ("Nyilvános", {"is_public": True})]:
+        create_event(owner, "2026-05-04T09:00:00", "2026-05-04T10:00:00", title=title,
+                     description=f"{title} leírás", **extra)
+
+    def summaries(reader) -> list:
+        feed = read_feed(client, owner, issue_feed_token(client, reader)).text
+        return sorted(line.split(":", 1)[1] for line in feed.splitlines() if line.startswith("SUMMARY:"))
+
+    assert summaries(viewer) == ["Foglalt", "Foglalt", "Nyilvános"]
+    assert summaries(guest) == ["Foglalt", "Közös", "Nyilvános"]
+    assert summaries(owner) == ["Közös", "Nyilvános", "Titkos"]
+    assert "Titkos leírás" not in read_feed(client, owner, issue_feed_token(client, viewer)).text
+
+
+def test_feed_exports_recurrence_and_is_well_formed(client, make_user, create_event):
+    user = make_user()
+    create_event(user, "2026-05-04T09:00:00", "2026-05-04T10:00:00", title="Heti",
+                 rrule="FREQ=WEEKLY;COUNT=4", exdates="2026-05-11T09:00:00")
+    feed = read_feed(client, user, issue_feed_token(client, user)).text
+    lines = feed.split("\r\n")
+    assert lines[0] == "BEGIN:VCALENDAR" and "END:VCALENDAR" in lines
+    assert "RRULE:FREQ=WEEKLY;COUNT=4" in lines
+    assert any(line.startswith("EXDATE") and "20260511T090000Z" in line for line in lines)
+    assert all(len(line.encode()) <= 75 for line in lines)
+
+
+def test_feed_answers_304_for_if_modified_since(client, make_user, create_event):
+    user = make_user()
+    create_event(user, "2026-05-04T09:00:00", "2026-05-04T10:00:00", title="x")
+    token = issue_feed_token(client, user)
+    first = read_feed(client, user, token)
+    assert read_feed(client, user, token, {"If-Modified-Since": first.headers["last-modified"]}).status_code == 304
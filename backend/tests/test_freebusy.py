@@ -0,0 +1,85 @@
+from sqlmodel import Session, select, update
+from app.database import engine
+from app.migrations import migrate_participant_dates
+from app.models import EventParticipant
+
+
+def busy(client, user, usernames, start: str, end: str) -> dict:
+    response = client.post("/events/freebusy", json={"usernames": usernames, "start": start, "end": end},
+                           headers=user.headers)
+    assert response.status_code == 200, response.text
+    return {name: [(i["start"], i["end"]) for i in intervals] for name, intervals in response.json()["users"].items()}
+
+
+def test_freebusy_merges_one_off_long_and_recurring_events(client, make_user, create_event):
+    owner, guest = make_user(), make_user()
+    create_event(owner, "2026-03-02T09:00:00", "2026-03-02T10:00:00", participants=guest.username)
+    create_event(owner, "2026-03-02T09:30:00", "2026-03-02T11:00:00")
+    # Jóval az ablak előtt kezdődő, hosszú esemény
+    create_event(guest, "2026-02-01T00:00:00", "2026-03-03T12:00:00")
+    create_event(owner, "2025-06-04T14:00:00", "2025-06-04T15:00:00", rrule="FREQ=WEEKLY;BYDAY=WE")
+
+    result = busy(client, owner, [owner.username, guest.username], "2026-03-02T00:00:00", "2026-03-05T00:00:00")
+    assert result[owner.username] == [
+        ("2026-03-02T09:00:00", "2026-03-02T11:00:00"),
+        ("2026-03-04T14:00:00", "2026-03-04T15:00:00"),
+    ]
+    assert result[guest.username] == [("2026-03-02T00:00:00", "2026-03-03T12:00:00")]
+
+
+def test_unknown_user_is_free(client, make_user):
+    user = make_user()
+    assert busy(client, user, ["nincs-ilyen"], "2026-03-02T00:00:00", "2026-03-03T00:00:00") == {"nincs-ilyen": []}
+
+
+def test_moved_event_moves_participants_busy_time(client, make_user, create_event):
+    owner, guest = make_user(), make_user()
+    event = create_event(owner, "2026-04-06T09:00:00", "2026-04-06T10:00:00", participants=guest.username)
+    response = client.put(f"/events/{event['id']}", json={
+        "title": "áthelyezve", "start_date": "2026-04-07T13:00:00", "end_date": "2026-04-07T14:00:00",
+        "participants": guest.username
+    }, headers=owner.headers)
+    assert response.status_code == 200, response.text
+
+    result = busy(client, owner, [guest.username], "2026-04-06T00:00:00", "2026-04-08T00:00:00")
+    assert result[guest.username] == [("2026-04-07T13:00:00", "2026-04-07T14:00:00")]
+
+
+def test_joined_event_counts_as_busy(client, make_user, create_event):
+    owner, guest = make_user(), make_user()
+    event = create_event(owner, "2026-05-04T09:00:00", "2026-05-04T10:00:00", capacity=5, is_public=True)
+    assert client.post(f"/events/{event['id']}/join", headers=guest.headers).status_code == 200
+
+    result = busy(client, owner, [guest.username], "2026-05-04T00:00:00", "2026-05-05T00:00:00")
+    assert result[guest.username] == [("2026-05-04T09:00:00", "2026-05-04T10:00:00")]
+
+
+def test_imported_events_count_as_busy(client, make_user):
+    user = make_user()
+    csv_body = (
+        "title,start_date,end_date,participants\n"
+        "import,2026-06-01T09:00:00,2026-06-01T10:00:00,\n"
+    )
+    response = client.post("/events/import", files={"file": ("naptar.csv", csv_body, "text/csv")}, headers=user.headers)
+    assert response.status_code == 200, response.text
+
+    result = busy(client, user, [user.username], "2026-06-01T00:00:00", "2026-06-02T00:00:00")
+    assert result[user.username] == [("2026-06-01T09:00:00", "2026-06-01T10:00:00")]
+
+
+def test_migration_backfills_participant_dates(make_user, create_event):
+    user = make_user()
+    event = create_event(user, "2026-07-01T09:00:00", "2026-07-01T10:00:00")
+    with Session(engine) as session:
+        session.exec(update(EventParticipant).where(EventParticipant.event_id == event["id"]).values(
+            start_date=None, end_date=None, series_end=None
+        ))
+        session.commit()
+
+    with engine.begin() as connection:
+        migrate_participant_dates(connection)
+
+    with Session(engine) as session:
+        link = session.exec(select(EventParticipant).where(EventParticipant.event_id == event["id"])).one()
+    assert link.start_date.isoformat() == "2026-07-01T09:00:00"
+    assert link.end_date.isoformat() == "2026-07-01T10:00:00"
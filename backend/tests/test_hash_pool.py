@@ -0,0 +1,63 @@
+import asyncio, threading, time
+import pytest
+from fastapi import HTTPException
+from app.dependencies import HashPool, hash_password_async, verify_password, verify_password_async
+
+
+def test_async_hash_and_verify_round_trip(run):
+    async def round_trip():
+        hashed = await hash_password_async("titkos-jelszo")
+        return hashed, await verify_password_async("titkos-jelszo", hashed), await verify_password_async("mas", hashed)
+
+    hashed, good, bad = run(round_trip)
+    assert hashed.startswith("$2") and good and not bad
+    assert verify_password("titkos-jelszo", hashed)
+
+
+def test_event_loop_keeps_running_while_hashing():
+    pool = HashPool(workers=1, queue_limit=4)
+    release = threading.Event()
+
+    async def scenario():
+        job = asyncio.ensure_future(pool.run(release.wait, 5))
+        ticks = 0
+        started = time.perf_counter()
+        while time.perf_counter() - started < 0.2:
+            await asyncio.sleep(0.01)
+            ticks += 1
+        release.set()
+        await job
+        return ticks
+
+    assert asyncio.run(scenario()) >= 10
+    assert pool.stats()["completed"] == 1
+
+
+def test_full_queue_is_rejected_with_503():
+    pool = HashPool(workers=1, queue_limit=1)
+    release = threading.Event()
+
+    async def scenario():
+        jobs = [asyncio.ensure_future(pool.run(release.wait, 5)) for _ in range(2)]
+        await asyncio.sleep(0.05)
+        busy = pool.stats()
+        with pytest.raises(HTTPException) as rejected:
+            await pool.run(release.wait, 5)
+        release.set()
+        await asyncio.gather(*jobs)
+        return busy, rejected.value
+
+    busy, error = asyncio.run(scenario())
+    assert error.status_code == 503
+    assert (busy["active"], busy["queued"]) == (1, 1)
+    stats = pool.stats()
+    assert (stats["completed"], stats["rejected"], stats["active"], stats["queued"]) == (2, 1, 0, 0)
+    assert stats["wait_ms_p99"] >= stats["wait_ms_p50"] >= 0
+
+
+def test_metrics_endpoint_is_admin_only(client, make_user):
+    path = "/admin/metrics/password-hashing"
+    assert client.get(path, headers=make_user().headers).status_code == 403
+    response = client.get(path, headers=make_user(role="admin").headers)
+    assert response.status_code == 200
+    assert {"workers", "queue_limit", "active", "queued", "completed", "rejected"} <= response.json().keys()
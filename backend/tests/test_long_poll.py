@@ -0,0 +1,81 @@
+import time
+from concurrent.futures import ThreadPoolExecutor
+from sqlmodel import Session
+from app.config import CHAT_LONG_POLL_MAX, DB_MAX_OVERFLOW, DB_POOL_SIZE
+from app.database import engine
+from app.models import ChatMessage
+
+
+def reply(client, admin, session_id: str, message: str):
+    assert client.post("/admin/reply", json={"target_session_id": session_id, "message": message},
+                       headers=admin.headers).status_code == 200
+
+
+def poll(client, session_id: str, **params) -> list:
+    response = client.get(f"/chat/history/{session_id}", params=params)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def test_after_id_returns_only_newer_messages(client, make_user, unique):
+    admin, sid = make_user(role="admin"), unique("inkrementalis")
+    for text in ("egy", "kettő", "három"):
+        reply(client, admin, sid, text)
+    everything = poll(client, sid)
+    assert [m["message"] for m in everything] == ["egy", "kettő", "három"]
+
+    newer = poll(client, sid, after_id=everything[0]["id"])
+    assert [m["id"] for m in newer] == [m["id"] for m in everything[1:]]
+    assert poll(client, sid, after_id=everything[-1]["id"]) == []
+
+
+def test_existing_messages_return_immediately_and_idle_poll_times_out(client, make_user, unique):
+    admin, sid = make_user(role="admin"), unique("azonnali")
+    reply(client, admin, sid, "már itt van")
+    started = time.perf_counter()
+    assert len(poll(client, sid, after_id=0, wait=5)) == 1
+    assert time.perf_counter() - started < 1
+
+    started = time.perf_counter()
+    assert poll(client, sid, after_id=10 ** 9, wait=0.3) == []
+    assert 0.25 < time.perf_counter() - started < 2
+    assert client.get(f"/chat/history/{sid}", params={"wait": CHAT_LONG_POLL_MAX + 1}).status_code == 422
+
+
+def test_waiters_wake_on_new_message_without_holding_connections(client, make_user, unique):
+    admin, sid = make_user(role="admin"), unique("varakozo")
+    reply(client, admin, sid, "első")
+    last_id = poll(client, sid)[-1]["id"]
+    waiters = DB_POOL_SIZE + DB_MAX_OVERFLOW + 4
+
+    with ThreadPoolExecutor(waiters) as pool:
+        futures = [pool.submit(poll, client, sid, after_id=last_id, wait=10) for _ in range(waiters)]
+        time.sleep(0.5)
+        assert not any(future.done() for future in futures)
+        # A várakozók nem tartanak kapcsolatot: egy másik beszélgetés lekérdezése közben is kiszolgálható
+        started = time.perf_counter()
+        poll(client, unique("masik"))
+        assert time.perf_counter() - started < 2
+
+        sent = time.perf_counter()
+        reply(client, admin, sid, "új üzenet")
+        results = [future.result(timeout=5) for future in futures]
+        elapsed = time.perf_counter() - sent
+
+    assert all([m["message"] for m in result] == ["új üzenet"] for result in results)
+    assert elapsed < 3
+
+
+def test_timeout_rechecks_for_messages_committed_elsewhere(client, make_user, unique):
+    admin, sid = make_user(role="admin"), unique("masik-worker")
+    reply(client, admin, sid, "első")
+    last_id = poll(client, sid)[-1]["id"]
+
+    with ThreadPoolExecutor(1) as pool:
+        waiting = pool.submit(poll, client, sid, after_id=last_id, wait=0.5)
+        time.sleep(0.1)
+        # Egy másik worker commitja: a hubon át nem érkezik értesítés
+        with Session(engine) as session:
+            session.add(ChatMessage(session_id=sid, sender="admin", message="máshonnan", needs_human=True))
+            session.commit()
+        assert [m["message"] for m in waiting.result(timeout=5)] == ["máshonnan"]
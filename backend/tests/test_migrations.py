@@ -0,0 +1,134 @@
+import datetime, os, tempfile, threading
+import pytest
+from sqlalchemy import create_engine, event, text
+from sqlmodel import SQLModel
+from app import migrations
+from app.config import ADMIN_USERNAME
+from app.database import configure_sqlite
+from app.migrations import MIGRATIONS, run_migrations
+
+ONLINE = [m.version for m in MIGRATIONS if m.online]
+ALL = [m.version for m in MIGRATIONS]
+
+
+@pytest.fixture
+def database(monkeypatch):
+    """Külön adatbázisfájl a migrációkhoz (az alkalmazás közös adatbázisa érintetlen marad)"""
+    path = os.path.join(tempfile.mkdtemp(), "migracio.db")
+    engine = create_engine(f"sqlite:///{path}", connect_args={"check_same_thread": False})
+    event.listen(engine, "connect", configure_sqlite)
+    monkeypatch.setattr(migrations, "engine", engine)
+    yield engine
+    engine.dispose()
+
+
+def versions(engine) -> list:
+    with engine.connect() as connection:
+        return connection.execute(text("SELECT version FROM schemaversion ORDER BY version")).scalars().all()
+
+
+def index_names(engine) -> set:
+    with engine.connect() as connection:
+        return set(connection.execute(text("SELECT name FROM sqlite_master WHERE type = 'index'")).scalars())
+
+
+def test_fresh_database_startup_then_online_steps(database):
+    pending = run_migrations()
+    assert [m.version for m in pending] == ONLINE
+    assert versions(database) == [v for v in ALL if v not in ONLINE]
+
+    assert [m.version for m in run_migrations()] == ONLINE
+    assert run_migrations(online=True) == []
+    assert versions(database) == ALL
+    declared = {index.name for table in SQLModel.metadata.sorted_tables for index in table.indexes}
+    assert declared <= index_names(database)
+    assert run_migrations() == [] and versions(database) == ALL
+
+
+def test_concurrent_workers_apply_each_version_once(database):
+    errors = []
+
+    def worker():
+        try:
+            run_migrations()
+        except Exception as e:
+            errors.append(e)
+
+    threads = [threading.Thread(target=worker) for _ in range(4)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert errors == []
+    assert versions(database) == [v for v in ALL if v not in ONLINE]
+    with database.connect() as connection:
+        assert connection.execute(text('SELECT count(*) FROM "user" WHERE username = :u'), {"u": ADMIN_USERNAME}).scalar() == 1
+
+
+def test_legacy_database_is_upgraded(database):
+    # Régi séma: a résztvevők csak vesszős szövegben, szöveges (időzónás) dátumok, feed titok és
+    # résztvevő-időpontok nélkül, verziótábla nélkül
+    SQLModel.metadata.create_all(database)
+    with database.begin() as connection:
+        for name in ("ix_eventparticipant_user_start", "ix_eventparticipant_user_duration", "ix_eventparticipant_user_series",
+                     "ix_eventparticipant_user_start_event"):
+            connection.execute(text(f"DROP INDEX {name}"))
+        for table, column in [("eventparticipant", "start_date"), ("eventparticipant", "end_date"),
+                              ("eventparticipant", "series_end"), ("user", "feed_secret_hash")]:
+            connection.execute(text(f'ALTER TABLE "{table}" DROP COLUMN {column}'))
+        connection.execute(text(
+            "INSERT INTO event (id, title, owner, participants, start_date, end_date, is_meeting, is_public, version, participant_count) "
+            "VALUES (1, 'Régi', 'anna', 'anna, bela,anna', '2026-03-01T10:00:00+02:00', '2026-03-01T11:30:00+02:00', 0, 0, 0, 0), "
+            "(2, 'Üres', 'bela', NULL, '2026-03-02 09:00:00.000000', '2026-03-02 10:00:00.000000', 0, 0, 0, 0)"
+        ))
+
+    assert [m.version for m in run_migrations()] == ONLINE
+    run_migrations(online=True)
+
+    with database.connect() as connection:
+        events = connection.execute(text("SELECT id, start_date, end_date, participant_count FROM event ORDER BY id")).all()
+        links = connection.execute(text(
+            "SELECT event_id, username, start_date, end_date, series_end FROM eventparticipant ORDER BY username"
+        )).all()
+        user_columns = {row[1] for row in connection.execute(text('PRAGMA table_info("user")'))}
+    assert events == [
+        (1, "2026-03-01 08:00:00.000000", "2026-03-01 09:30:00.000000", 2),
+        (2, "2026-03-02 09:00:00.000000", "2026-03-02 10:00:00.000000", 0),
+    ]
+    assert links == [
+        (1, "anna", "2026-03-01 08:00:00.000000", "2026-03-01 09:30:00.000000", None),
+        (1, "bela", "2026-03-01 08:00:00.000000", "2026-03-01 09:30:00.000000", None),
+    ]
+    assert "feed_secret_hash" in user_columns
+    assert "ix_eventparticipant_user_duration" in index_names(database)
+    assert versions(database) == ALL
+
+
+def test_chat_messages_are_rebuilt_without_id_reuse(database):
+    SQLModel.metadata.create_all(database)
+    with database.begin() as connection:
+        connection.execute(text("DROP TABLE chatmessage"))
+        connection.execute(text(
+            "CREATE TABLE chatmessage (id INTEGER NOT NULL PRIMARY KEY, session_id VARCHAR NOT NULL, sender VARCHAR NOT NULL, "
+            "message VARCHAR NOT NULL, timestamp DATETIME NOT NULL, needs_human BOOLEAN NOT NULL)"
+        ))
+        connection.execute(text("CREATE INDEX ix_chatmessage_session_timestamp ON chatmessage (session_id, timestamp)"))
+        connection.execute(text(
+            "INSERT INTO chatmessage VALUES (1, 's', 'user', 'régi', '2026-01-01 10:00:00.000000', 0), "
+            "(2, 's', 'bot', 'válasz', '2026-01-01 10:00:01.000000', 0)"
+        ))
+        connection.execute(text(
+            "INSERT INTO chatarchiveentry (session_id, segment, offset, length, message_count, first_id, last_id, archived_at) "
+            "VALUES ('archivalt', 'chat-000001.jsonl.gz', 0, 10, 5, 3, 7, '2026-01-02 00:00:00.000000')"
+        ))
+
+    run_migrations()
+    with database.begin() as connection:
+        ddl = connection.execute(text("SELECT sql FROM sqlite_master WHERE name = 'chatmessage'")).scalar()
+        kept = connection.execute(text("SELECT id, message FROM chatmessage ORDER BY id")).all()
+        connection.execute(text("INSERT INTO chatmessage (session_id, sender, message, timestamp, needs_human) "
+                                "VALUES ('s', 'user', 'új', '2026-01-03 10:00:00.000000', 0)"))
+        new_id = connection.execute(text("SELECT MAX(id) FROM chatmessage")).scalar()
+    assert "AUTOINCREMENT" in ddl
+    assert kept == [(1, "régi"), (2, "válasz")] and new_id == 8
+    assert {"ix_chatmessage_session_timestamp", "ix_chatmessage_timestamp"} <= index_names(database)
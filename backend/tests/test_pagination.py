@@ -0,0 +1,92 @@
+import base64
+
+
+def pages(client, user, limit: int, **params) -> list:
+    """Az összes oldal bejárása a cursorral; oldalanként az azonosítók"""
+    result, cursor = [], None
+    while True:
+        query = {"limit": limit, **params}
+        if cursor:
+            query["cursor"] = cursor
+        response = client.get("/events", params=query, headers=user.headers)
+        assert response.status_code == 200, response.text
+        result.append([event["id"] for event in response.json()])
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            return result
+
+
+def test_cursor_pages_split_equal_timestamps_without_gaps_or_duplicates(client, make_user, create_event):
+    user = make_user()
+    # Hét esemény ugyanazzal a kezdéssel: a lapozás (start_date, id) szerint halad
+    same = [create_event(user, "2026-03-02T09:00:00", "2026-03-02T10:00:00")["id"] for _ in range(7)]
+    later = create_event(user, "2026-03-02T11:00:00", "2026-03-02T12:00:00")["id"]
+    earlier = create_event(user, "2026-03-01T11:00:00", "2026-03-01T12:00:00")["id"]
+
+    result = pages(client, user, 3)
+    assert [len(page) for page in result] == [3, 3, 3]
+    assert [event_id for page in result for event_id in page] == [earlier, *sorted(same), later]
+
+
+def test_last_full_page_has_no_cursor(client, make_user, create_event):
+    user = make_user()
+    for day in range(1, 5):
+        create_event(user, f"2026-04-0{day}T09:00:00", f"2026-04-0{day}T10:00:00")
+    assert [len(page) for page in pages(client, user, 2)] == [2, 2]
+
+
+def test_window_includes_events_overlapping_its_start(client, make_user, create_event):
+    user = make_user()
+    overlapping = create_event(user, "2026-05-01T22:00:00", "2026-05-02T02:00:00")
+    inside = create_event(user, "2026-05-02T09:00:00", "2026-05-02T10:00:00")
+    create_event(user, "2026-05-01T08:00:00", "2026-05-01T09:00:00")
+    create_event(user, "2026-05-03T00:00:00", "2026-05-03T01:00:00")
+
+    listed = client.get("/events", params={"from": "2026-05-02T00:00:00", "to": "2026-05-03T00:00:00"},
+                        headers=user.headers).json()
+    assert [event["id"] for event in listed] == [overlapping["id"], inside["id"]]
+
+
+def test_window_and_cursor_combine(client, make_user, create_event):
+    user = make_user()
+    ids = [create_event(user, f"2026-06-0{day}T09:00:00", f"2026-06-0{day}T10:00:00")["id"] for day in range(1, 8)]
+    result = pages(client, user, 2, **{"from": "2026-06-02T00:00:00", "to": "2026-06-06T00:00:00"})
+    assert [event_id for page in result for event_id in page] == ids[1:5]
+
+
+def test_invalid_cursor_and_limit_are_rejected(client, make_user):
+    user = make_user()
+    garbage = base64.urlsafe_b64encode(b"nem-datum|x").decode()
+    assert client.get("/events", params={"cursor": garbage}, headers=user.headers).status_code == 400
+    assert client.get("/events", params={"limit": 0}, headers=user.headers).status_code == 422
+    assert client.get("/events", params={"limit": 1001}, headers=user.headers).status_code == 422
+
+
+def test_user_calendar_pages_with_cursor(client, make_user, create_event):
+    owner, viewer = make_user(), make_user()
+    ids = [create_event(owner, "2026-07-01T09:00:00", "2026-07-01T10:00:00")["id"] for _ in range(5)]
+    seen, cursor = [], None
+    while True:
+        params = {"limit": 2, **({"cursor": cursor} if cursor else {})}
+        response = client.get(f"/events/user/{owner.username}", params=params, headers=viewer.headers)
+        seen.extend(event["id"] for event in response.json())
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            break
+    assert seen == sorted(ids)
+
+
+def test_window_keeps_long_events_and_series_started_long_before(client, make_user, create_event):
+    owner, viewer = make_user(), make_user()
+    # Sok rövid esemény az ablak előtt: az alsó korlát a leghosszabb alkalomhoz igazodik
+    for day in range(1, 20):
+        create_event(owner, f"2026-08-{day:02d}T08:00:00", f"2026-08-{day:02d}T08:30:00")
+    long = create_event(owner, "2026-08-01T12:00:00", "2026-08-30T12:00:00", title="konferencia")
+    daily = create_event(owner, "2025-01-06T07:00:00", "2025-01-06T07:30:00", title="napi", rrule="FREQ=DAILY")
+    inside = create_event(owner, "2026-08-25T09:00:00", "2026-08-25T10:00:00")
+
+    window = {"from": "2026-08-25T00:00:00", "to": "2026-08-26T00:00:00"}
+    expected = [long["id"], daily["id"], inside["id"]]
+    assert [event["id"] for event in client.get("/events", params=window, headers=owner.headers).json()] == expected
+    listed = client.get(f"/events/user/{owner.username}", params=window, headers=viewer.headers).json()
+    assert [event["id"] for event in listed] == expected
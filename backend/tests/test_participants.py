@@ -0,0 +1,71 @@
+from sqlmodel import Session, select
+from app.database import engine
+from app.models import EventParticipant
+
+
+def links(event_id: int) -> set:
+    with Session(engine) as session:
+        return set(session.exec(select(EventParticipant.username).where(EventParticipant.event_id == event_id)).all())
+
+
+def my_event_ids(client, user) -> set:
+    return {event["id"] for event in client.get("/events", headers=user.headers).json()}
+
+
+def test_owner_and_participants_are_linked(client, make_user, create_event):
+    owner, guest = make_user(), make_user()
+    event = create_event(owner, participants=f"{guest.username}, {guest.username} ,")
+    assert links(event["id"]) == {owner.username, guest.username}
+    assert event["participant_count"] == 2
+    assert event["id"] in my_event_ids(client, owner)
+    assert event["id"] in my_event_ids(client, guest)
+
+
+def test_similar_usernames_do_not_match(client, make_user, create_event):
+    owner, guest = make_user(), make_user()
+    # A régi szöveges LIKE keresés a név előtagú/részszavas felhasználókat is találatnak vette
+    longer_name = make_user(prefix=guest.username + "x")
+    event = create_event(owner, participants=longer_name.username)
+    assert event["id"] not in my_event_ids(client, guest)
+    assert event["id"] in my_event_ids(client, longer_name)
+
+
+def test_update_syncs_participant_links(client, make_user, create_event):
+    owner, first, second = make_user(), make_user(), make_user()
+    event = create_event(owner, participants=first.username)
+    response = client.put(f"/events/{event['id']}", json={
+        "title": "megbeszélés", "start_date": "2026-03-02T09:00:00", "end_date": "2026-03-02T10:00:00",
+        "participants": second.username
+    }, headers=owner.headers)
+    assert response.status_code == 200
+    assert links(event["id"]) == {owner.username, second.username}
+    assert event["id"] not in my_event_ids(client, first)
+    assert event["id"] in my_event_ids(client, second)
+
+
+def test_delete_removes_links(client, make_user, create_event):
+    owner, guest = make_user(), make_user()
+    event = create_event(owner, participants=guest.username)
+    assert client.delete(f"/events/{event['id']}", headers=owner.headers).status_code == 200
+    assert links(event["id"]) == set()
+    assert event["id"] not in my_event_ids(client, guest)
+
+
+def test_only_owner_may_change_or_delete(client, make_user, create_event):
+    owner, guest = make_user(), make_user()
+    event = create_event(owner, participants=guest.username)
+    assert client.delete(f"/events/{event['id']}", headers=guest.headers).status_code == 403
+    assert client.put(f"/events/{event['id']}", json={
+        "title": "x", "start_date": "2026-03-02T09:00:00", "end_date": "2026-03-02T10:00:00"
+    }, headers=guest.headers).status_code == 403
+
+
+def test_private_events_are_masked_for_other_viewers(client, make_user, create_event):
+    owner, guest, stranger = make_user(), make_user(), make_user()
+    create_event(owner, participants=guest.username, title="titkos", description="részletek")
+
+    as_guest = client.get(f"/events/user/{owner.username}", headers=guest.headers).json()
+    assert [(e["title"], e["description"]) for e in as_guest] == [("titkos", "részletek")]
+
+    as_stranger = client.get(f"/events/user/{owner.username}", headers=stranger.headers).json()
+    assert [(e["title"], e["description"], e["participants"]) for e in as_stranger] == [("Foglalt", None, None)]
@@ -0,0 +1,66 @@
+import datetime, re
+from sqlmodel import Session, select, update
+from app.database import engine
+from app.dependencies import verify_password
+from app.models import PasswordResetToken, User
+from app.sessions import hash_token, sweep_sessions
+
+INVALID = {"detail": "Érvénytelen vagy lejárt kód!"}
+
+
+def request_code(client, capsys, username: str) -> str:
+    assert client.post("/request-reset", json={"username": username}).json() == {"message": "Kód elküldve"}
+    return re.findall(rf"KÓD \({re.escape(username)}\): (\S+)", capsys.readouterr().out)[-1]
+
+
+def confirm(client, token: str, new_password: str = "uj-jelszo-456"):
+    return client.post("/confirm-reset", json={"token": token, "new_password": new_password})
+
+
+def stored_tokens(username: str) -> list:
+    with Session(engine) as session:
+        return session.exec(select(PasswordResetToken).where(PasswordResetToken.username == username)).all()
+
+
+def test_only_the_hash_of_the_latest_code_is_stored(client, make_user, capsys):
+    user = make_user()
+    first = request_code(client, capsys, user.username)
+    second = request_code(client, capsys, user.username)
+
+    assert [t.token_hash for t in stored_tokens(user.username)] == [hash_token(second)]
+    assert confirm(client, first).json() == INVALID
+    assert confirm(client, second).status_code == 200
+
+
+def test_unknown_user_gets_the_same_answer(client, capsys):
+    assert client.post("/request-reset", json={"username": "nincs-ilyen-felhasznalo"}).json() == {"message": "Kód elküldve"}
+    assert "nincs-ilyen-felhasznalo" not in capsys.readouterr().out
+    assert stored_tokens("nincs-ilyen-felhasznalo") == []
+
+
+def test_code_is_single_use_and_revokes_sessions(client, make_user, capsys):
+    user = make_user()
+    code = request_code(client, capsys, user.username)
+    assert confirm(client, code).json() == {"message": "Sikeres jelszócsere!"}
+
+    with Session(engine) as session:
+        stored = session.exec(select(User).where(User.username == user.username)).one()
+    assert verify_password("uj-jelszo-456", stored.hashed_password)
+    assert stored_tokens(user.username) == []
+    assert confirm(client, code, "harmadik-jelszo").status_code == 400
+    assert client.post("/token/refresh", json={"refresh_token": user.refresh_token}).status_code == 401
+    assert client.get("/events", headers=user.headers).status_code == 401
+
+
+def test_expired_code_is_rejected_and_swept(client, make_user, capsys):
+    user = make_user()
+    code = request_code(client, capsys, user.username)
+    with Session(engine) as session:
+        session.exec(update(PasswordResetToken)
+                     .where(PasswordResetToken.username == user.username)
+                     .values(expires_at=datetime.datetime.utcnow() - datetime.timedelta(seconds=1)))
+        session.commit()
+
+    assert confirm(client, code).json() == INVALID
+    sweep_sessions()
+    assert stored_tokens(user.username) == []
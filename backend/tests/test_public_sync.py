@@ -0,0 +1,79 @@
+PUBLIC = {"title": "nyilvános", "start_date": "2026-09-01T09:00:00", "end_date": "2026-09-01T10:00:00", "is_public": True}
+
+
+def current(client) -> tuple:
+    response = client.get("/events/public", params={"since": 10 ** 9})
+    assert response.status_code == 200
+    return response.headers["etag"], response.json()["version"]
+
+
+def delta(client, since: int) -> dict:
+    response = client.get("/events/public", params={"since": since})
+    assert response.status_code == 200
+    return response.json()
+
+
+def test_unchanged_list_answers_304(client, make_user, create_event):
+    user = make_user()
+    create_event(user, is_public=True)
+    etag, _ = current(client)
+    response = client.get("/events/public", headers={"If-None-Match": etag})
+    assert response.status_code == 304
+    assert response.headers["etag"] == etag
+    assert response.content == b""
+
+
+def test_public_change_changes_etag_private_change_does_not(client, make_user, create_event):
+    user = make_user()
+    etag, _ = current(client)
+    create_event(user)
+    assert current(client)[0] == etag
+    assert client.get("/events/public", headers={"If-None-Match": etag}).status_code == 304
+
+    create_event(user, is_public=True)
+    assert current(client)[0] != etag
+    assert client.get("/events/public", headers={"If-None-Match": etag}).status_code == 200
+
+
+def test_delta_contains_upserts_since_version(client, make_user, create_event):
+    user = make_user()
+    _, version = current(client)
+    created = create_event(user, is_public=True, title="új")
+    updated = create_event(user, is_public=True, title="régi")
+    client.put(f"/events/{updated['id']}", json={**PUBLIC, "title": "módosított"}, headers=user.headers)
+
+    result = delta(client, version)
+    assert [event["title"] for event in result["upserts"]] == ["új", "módosított"]
+    assert {event["id"] for event in result["upserts"]} == {created["id"], updated["id"]}
+    assert result["deleted"] == []
+    assert delta(client, result["version"]) == {"version": result["version"], "upserts": [], "deleted": []}
+
+
+def test_delete_leaves_a_tombstone(client, make_user, create_event):
+    user = make_user()
+    event = create_event(user, is_public=True)
+    _, version = current(client)
+    assert client.delete(f"/events/{event['id']}", headers=user.headers).status_code == 200
+
+    result = delta(client, version)
+    assert result["deleted"] == [event["id"]]
+    assert result["upserts"] == []
+    assert result["version"] > version
+
+
+def test_event_turned_private_is_a_tombstone(client, make_user, create_event):
+    user = make_user()
+    event = create_event(user, is_public=True)
+    _, version = current(client)
+    client.put(f"/events/{event['id']}", json={**PUBLIC, "is_public": False}, headers=user.headers)
+    assert delta(client, version)["deleted"] == [event["id"]]
+
+
+def test_created_then_deleted_is_only_a_tombstone(client, make_user, create_event):
+    user = make_user()
+    _, version = current(client)
+    event = create_event(user, is_public=True)
+    client.delete(f"/events/{event['id']}", headers=user.headers)
+    result = delta(client, version)
+    assert event["id"] not in {e["id"] for e in result["upserts"]}
+    assert event["id"] in result["deleted"]
@@ -0,0 +1,71 @@
+import os, tempfile, threading, time
+import pytest
+from limits import RateLimitItemPerMinute
+from limits.storage import storage_from_string
+from limits.strategies import SlidingWindowCounterRateLimiter
+from app.rate_limit_storage import SQLiteStorage
+from app.rate_limiter import limiter
+
+
+@pytest.fixture
+def uri():
+    return f"sqlite:///{os.path.join(tempfile.mkdtemp(), 'ratelimit.db')}"
+
+
+@pytest.fixture
+def fresh_limiter():
+    limiter.reset()
+    yield
+    limiter.reset()
+
+
+def test_sqlite_scheme_is_registered(uri):
+    storage = storage_from_string(uri)
+    assert isinstance(storage, SQLiteStorage) and storage.check()
+
+
+def test_counters_expire_and_are_swept(uri):
+    storage = SQLiteStorage(uri + "?sweep_interval=0")
+    assert storage.incr("a", 60) == 1 and storage.incr("a", 60, amount=2) == 3
+    assert storage.get("a") == 3 and storage.get_expiry("a") > time.time() + 50
+
+    storage.incr("rovid", 0)
+    assert storage.get("rovid") == 0
+    assert storage.incr("rovid", 60) == 1
+    storage.clear("a")
+    assert storage.get("a") == 0
+    storage.incr("lejart", 0)
+    storage.incr("b", 60)
+    rows = storage._connection.execute("SELECT key FROM ratelimit_counter").fetchall()
+    assert {key for (key,) in rows} == {"rovid", "b"}
+
+
+def test_workers_sharing_the_file_share_the_limit(uri):
+    item = RateLimitItemPerMinute(5)
+    workers = [SlidingWindowCounterRateLimiter(SQLiteStorage(uri)) for _ in range(2)]
+    results = [workers[i % 2].hit(item, "1.2.3.4") for i in range(7)]
+    assert results == [True] * 5 + [False] * 2
+    assert workers[1].hit(item, "5.6.7.8")
+
+
+def test_concurrent_hits_never_exceed_the_limit(uri):
+    item = RateLimitItemPerMinute(50)
+    workers = [SlidingWindowCounterRateLimiter(SQLiteStorage(uri)) for _ in range(4)]
+    allowed = []
+
+    def hammer(worker):
+        allowed.extend(worker.hit(item, "kliens") for _ in range(30))
+
+    threads = [threading.Thread(target=hammer, args=(workers[i % 4],)) for i in range(8)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert sum(allowed) == 50
+
+
+def test_login_is_limited_per_client(client, fresh_limiter):
+    statuses = [
+        client.post("/login", json={"username": "nincs-ilyen", "password": "rossz"}).status_code for _ in range(6)
+    ]
+    assert statuses == [401] * 5 + [429]
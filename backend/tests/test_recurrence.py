@@ -0,0 +1,107 @@
+import datetime, random, time
+import pytest
+from app import recurrence
+from app.recurrence import OPEN_ENDED, Rule, parse_rrule, series_end
+
+START = datetime.datetime(2026, 3, 2, 9, 0)  # hétfő
+END = START + datetime.timedelta(hours=1)
+
+
+def iterated_series_end(start, end, rule):
+    """Referencia: a sorozat végének kiszámítása az alkalmak bejárásával"""
+    last, limit = start, rule.until or OPEN_ENDED
+    for index, occurrence in recurrence.GENERATORS[rule.freq](start, rule, start):
+        if occurrence > limit or (rule.count is not None and index >= rule.count):
+            break
+        last = occurrence
+    return last + (end - start)
+
+
+def test_parse_and_format_round_trip():
+    rule = parse_rrule("RRULE:FREQ=weekly;BYDAY=WE,MO;COUNT=10")
+    assert rule == Rule("WEEKLY", 1, 10, None, (0, 2))
+    assert recurrence.format_rrule(rule) == "FREQ=WEEKLY;COUNT=10;BYDAY=MO,WE"
+
+
+@pytest.mark.parametrize("value", [
+    "FREQ=HOURLY",
+    "FREQ=DAILY;COUNT=0",
+    "FREQ=DAILY;COUNT=3;UNTIL=20260401",
+    "FREQ=DAILY;BYDAY=MO",
+    "FREQ=DAILY;BYMONTH=1",
+])
+def test_parse_rejects_invalid_rules(value):
+    with pytest.raises(ValueError):
+        parse_rrule(value)
+
+
+def test_occurrences_only_inside_window_and_skip_exdates():
+    rule = parse_rrule("FREQ=DAILY;COUNT=10")
+    skipped = START + datetime.timedelta(days=4)
+    window = (START + datetime.timedelta(days=3), START + datetime.timedelta(days=6))
+    result = list(recurrence.occurrences(START, END, rule, {skipped}, *window))
+    assert [start.day for start, _ in result] == [5, 7]
+
+
+def test_monthly_skips_missing_days():
+    start = datetime.datetime(2026, 1, 31, 10)
+    rule = parse_rrule("FREQ=MONTHLY;COUNT=3")
+    end = start + datetime.timedelta(hours=1)
+    result = list(recurrence.occurrences(start, end, rule, set(), start, datetime.datetime(2027, 1, 1)))
+    assert [occurrence.month for occurrence, _ in result] == [1, 3, 5]
+
+
+def test_weekly_series_end_matches_iteration():
+    random.seed(11)
+    for _ in range(500):
+        start = START + datetime.timedelta(days=random.randint(0, 30), hours=random.randint(0, 12))
+        end = start + datetime.timedelta(hours=random.randint(0, 30))
+        days = tuple(sorted(random.sample(range(7), random.randint(0, 7))))
+        interval = random.randint(1, 3)
+        if random.random() < 0.5:
+            rule = Rule("WEEKLY", interval, random.randint(1, 40), None, days)
+        else:
+            until = start + datetime.timedelta(days=random.randint(-2, 200), hours=random.randint(0, 23))
+            rule = Rule("WEEKLY", interval, None, until, days)
+        assert series_end(start, end, rule) == iterated_series_end(start, end, rule)
+
+
+def test_huge_count_does_not_overflow_or_iterate():
+    assert series_end(START, END, parse_rrule("FREQ=DAILY;COUNT=1000000000")) == OPEN_ENDED
+    started = time.perf_counter()
+    weekly = series_end(START, END, parse_rrule("FREQ=WEEKLY;BYDAY=MO,TU,WE,TH,FR,SA,SU;COUNT=100000000"))
+    assert time.perf_counter() - started < 0.05
+    assert weekly == OPEN_ENDED
+    daily_by_week = series_end(START, END, parse_rrule("FREQ=WEEKLY;BYDAY=MO,TU,WE,TH,FR,SA,SU;COUNT=100000"))
+    assert daily_by_week == START + datetime.timedelta(days=100000 - 1, hours=1)
+
+
+def test_check_limits():
+    recurrence.check_limits(START, parse_rrule("FREQ=DAILY;COUNT=100"), 100, 10)
+    with pytest.raises(ValueError):
+        recurrence.check_limits(START, parse_rrule("FREQ=DAILY;COUNT=101"), 100, 10)
+    with pytest.raises(ValueError):
+        recurrence.check_limits(START, parse_rrule("FREQ=DAILY;UNTIL=20400101"), 100, 10)
+
+
+def event_payload(rrule: str) -> dict:
+    return {"title": "Sorozat", "start_date": START.isoformat(), "end_date": END.isoformat(), "rrule": rrule}
+
+
+@pytest.mark.parametrize("rrule", ["FREQ=DAILY;COUNT=1000000000", "FREQ=WEEKLY;UNTIL=99991231"])
+def test_create_event_rejects_unbounded_rules(client, make_user, rrule):
+    user = make_user()
+    response = client.post("/events", json=event_payload(rrule), headers=user.headers)
+    assert response.status_code == 400
+    assert "Érvénytelen ismétlődés" in response.json()["detail"]
+
+
+def test_recurring_event_expands_inside_window(client, make_user, create_event):
+    user = make_user()
+    event = create_event(user, **event_payload("FREQ=WEEKLY;BYDAY=MO,WE;COUNT=4"))
+    assert event["series_end"] == "2026-03-11T10:00:00"
+
+    listed = client.get(
+        "/events", params={"from": "2026-03-03T00:00:00", "to": "2026-03-10T00:00:00"}, headers=user.headers
+    ).json()
+    assert [event["start_date"] for event in listed] == ["2026-03-04T09:00:00", "2026-03-09T09:00:00"]
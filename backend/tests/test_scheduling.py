@@ -0,0 +1,86 @@
+import datetime, random
+from app import scheduling
+
+DAY = datetime.datetime(2026, 3, 2)  # hétfő
+
+
+def at(hour: float) -> datetime.datetime:
+    return DAY + datetime.timedelta(hours=hour)
+
+
+def test_merge_union_and_free_intervals():
+    first = [(at(9), at(10)), (at(9.5), at(11)), (at(13), at(14))]
+    second = [(at(11), at(12)), (at(15), at(16))]
+    busy = scheduling.union([scheduling.merge_intervals(first), second])
+    assert busy == [(at(9), at(12)), (at(13), at(14)), (at(15), at(16))]
+    assert scheduling.free_intervals(busy, at(8), at(15.5)) == [(at(8), at(9)), (at(12), at(13)), (at(14), at(15))]
+
+
+def test_working_windows_skip_weekends_and_clip():
+    windows = list(scheduling.working_windows(
+        at(12), DAY + datetime.timedelta(days=6, hours=10), datetime.time(9), datetime.time(17)
+    ))
+    assert windows[0] == (at(12), at(17))
+    assert [start.weekday() for start, _ in windows] == [0, 1, 2, 3, 4]
+    every_day = scheduling.working_windows(at(0), DAY + datetime.timedelta(days=7), datetime.time(9),
+                                           datetime.time(17), weekdays_only=False)
+    assert len(list(every_day)) == 7
+
+
+def reference_slots(busy, windows, duration, step, count):
+    """Referencia: munkaidő-sávonként a szabad rések, mindegyikben a rés elejétől lépésközzel"""
+    slots = []
+    for window_start, window_end in windows:
+        clipped = scheduling.clip(busy, window_start, window_end)
+        for gap_start, gap_end in scheduling.free_intervals(clipped, window_start, window_end):
+            start = gap_start
+            while start + duration <= gap_end:
+                slots.append((start, start + duration))
+                start += step
+    return slots[:count]
+
+
+def test_find_slots_matches_reference_on_random_calendars():
+    rng = random.Random(11)
+    for _ in range(300):
+        busy = []
+        for _ in range(rng.randint(0, 12)):
+            start = at(rng.randint(0, 4 * 24 * 4) / 4)
+            busy.append((start, start + datetime.timedelta(minutes=15 * rng.randint(1, 12))))
+        busy = scheduling.merge_intervals(sorted(busy))
+        windows = list(scheduling.working_windows(at(0), at(4 * 24), datetime.time(9), datetime.time(17)))
+        duration = datetime.timedelta(minutes=15 * rng.randint(1, 8))
+        step = datetime.timedelta(minutes=15 * rng.randint(1, 4))
+
+        expected = reference_slots(busy, windows, duration, step, 5)
+        assert scheduling.find_slots(busy, iter(windows), duration, step, 5) == expected
+
+
+def test_find_slots_endpoint_includes_the_caller(client, make_user, create_event):
+    me, colleague = make_user(), make_user()
+    for user, start, end in [(me, "09:00", "10:00"), (colleague, "10:00", "11:30")]:
+        create_event(user, f"2026-03-02T{start}:00", f"2026-03-02T{end}:00", title="foglalt")
+
+    response = client.post("/events/find-slots", json={
+        "participants": [colleague.username], "duration_minutes": 60, "count": 3,
+        "start": "2026-03-02T00:00:00", "end": "2026-03-09T00:00:00"
+    }, headers=me.headers)
+    assert response.status_code == 200, response.text
+    body = response.json()
+    assert body["participants"] == [colleague.username, me.username]
+    assert [slot["start"] for slot in body["slots"]] == [
+        "2026-03-02T11:30:00", "2026-03-02T12:00:00", "2026-03-02T12:30:00"
+    ]
+
+
+def test_find_slots_validates_window(client, make_user):
+    user = make_user()
+    base = {"participants": [user.username], "duration_minutes": 30}
+    too_long = client.post("/events/find-slots", json={
+        **base, "start": "2026-01-01T00:00:00", "end": "2027-06-01T00:00:00"
+    }, headers=user.headers)
+    assert too_long.status_code == 400
+    reversed_window = client.post("/events/find-slots", json={
+        **base, "start": "2026-01-02T00:00:00", "end": "2026-01-01T00:00:00"
+    }, headers=user.headers)
+    assert reversed_window.status_code == 400
@@ -0,0 +1,87 @@
+import jwt
+from sqlmodel import Session, select
+from app.config import ALGORITHM, SECRET_KEY
+from app.database import engine
+from app.models import UserSession
+from app.sessions import hash_token
+from conftest import PASSWORD
+
+
+def bearer(token: str) -> dict:
+    return {"Authorization": f"Bearer {token}"}
+
+
+def refresh(client, refresh_token: str):
+    return client.post("/token/refresh", json={"refresh_token": refresh_token})
+
+
+def test_login_issues_session_bound_tokens(client, make_user):
+    user = make_user()
+    response = client.post("/login", json={"username": user.username, "password": PASSWORD})
+    assert response.status_code == 200
+    body = response.json()
+    assert jwt.decode(body["access_token"], SECRET_KEY, algorithms=[ALGORITHM])["sid"]
+    with Session(engine) as session:
+        stored = session.exec(select(UserSession).where(UserSession.username == user.username)).all()
+    assert hash_token(body["refresh_token"]) in {s.token_hash for s in stored}
+    assert body["refresh_token"] not in {s.token_hash for s in stored}
+
+
+def test_swagger_token_endpoint_creates_revocable_session(client, make_user):
+    user = make_user()
+    response = client.post("/token", data={"username": user.username, "password": PASSWORD})
+    assert response.status_code == 200
+    body = response.json()
+    assert jwt.decode(body["access_token"], SECRET_KEY, algorithms=[ALGORITHM])["sid"]
+    assert client.get("/events", headers=bearer(body["access_token"])).status_code == 200
+
+    client.post("/logout", json={"refresh_token": body["refresh_token"]})
+    assert client.get("/events", headers=bearer(body["access_token"])).status_code == 401
+
+
+def test_swagger_token_endpoint_rejects_wrong_password(client, make_user):
+    user = make_user()
+    assert client.post("/token", data={"username": user.username, "password": "rossz"}).status_code == 401
+
+
+def test_refresh_rotates_tokens(client, make_user):
+    user = make_user()
+    first = refresh(client, user.refresh_token)
+    assert first.status_code == 200
+    rotated = first.json()
+    assert rotated["refresh_token"] != user.refresh_token
+    assert client.get("/events", headers=bearer(rotated["access_token"])).status_code == 200
+
+    second = refresh(client, rotated["refresh_token"])
+    assert second.status_code == 200
+
+
+def test_refresh_token_reuse_revokes_whole_family(client, make_user):
+    user = make_user()
+    rotated = refresh(client, user.refresh_token).json()
+
+    # A már lecserélt token újrafelhasználása lopásra utal: az egész család visszavonódik
+    assert refresh(client, user.refresh_token).status_code == 401
+    assert refresh(client, rotated["refresh_token"]).status_code == 401
+    assert client.get("/events", headers=bearer(rotated["access_token"])).status_code == 401
+    assert client.get("/events", headers=user.headers).status_code == 401
+
+
+def test_reuse_does_not_touch_other_sessions(client, make_user):
+    user = make_user()
+    other = client.post("/token", data={"username": user.username, "password": PASSWORD}).json()
+    refresh(client, user.refresh_token)
+    refresh(client, user.refresh_token)
+    assert client.get("/events", headers=bearer(other["access_token"])).status_code == 200
+    assert refresh(client, other["refresh_token"]).status_code == 200
+
+
+def test_unknown_refresh_token_is_rejected(client):
+    assert refresh(client, "nem-letezo-token").status_code == 401
+
+
+def test_logout_revokes_access_token(client, make_user):
+    user = make_user()
+    assert client.post("/logout", json={"refresh_token": user.refresh_token}).status_code == 200
+    assert client.get("/events", headers=user.headers).status_code == 401
+    assert refresh(client, user.refresh_token).status_code == 401
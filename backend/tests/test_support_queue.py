@@ -0,0 +1,96 @@
+import datetime
+from sqlalchemy import create_engine, text
+from sqlmodel import Session, SQLModel, select, update
+from app.database import engine
+from app.migrations import create_chat_sessions
+from app.models import ChatSession
+
+QUEUE_KEYS = ["session_id", "status", "needs_human", "last_message_at", "last_sender", "unread_count"]
+
+
+def send(client, session_id: str, message: str) -> str:
+    return client.post("/chat/send", json={"session_id": session_id, "message": message}).json()["status"]
+
+
+def summary(session_id: str) -> ChatSession:
+    with Session(engine) as session:
+        return session.get(ChatSession, session_id)
+
+
+def queue(client, admin, limit: int, **params) -> list:
+    rows, cursor = [], None
+    while True:
+        query = {"limit": limit, **params, **({"cursor": cursor} if cursor else {})}
+        response = client.get("/admin/support-requests", params=query, headers=admin.headers)
+        assert response.status_code == 200
+        rows += response.json()
+        cursor = response.headers.get("X-Next-Cursor")
+        if not cursor:
+            return rows
+
+
+def test_summary_follows_the_conversation(client, make_user, unique):
+    admin, sid = make_user(role="admin"), unique("tamogatas")
+    assert send(client, sid, "Kérek egy embert") == "human_transfer_initiated"
+    state = summary(sid)
+    assert (state.status, state.needs_human, state.last_sender, state.unread_count) == ("waiting", True, "bot", 1)
+
+    assert send(client, sid, "Itt vagyok még") == "waiting_for_admin"
+    assert summary(sid).unread_count == 2
+    assert client.get(f"/admin/chat/{sid}", headers=admin.headers).status_code == 200
+    assert summary(sid).unread_count == 0
+
+    client.post("/admin/reply", json={"target_session_id": sid, "message": "Segítek"}, headers=admin.headers)
+    state = summary(sid)
+    assert (state.status, state.last_sender, state.unread_count) == ("admin", "admin", 0)
+    client.post("/admin/resolve", json={"target_session_id": sid}, headers=admin.headers)
+    state = summary(sid)
+    assert (state.status, state.needs_human) == ("resolved", False)
+
+
+def test_queue_pages_in_index_order_including_ties(client, make_user, unique):
+    admin = make_user(role="admin")
+    same_time = datetime.datetime(2026, 10, 1, 12, 0, 0)
+    ids = [unique("sor") for _ in range(5)]
+    for sid in ids:
+        send(client, sid, "ember kell")
+    with Session(engine) as session:
+        session.exec(update(ChatSession).where(ChatSession.session_id.in_(ids[:3])).values(last_message_at=same_time))
+        session.commit()
+        expected = session.exec(select(ChatSession).order_by(
+            ChatSession.needs_human.desc(), ChatSession.last_message_at.desc(), ChatSession.session_id.desc()
+        )).all()
+    expected = [{key: getattr(row, key) for key in QUEUE_KEYS} for row in expected]
+    for row in expected:
+        row["last_message_at"] = row["last_message_at"].isoformat()
+
+    assert queue(client, admin, limit=2) == expected
+    waiting = queue(client, admin, limit=3, needs_human="true")
+    assert waiting == [row for row in expected if row["needs_human"]]
+    tied = [row["session_id"] for row in waiting if row["session_id"] in ids[:3]]
+    assert tied == sorted(ids[:3], reverse=True)
+
+
+def test_queue_rejects_bad_cursor_and_non_admins(client, make_user):
+    admin = make_user(role="admin")
+    response = client.get("/admin/support-requests", params={"cursor": "nem-cursor"}, headers=admin.headers)
+    assert response.status_code == 400
+    assert client.get("/admin/support-requests", headers=make_user().headers).status_code == 403
+
+
+def test_migration_backfills_summaries_from_messages():
+    memory = create_engine("sqlite://")
+    SQLModel.metadata.create_all(memory)
+    with memory.begin() as connection:
+        connection.execute(text(
+            "INSERT INTO chatmessage (session_id, sender, message, timestamp, needs_human) VALUES "
+            "('a', 'user', 'segítség', '2026-01-01 10:00:00.000000', 1), "
+            "('b', 'user', 'szia', '2026-01-01 09:00:00.000000', 0), "
+            "('b', 'admin', 'itt vagyok', '2026-01-01 09:05:00.000000', 1), "
+            "('c', 'system', 'lezárva', '2026-01-01 08:00:00.000000', 0)"
+        ))
+        create_chat_sessions(connection)
+        rows = connection.execute(text(
+            "SELECT session_id, status, needs_human, last_message_id, last_sender FROM chatsession ORDER BY session_id"
+        )).all()
+    assert rows == [("a", "waiting", 1, 1, "user"), ("b", "admin", 1, 3, "admin"), ("c", "resolved", 0, 4, "system")]
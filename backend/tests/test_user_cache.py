@@ -0,0 +1,68 @@
+import asyncio, time
+from sqlmodel import Session, select
+from app.database import engine
+from app.dependencies import USER_INVALIDATION_TOPIC, UserCache
+from app.models import User
+from app.pubsub import hub
+
+ADMIN_ONLY = "/admin/metrics/user-cache"
+
+
+def user(name: str, role: str = "user") -> User:
+    return User(username=name, hashed_password="-", role=role)
+
+
+def set_role_behind_cache(username: str, role: str):
+    """Szerepkör írása közvetlenül az adatbázisba, érvénytelenítés nélkül"""
+    with Session(engine) as session:
+        stored = session.exec(select(User).where(User.username == username)).one()
+        stored.role = role
+        session.add(stored)
+        session.commit()
+
+
+def test_get_returns_detached_copies_and_counts_hits():
+    cache = UserCache(ttl=60, max_entries=10)
+    assert cache.get("anna") is None
+    cache.put(user("anna"))
+    first = cache.get("anna")
+    first.role = "admin"
+    assert cache.get("anna").role == "user"
+    assert cache.stats() == {"entries": 1, "hits": 2, "misses": 1, "hit_rate": 2 / 3}
+
+
+def test_entries_expire_and_least_recently_used_is_evicted():
+    cache = UserCache(ttl=60, max_entries=2)
+    cache.put(user("a"))
+    cache.put(user("b"))
+    cache.get("a")
+    cache.put(user("c"))
+    assert cache.get("b") is None and cache.get("a") and cache.get("c")
+
+    expiring = UserCache(ttl=0.01, max_entries=2)
+    expiring.put(user("a"))
+    time.sleep(0.02)
+    assert expiring.get("a") is None and expiring.stats()["entries"] == 0
+
+
+def test_role_change_takes_effect_on_next_request(client, make_user):
+    admin, member = make_user(role="admin"), make_user()
+    assert client.get(ADMIN_ONLY, headers=member.headers).status_code == 403
+
+    response = client.put(f"/users/{member.username}/role", json={"role": "admin"}, headers=admin.headers)
+    assert response.status_code == 200
+    assert client.get(ADMIN_ONLY, headers=member.headers).status_code == 200
+
+
+def test_stale_entry_is_served_until_invalidated_by_another_worker(client, make_user, run):
+    member = make_user()
+    assert client.get(ADMIN_ONLY, headers=member.headers).status_code == 403
+    set_role_behind_cache(member.username, "admin")
+    assert client.get(ADMIN_ONLY, headers=member.headers).status_code == 403
+
+    async def publish():
+        hub.publish([USER_INVALIDATION_TOPIC], {"type": "user_invalidate", "username": member.username})
+        await asyncio.sleep(0.05)
+
+    run(publish)
+    assert client.get(ADMIN_ONLY, headers=member.headers).status_code == 200
@@ -0,0 +1,82 @@
+import json
+from sqlmodel import Session, select
+from app import user_provisioning
+from app.database import engine
+from app.dependencies import verify_password
+from app.models import User
+from app.user_provisioning import flush_batch
+
+
+def upload(client, admin, name: str, content: str, content_type: str = "application/octet-stream"):
+    return client.post("/users/bulk", files={"file": (name, content.encode(), content_type)}, headers=admin.headers)
+
+
+def stored(usernames) -> dict:
+    with Session(engine) as session:
+        return {u.username: u for u in session.exec(select(User).where(User.username.in_(usernames))).all()}
+
+
+def test_csv_reports_each_row(client, make_user, unique):
+    admin, taken = make_user(role="admin"), make_user()
+    a, b = unique("tomeges"), unique("tomeges")
+    content = (
+        "username,password,role\n"
+        f"{a},jelszo-a,user\n"
+        f"{b},jelszo-b,Admin\n"
+        f"{a},masik,user\n"
+        f"{taken.username},jelszo,user\n"
+        ",jelszo,user\n"
+        "jelszo-nelkul,,user\n"
+        f"{unique('tomeges')},jelszo,tulajdonos\n"
+    )
+    response = upload(client, admin, "felhasznalok.csv", content)
+    assert response.status_code == 200, response.text
+    report = response.json()
+    assert (report["created"], report["failed"]) == (2, 5)
+    assert [(r["row"], r["status"], r.get("error")) for r in report["results"]] == [
+        (2, "created", None),
+        (3, "created", None),
+        (4, "error", "Ismétlődő felhasználónév a fájlban"),
+        (5, "error", "Ez a felhasználónév már foglalt"),
+        (6, "error", "Hiányzó felhasználónév"),
+        (7, "error", "Hiányzó jelszó"),
+        (8, "error", "Érvénytelen szerepkör: tulajdonos"),
+    ]
+
+    users = stored([a, b])
+    assert verify_password("jelszo-a", users[a].hashed_password) and users[b].role == "admin"
+    found = client.get("/users/search", params={"q": a}, headers=admin.headers).json()["items"]
+    assert a in found
+
+
+def test_json_upload_spanning_several_batches(client, make_user, unique, monkeypatch):
+    monkeypatch.setattr(user_provisioning, "PROVISION_BATCH_SIZE", 2)
+    admin = make_user(role="admin")
+    names = [unique("jsonfelh") for _ in range(5)]
+    content = json.dumps([{"username": name, "password": f"pw-{name}"} for name in names] + ["nem objektum"])
+    report = upload(client, admin, "lista.json", content).json()
+    assert (report["created"], report["failed"]) == (5, 1)
+    users = stored(names)
+    assert sorted(users) == sorted(names)
+    assert all(verify_password(f"pw-{n}", users[n].hashed_password) and users[n].role == "user" for n in names)
+
+
+def test_rejected_uploads(client, make_user):
+    admin = make_user(role="admin")
+    assert upload(client, admin, "lista.json", "{nem json").json()["detail"].startswith("Érvénytelen JSON")
+    assert upload(client, admin, "lista.json", '{"username": "x"}').status_code == 400
+    assert upload(client, admin, "lista.txt", "username,password\n").status_code == 400
+    assert upload(client, make_user(), "lista.csv", "username,password\n").status_code == 403
+
+
+def test_name_taken_after_validation_does_not_break_the_batch(unique):
+    late, fresh = unique("kesoi"), unique("friss")
+    with Session(engine) as session:
+        session.add(User(username=late, hashed_password="-", role="user"))
+        session.commit()
+        batch = [({"status": "error"}, {"username": name, "hashed_password": "-", "role": "user", "mfa_enabled": False})
+                 for name in (late, fresh)]
+        assert flush_batch(session, batch) == [fresh]
+    assert [result for result, _ in batch] == [
+        {"status": "error", "error": "Ez a felhasználónév már foglalt"}, {"status": "created"}
+    ]
@@ -0,0 +1,81 @@
+import random, string
+from sqlmodel import Session
+from app.database import engine
+from app.models import User
+from app.user_directory import UserDirectory, user_directory
+from conftest import PASSWORD
+
+NAMES = ["Anna", "annamari", "Bea", "hanna", "Joanna", "kata", "zsanna", "Panni"]
+
+
+def directory(names) -> UserDirectory:
+    result = UserDirectory()
+    for name in names:
+        result.add(name)
+    return result
+
+
+def all_pages(search, query: str, limit: int) -> list:
+    items, cursor, pages = [], None, 0
+    while True:
+        page, cursor = search(query, limit, cursor)
+        items += page
+        pages += 1
+        assert pages < 1000
+        if cursor is None:
+            return items
+
+
+def reference(names, query: str) -> list:
+    query = query.strip().lower()
+    ordered = sorted(names, key=lambda name: (name.lower(), name))
+    prefix = [n for n in ordered if n.lower().startswith(query)]
+    return prefix + [n for n in ordered if query and query in n.lower() and n not in prefix]
+
+
+def test_prefix_matches_come_before_substring_matches():
+    users = directory(NAMES)
+    assert users.search("ANN", 10) == (["Anna", "annamari", "hanna", "Joanna", "Panni", "zsanna"], None)
+    assert users.search("ann", 2) == (["Anna", "annamari"], "p:annamari")
+    assert users.search("ann", 2, "p:annamari") == (["hanna", "Joanna"], "s:Joanna")
+    assert users.search("ann", 3, "s:Joanna") == (["Panni", "zsanna"], None)
+    assert users.search("xyz", 5) == ([], None)
+
+
+def test_add_and_remove_are_reflected_immediately():
+    users = directory(NAMES)
+    users.add("Anna")
+    users.remove("annamari")
+    users.add("Annabella")
+    users.remove("nincs")
+    assert all_pages(users.search, "anna", 1) == ["Anna", "Annabella", "hanna", "Joanna", "zsanna"]
+
+
+def test_paging_matches_a_brute_force_reference():
+    rng = random.Random(5)
+    names = list({"".join(rng.choices("abcAB", k=rng.randint(1, 6))) for _ in range(400)})
+    users = directory(names)
+    for query in ["", "a", "B", "ab", "bca", "aaa", "c"]:
+        for limit in (1, 3, 7, 50):
+            assert all_pages(users.search, query, limit) == reference(names, query), (query, limit)
+
+
+def test_search_endpoint_sees_new_users_and_reloads_from_database(client, make_user):
+    admin = make_user(role="admin")
+    prefix = "kereso" + "".join(random.choices(string.ascii_lowercase, k=6))
+    response = client.post("/users", json={"username": f"{prefix}1", "password": PASSWORD, "role": "user"},
+                           headers=admin.headers)
+    assert response.status_code == 201
+    with Session(engine) as session:
+        session.add(User(username=f"{prefix}2", hashed_password="-", role="user"))
+        session.commit()
+
+    first = client.get("/users/search", params={"q": prefix.upper(), "limit": 1}, headers=admin.headers).json()
+    assert first == {"items": [f"{prefix}1"], "next_cursor": f"p:{prefix}1"}
+    rest = client.get("/users/search", params={"q": prefix, "cursor": first["next_cursor"]}, headers=admin.headers)
+    assert rest.json() == {"items": [], "next_cursor": None}
+
+    user_directory.load()
+    everyone = client.get("/users/search", params={"q": prefix}, headers=admin.headers).json()
+    assert everyone["items"] == [f"{prefix}1", f"{prefix}2"]
+    assert client.get("/users/search", params={"q": prefix}).status_code == 401
@@ -0,0 +1,114 @@
+import asyncio
+from sqlmodel import Session, select
+from sqlmodel.ext.asyncio.session import AsyncSession
+from app.database import async_engine, engine
+from app.events import join_event, leave_event
+from app.models import Event, EventParticipant, EventWaitlist, User
+
+EVENT = {"title": "Népszerű", "start_date": "2026-06-01T18:00:00", "end_date": "2026-06-01T20:00:00",
+         "is_public": True}
+
+
+def join(client, user, event_id: int) -> dict:
+    response = client.post(f"/events/{event_id}/join", headers=user.headers)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def leave(client, user, event_id: int) -> dict:
+    response = client.post(f"/events/{event_id}/leave", headers=user.headers)
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def state(event_id: int) -> tuple:
+    with Session(engine) as session:
+        event = session.get(Event, event_id)
+        links = set(session.exec(select(EventParticipant.username).where(EventParticipant.event_id == event_id)).all())
+        waiting = session.exec(
+            select(EventWaitlist.username).where(EventWaitlist.event_id == event_id).order_by(EventWaitlist.id)
+        ).all()
+        return event.participant_count, set(filter(None, event.participants.split(", "))), links, waiting
+
+
+def test_join_until_full_then_waitlist_in_order(client, make_user, create_event):
+    owner, first, second, third = make_user(), make_user(), make_user(), make_user()
+    event = create_event(owner, **EVENT, capacity=2)
+
+    assert join(client, first, event["id"])["status"] == "joined"
+    assert join(client, first, event["id"])["status"] == "joined"
+    assert join(client, second, event["id"]) == {
+        "message": "Az esemény betelt, felkerültél a várólistára (1. hely).", "status": "waitlisted", "position": 1
+    }
+    assert join(client, third, event["id"])["position"] == 2
+    assert join(client, second, event["id"])["position"] == 1
+
+    count, text, links, waiting = state(event["id"])
+    assert count == 2 and text == links == {owner.username, first.username}
+    assert waiting == [second.username, third.username]
+
+
+def test_leave_promotes_first_waiting_user(client, make_user, create_event):
+    owner, member, waiting_user, later = make_user(), make_user(), make_user(), make_user()
+    event = create_event(owner, **EVENT, capacity=2)
+    join(client, member, event["id"])
+    join(client, waiting_user, event["id"])
+    join(client, later, event["id"])
+
+    assert leave(client, member, event["id"])["message"] == "Sikeresen leiratkoztál az eseményről."
+    count, text, links, waiting = state(event["id"])
+    assert count == 2 and text == links == {owner.username, waiting_user.username}
+    assert waiting == [later.username]
+    assert event["id"] in {e["id"] for e in client.get("/events", headers=waiting_user.headers).json()}
+    assert join(client, make_user(), event["id"])["position"] == 2
+
+
+def test_leaving_the_waitlist_and_unknown_cases(client, make_user, create_event):
+    owner, member, waiting_user = make_user(), make_user(), make_user()
+    event = create_event(owner, **EVENT, capacity=1)
+    join(client, waiting_user, event["id"])
+    assert leave(client, waiting_user, event["id"])["message"] == "Lekerültél a várólistáról."
+    assert leave(client, member, event["id"])["message"] == "Nem vagy rajta a résztvevők listáján."
+    assert client.post("/events/999999999/join", headers=member.headers).status_code == 404
+    assert client.post("/events/999999999/leave", headers=member.headers).status_code == 404
+
+
+def test_raising_capacity_promotes_waiting_users(client, make_user, create_event):
+    owner, first, second = make_user(), make_user(), make_user()
+    event = create_event(owner, **EVENT, capacity=1)
+    join(client, first, event["id"])
+    join(client, second, event["id"])
+
+    response = client.put(f"/events/{event['id']}", json={**EVENT, "capacity": 3}, headers=owner.headers)
+    assert response.status_code == 200, response.text
+    count, _, links, waiting = state(event["id"])
+    assert count == 3 and links == {owner.username, first.username, second.username} and waiting == []
+
+
+def test_500_concurrent_joins_and_100_leaves_keep_capacity_and_order(make_user, unique, run, create_event):
+    # A benchmarks/load_join.py forgatókönyve a valódi végpontfüggvényekkel: 500 egyidejű jelentkezés 300 helyre,
+    # majd 100 egyidejű leiratkozás; minden kérés saját sessionnel (kapcsolattal), mint több worker
+    owner = make_user()
+    event = create_event(owner, **EVENT, capacity=300)
+    users = [User(username=unique("tomeg"), hashed_password="-", role="user") for _ in range(500)]
+
+    async def each(endpoint, members) -> list:
+        async def one(user: User) -> dict:
+            async with AsyncSession(async_engine, expire_on_commit=False) as session:
+                return await endpoint(event["id"], session, user)
+        return await asyncio.gather(*(one(user) for user in members))
+
+    joins = run(each, join_event, users)
+    count, text, links, waiting = state(event["id"])
+    joined = [user.username for user, result in zip(users, joins) if result["status"] == "joined"]
+    assert len(joined) == 299 and count == len(text) == len(links) == 300
+    assert sorted(result["position"] for result in joins if result["status"] == "waitlisted") == list(range(1, 202))
+    assert set(waiting) == {user.username for user in users} - set(joined)
+
+    leaving = [user for user in users if user.username in joined][:100]
+    run(each, leave_event, leaving)
+    count, text, links, still_waiting = state(event["id"])
+    assert count == len(text) == len(links) == 300
+    # A felszabaduló helyeket a várólista eleje kapja, sorrendben
+    assert still_waiting == waiting[100:]
+    assert set(waiting[:100]) <= links and not links & {user.username for user in leaving}
@@ -1,7 +1,7 @@
 "use client";
 
 // --- IMPORTOK ---
-import { useEffect, useState, useCallback } from 'react';
+import { useEffect, useState, useCallback, useMemo, useRef } from 'react';
 import { useRouter } from 'next/navigation';
 
 // Külső könyvtárak
@@ -26,6 +26,47 @@ const localizer = dateFnsLocalizer({
   locales,
 });
 
+// HITELESÍTETT HÍVÁSOK: egyszerre csak egy token frissítés fut, 401 után egyetlen újrapróbálás friss tokennel
+const SESSION_EXPIRED = "session-expired";
+const TOKEN_REFRESHED = "token-refreshed";
+let refreshing: Promise<string | null> | null = null;
+
+const refreshSession = (): Promise<string | null> => {
+  if (!refreshing) {
+    refreshing = (async () => {
+      const stored = localStorage.getItem("refresh_token");
+      if (!stored) return null;
+      const res = await fetch("https://localhost:8000/token/refresh", {
+        method: "POST",
+        headers: { "Content-Type": "application/json" },
+        body: JSON.stringify({ refresh_token: stored })
+      });
+      if (!res.ok) {
+        localStorage.clear();
+        window.dispatchEvent(new Event(SESSION_EXPIRED));
+        return null;
+      }
+      const data = await res.json();
+      localStorage.setItem("token", data.access_token);
+      localStorage.setItem("refresh_token", data.refresh_token);
+      window.dispatchEvent(new Event(TOKEN_REFRESHED));
+      return data.access_token as string;
+    })().finally(() => { refreshing = null; });
+  }
+  return refreshing;
+};
+
+const apiFetch = async (url: string, init: RequestInit = {}): Promise<Response> => {
+  const send = (token: string | null) => fetch(url, {
+    ...init,
+    headers: { ...(init.headers as Record<string, string>), "Authorization": `Bearer ${token}` }
+  });
+  const res = await send(localStorage.getItem("token"));
+  if (res.status !== 401) return res;
+  const token = await refreshSession().catch(() => null);
+  return token ? send(token) : res;
+};
+
 // NTERFÉSZEK
 interface EventItem {
   id: number;
@@ -38,6 +79,15 @@ interface EventItem {
   is_meeting?: boolean;
   meeting_link?: string;
   is_public?: boolean;
+  capacity?: number | null;
+  participant_count?: number;
+  version?: number;
+}
+
+interface EventDelta {
+  version: number;
+  upserts: EventItem[];
+  deleted: number[];
 }
 
 interface CalendarEvent {
@@ -54,9 +104,20 @@ interface ContextMenuState {
   event: CalendarEvent;
 }
 
+// Változáscsomag alkalmazása: a törölt és a módosult elemek ki, a módosultak új alakjukban vissza, kezdés szerint rendezve
+const mergeEvents = (list: EventItem[], upserts: EventItem[], removed: number[]) => {
+  const replaced = new Set([...removed, ...upserts.map(event => event.id)]);
+  return [...list.filter(event => !replaced.has(event.id)), ...upserts]
+    .sort((a, b) => a.start_date.localeCompare(b.start_date) || a.id - b.id);
+};
+
 interface SupportUser {
   session_id: string;
+  status: string;
   needs_human: boolean;
+  last_message_at: string;
+  last_sender: string;
+  unread_count: number;
 }
 
 export default function DashboardPage() {
@@ -66,15 +127,17 @@ export default function DashboardPage() {
   // STATE: USER & AUTH
   const [user, setUser] = useState<string | null>(null);
   const [userRole, setUserRole] = useState<string | null>(null);
-  const [allUsers, setAllUsers] = useState<string[]>([]);
   const [viewedUser, setViewedUser] = useState<string | null>(null);
+  const [accessToken, setAccessToken] = useState<string | null>(null);
 
   // STATE: ESEMÉNYEK & TABOK
   const [events, setEvents] = useState<EventItem[]>([]);
-  const [calendarEvents, setCalendarEvents] = useState<CalendarEvent[]>([]);
   const [activeTab, setActiveTab] = useState<'list' | 'calendar' | 'helpdesk' | 'public'>('list');
   const [isPublic, setIsPublic] = useState(false);
   const [publicEvents, setPublicEvents] = useState<EventItem[]>([]);
+  // Publikus változáscsomagok: az utoljára látott lista-verzió és eseményenként a már alkalmazott verzió
+  const publicVersionRef = useRef<number | null>(null);
+  const appliedVersionsRef = useRef(new Map<number, number>());
 
   // STATE: NAPTÁR UI
   const [date, setDate] = useState(new Date());
@@ -94,6 +157,7 @@ export default function DashboardPage() {
   const [supportUsers, setSupportUsers] = useState<SupportUser[]>([]);
   const [selectedSupportUser, setSelectedSupportUser] = useState<string | null>(null);
   const [adminChatMessages, setAdminChatMessages] = useState<any[]>([]);
+  const adminLastIdRef = useRef<number>(0);
   const [adminReply, setAdminReply] = useState("");
   const [isChatResolved, setIsChatResolved] = useState(false);
 
@@ -134,37 +198,43 @@ export default function DashboardPage() {
     } else {
       if (storedUser) setUser(storedUser);
       if (storedRole) setUserRole(storedRole);
-      fetchUsers();
       fetchEvents();
     }
   }, [router]);
 
+  // TOKEN FRISSÍTÉS: a rövid életű access token cseréje a refresh tokennel (jelszó nélkül) - betöltéskor is,
+  // hogy egy lejárt token ne az első kérések 401-ével derüljön ki
+  useEffect(() => {
+    const expired = () => router.push("/login");
+    const refreshed = () => setAccessToken(localStorage.getItem("token"));
+    window.addEventListener(SESSION_EXPIRED, expired);
+    window.addEventListener(TOKEN_REFRESHED, refreshed);
+    refreshed();
+
+    const refresh = () => { refreshSession().catch(err => console.error(err)); };
+    refresh();
+    const interval = setInterval(refresh, 10 * 60 * 1000);
+    return () => {
+      clearInterval(interval);
+      window.removeEventListener(SESSION_EXPIRED, expired);
+      window.removeEventListener(TOKEN_REFRESHED, refreshed);
+    };
+  }, [router]);
+
 
   // API HÍVÁSOK: ESEMÉNYEK
   const fetchEvents = async () => {
-    const token = localStorage.getItem("token");
     const baseUrl = "https://localhost:8000";
     const url = viewedUser
       ? `${baseUrl}/events/user/${viewedUser}`
       : `${baseUrl}/events`;
 
     try {
-      const res = await fetch(url, {
-        headers: { "Authorization": `Bearer ${token}` }
-      });
+      const res = await apiFetch(url);
 
       if (res.ok) {
         const data: EventItem[] = await res.json();
         setEvents(data);
-
-        const formattedEvents: CalendarEvent[] = data.map(event => ({
-          id: event.id,
-          title: event.title,
-          start: new Date(event.start_date),
-          end: new Date(event.end_date),
-          resource: event
-        }));
-        setCalendarEvents(formattedEvents);
       } else {
         console.error("Hiba a lekérdezésben:", res.status);
       }
@@ -175,69 +245,126 @@ export default function DashboardPage() {
     fetchEvents();
   }, [viewedUser]);
 
+  const calendarEvents = useMemo<CalendarEvent[]>(() => events.map(event => ({
+    id: event.id,
+    title: event.title,
+    start: new Date(event.start_date),
+    end: new Date(event.end_date),
+    resource: event
+  })), [events]);
+
   const fetchPublicEvents = async () => {
-    const token = localStorage.getItem("token");
     try {
-      const res = await fetch("https://localhost:8000/events/public", {
-        headers: { "Authorization": `Bearer ${token}` }
-      });
+      const res = await apiFetch("https://localhost:8000/events/public");
       if (res.ok) {
         const data = await res.json();
         setPublicEvents(data);
+        // ETag: W/"<verzió>" - innen kérhetők a ?since= változáscsomagok
+        const version = res.headers.get("ETag")?.match(/\d+/);
+        if (version) publicVersionRef.current = Number(version[0]);
       }
     } catch (err) { console.error(err); }
   };
 
-  const fetchUsers = async () => {
-    const token = localStorage.getItem("token");
-    const res = await fetch("https://localhost:8000/users/list", {
-      headers: { "Authorization": `Bearer ${token}` }
-    });
-    if (res.ok) {
-      setAllUsers(await res.json());
+  // A megjelenített naptárba tartozik-e egy (publikus) esemény: más naptárában a tulajdonos, a sajátban résztvevőként is
+  const belongsToCalendar = (event: EventItem) => viewedUser
+    ? event.owner === viewedUser
+    : event.owner === user || !!event.participants?.split(',').map(p => p.trim()).includes(user || "");
+
+  // Publikus változások a legutóbb látott verzió óta (upsert + törlési jelzők) - a teljes lista újratöltése helyett.
+  // Verzió nélkül (még nem volt listázás) az üzenetben kapott változástól kezdve kéri. A naptárba tartozó módosult
+  // események ott is a helyükre kerülnek, a kiesők (pl. törölt résztvevő) kikerülnek.
+  const fetchPublicDelta = async (fallbackSince: number): Promise<EventDelta | null> => {
+    const since = publicVersionRef.current ?? fallbackSince;
+    try {
+      const res = await apiFetch(`https://localhost:8000/events/public?since=${since}`);
+      if (!res.ok) return null;
+      const delta: EventDelta = await res.json();
+      publicVersionRef.current = Math.max(publicVersionRef.current ?? 0, delta.version);
+      for (const event of delta.upserts) appliedVersionsRef.current.set(event.id, event.version ?? delta.version);
+      for (const id of delta.deleted) appliedVersionsRef.current.delete(id);
+
+      setPublicEvents(prev => mergeEvents(prev, delta.upserts, delta.deleted));
+      const outside = delta.upserts.filter(event => !belongsToCalendar(event)).map(event => event.id);
+      setEvents(prev => mergeEvents(prev, delta.upserts.filter(belongsToCalendar), outside));
+      return delta;
+    } catch (err) {
+      console.error(err);
+      return null;
     }
   };
 
-  useEffect(() => {
-    let interval: NodeJS.Timeout;
+  // Egy SSE üzenet alkalmazása a változáscsomagból és a törlési jelzőkből; a naptár újratöltése csak olyan változásnál
+  // kell, amit a publikus csomag nem tartalmaz (privát esemény, priváttá tett esemény, import)
+  const applyChange = async (message: { action: string; event_id?: number; version: number }) => {
+    await fetchPublicDelta(message.version - 1);
+    const id = message.event_id;
+    if (id === undefined) {
+      fetchEvents();
+    } else if (message.action === "deleted") {
+      setEvents(prev => prev.filter(event => event.id !== id));
+    } else if ((appliedVersionsRef.current.get(id) ?? -1) < message.version) {
+      fetchEvents();
+    }
+  };
+
+  // Felhasználókeresés a szerveren (prefix + részszó), lapozva - a teljes lista letöltése helyett
+  const searchUsers = useCallback(async (query: string, cursor: string | null) => {
+    const params = new URLSearchParams({ q: query, limit: "20" });
+    if (cursor) params.set("cursor", cursor);
+    const res = await apiFetch(`https://localhost:8000/users/search?${params}`);
+    if (!res.ok) return { items: [], next_cursor: null };
+    const data = await res.json();
+    return { items: data.items.filter((u: string) => u !== user), next_cursor: data.next_cursor };
+  }, [user]);
 
+  useEffect(() => {
     if (activeTab === 'public') {
       fetchPublicEvents();
-      interval = setInterval(fetchPublicEvents, 1000);
     }
-
-    return () => clearInterval(interval);
   }, [activeTab]);
 
+  // SZERVER PUSH: eseményváltozások SSE csatornán (polling helyett) - tokenfrissítéskor új kapcsolat, mert az
+  // EventSource az automatikus újracsatlakozáskor is az eredeti (addigra lejárt) tokennel próbálkozna
+  useEffect(() => {
+    if (!accessToken) return;
+
+    const source = new EventSource(`https://localhost:8000/events/stream?token=${accessToken}`);
+    source.onmessage = (e) => {
+      applyChange(JSON.parse(e.data)).catch(err => console.error(err));
+    };
+    // Elutasított kapcsolatot a böngésző nem nyit újra: friss token után az effect újraépíti
+    source.onerror = () => {
+      if (source.readyState === EventSource.CLOSED) {
+        refreshSession().catch(err => console.error(err));
+      }
+    };
+
+    return () => source.close();
+  }, [viewedUser, user, accessToken]);
+
 
   // API HÍVÁSOK: JOIN / LEAVE
   const joinEvent = async (id: number) => {
-    const token = localStorage.getItem("token");
-    const res = await fetch(`https://localhost:8000/events/${id}/join`, {
-      method: "POST",
-      headers: { "Authorization": `Bearer ${token}` }
+    const res = await apiFetch(`https://localhost:8000/events/${id}/join`, {
+      method: "POST"
     });
     const data = await res.json();
     if (res.ok) {
       showAlert(data.message, "success");
-      fetchEvents();
     } else {
       showAlert(data.detail || "Hiba történt", "error");
     }
   };
 
   const leaveEvent = async (id: number) => {
-    const token = localStorage.getItem("token");
-    const res = await fetch(`https://localhost:8000/events/${id}/leave`, {
-      method: "POST",
-      headers: { "Authorization": `Bearer ${token}` }
+    const res = await apiFetch(`https://localhost:8000/events/${id}/leave`, {
+      method: "POST"
     });
     const data = await res.json();
 
     if (res.ok) {
       showAlert(data.message, "info");
-      fetchEvents();
-      fetchPublicEvents();
     } else {
       showAlert(data.detail || "Hiba történt", "error");
     }
@@ -246,7 +373,6 @@ export default function DashboardPage() {
 
   // ŰRLAP KEZELÉS & MENTÉS
   const executeSave = async (payload: any) => {
-    const token = localStorage.getItem("token");
     let url = "https://localhost:8000/events";
     let method = "POST";
 
@@ -256,9 +382,9 @@ export default function DashboardPage() {
     }
 
     try {
-      const res = await fetch(url, {
+      const res = await apiFetch(url, {
         method: method,
-        headers: { "Content-Type": "application/json", "Authorization": `Bearer ${token}` },
+        headers: { "Content-Type": "application/json" },
         body: JSON.stringify(payload),
       });
 
@@ -269,7 +395,6 @@ export default function DashboardPage() {
         setNewDesc("");
         setIsMeeting(false);
         setNewParticipants("");
-        fetchEvents();
       } else {
         showAlert("Hiba a mentés során", "error");
       }
@@ -280,7 +405,6 @@ export default function DashboardPage() {
 
   const handleSubmit = async (e: React.FormEvent) => {
     e.preventDefault();
-    const token = localStorage.getItem("token");
 
     if (new Date(endDate) < new Date(startDate)) {
       showAlert("A befejezés nem lehet korábban!", "error");
@@ -299,9 +423,9 @@ export default function DashboardPage() {
     };
 
     try {
-      const conflictRes = await fetch("https://localhost:8000/events/check-conflict", {
+      const conflictRes = await apiFetch("https://localhost:8000/events/check-conflict", {
         method: "POST",
-        headers: { "Content-Type": "application/json", "Authorization": `Bearer ${token}` },
+        headers: { "Content-Type": "application/json" },
         body: JSON.stringify(payload),
       });
 
@@ -374,10 +498,8 @@ export default function DashboardPage() {
 
   const confirmDelete = async () => {
     if (!deleteId) return;
-    const token = localStorage.getItem("token");
-    const res = await fetch(`https://localhost:8000/events/${deleteId}`, {
-      method: "DELETE",
-      headers: { "Authorization": `Bearer ${token}` }
+    const res = await apiFetch(`https://localhost:8000/events/${deleteId}`, {
+      method: "DELETE"
     });
 
     if (!res.ok) {
@@ -394,11 +516,10 @@ export default function DashboardPage() {
   // USER & AUTH ADMINISZTRÁCIÓ
   const handleCreateUser = async (e: React.FormEvent) => {
     e.preventDefault();
-    const token = localStorage.getItem("token");
     try {
-      const res = await fetch("https://localhost:8000/users", {
+      const res = await apiFetch("https://localhost:8000/users", {
         method: "POST",
-        headers: { "Content-Type": "application/json", "Authorization": `Bearer ${token}` },
+        headers: { "Content-Type": "application/json" },
         body: JSON.stringify({ username: createUsername, password: createPassword, role: createRole }),
       });
       if (res.ok) {
@@ -417,10 +538,9 @@ export default function DashboardPage() {
   };
 
   const startMfaSetup = async () => {
-    const token = localStorage.getItem("token");
-    const res = await fetch("https://localhost:8000/mfa/setup", {
+    const res = await apiFetch("https://localhost:8000/mfa/setup", {
       method: "POST",
-      headers: { "Content-Type": "application/json", "Authorization": `Bearer ${token}` },
+      headers: { "Content-Type": "application/json" },
       body: JSON.stringify({ username: user })
     });
     const data = await res.json();
@@ -429,10 +549,9 @@ export default function DashboardPage() {
   };
 
   const verifyMfa = async () => {
-    const token = localStorage.getItem("token");
-    const res = await fetch("https://localhost:8000/mfa/verify", {
+    const res = await apiFetch("https://localhost:8000/mfa/verify", {
       method: "POST",
-      headers: { "Content-Type": "application/json", "Authorization": `Bearer ${token}` },
+      headers: { "Content-Type": "application/json" },
       body: JSON.stringify({ username: user, code: verifyCode })
     });
     if (res.ok) {
@@ -444,15 +563,23 @@ export default function DashboardPage() {
     }
   };
 
-  const handleLogout = () => { localStorage.clear(); router.push("/login"); };
+  const handleLogout = async () => {
+    const refreshToken = localStorage.getItem("refresh_token");
+    if (refreshToken) {
+      await fetch("https://localhost:8000/logout", {
+        method: "POST",
+        headers: { "Content-Type": "application/json" },
+        body: JSON.stringify({ refresh_token: refreshToken })
+      }).catch(() => null);
+    }
+    localStorage.clear();
+    router.push("/login");
+  };
 
 
   // HELPDESK LOGIKA
   const fetchSupportRequests = async () => {
-    const token = localStorage.getItem("token");
-    const res = await fetch("https://localhost:8000/admin/support-requests", {
-      headers: { "Authorization": `Bearer ${token}` }
-    });
+    const res = await apiFetch("https://localhost:8000/admin/support-requests");
     if (res.ok) {
       const data = await res.json();
       setSupportUsers(data);
@@ -460,13 +587,11 @@ export default function DashboardPage() {
   };
 
   const fetchUserChatForAdmin = async (targetSessionId: string) => {
-    const token = localStorage.getItem("token");
-    const res = await fetch(`https://localhost:8000/admin/chat/${targetSessionId}`, {
-      headers: { "Authorization": `Bearer ${token}` }
-    });
+    const res = await apiFetch(`https://localhost:8000/admin/chat/${targetSessionId}`);
     if (res.ok) {
       const data = await res.json();
       setAdminChatMessages(data);
+      adminLastIdRef.current = data.length > 0 ? data[data.length - 1].id : 0;
       if (data.length > 0) {
         const lastMsg = data[data.length - 1];
         setIsChatResolved(!lastMsg.needs_human);
@@ -476,50 +601,100 @@ export default function DashboardPage() {
     }
   };
 
+  // Socketről érkező üzenetek hozzáfűzése a nyitott beszélgetéshez (azonosító szerint egyszer)
+  const appendAdminChatMessages = (incoming: any[]) => {
+    if (incoming.length === 0) return;
+    adminLastIdRef.current = Math.max(adminLastIdRef.current, incoming[incoming.length - 1].id);
+    const ids = new Set(incoming.map((m) => m.id));
+    setAdminChatMessages((prev) => [...prev.filter((m) => !ids.has(m.id)), ...incoming]);
+    setIsChatResolved(!incoming[incoming.length - 1].needs_human);
+  };
+
   const sendAdminReply = async () => {
     if (!selectedSupportUser || !adminReply) return;
-    const token = localStorage.getItem("token");
-    await fetch("https://localhost:8000/admin/reply", {
+    await apiFetch("https://localhost:8000/admin/reply", {
       method: "POST",
-      headers: { "Content-Type": "application/json", "Authorization": `Bearer ${token}` },
+      headers: { "Content-Type": "application/json" },
       body: JSON.stringify({ target_session_id: selectedSupportUser, message: adminReply })
     });
     setAdminReply("");
-    fetchUserChatForAdmin(selectedSupportUser);
   };
 
   const resolveChat = async () => {
     if (!selectedSupportUser) return;
-    const token = localStorage.getItem("token");
-    await fetch("https://localhost:8000/admin/resolve", {
+    await apiFetch("https://localhost:8000/admin/resolve", {
       method: "POST",
-      headers: { "Content-Type": "application/json", "Authorization": `Bearer ${token}` },
+      headers: { "Content-Type": "application/json" },
       body: JSON.stringify({ target_session_id: selectedSupportUser })
     });
-    fetchUserChatForAdmin(selectedSupportUser);
     fetchSupportRequests();
   };
 
+  // A support sor csak tartalék időzítővel frissül; az új üzenetekről az admin socket szól
   useEffect(() => {
     let interval: any;
     if (activeTab === 'helpdesk' && userRole === 'admin') {
       fetchSupportRequests();
-      interval = setInterval(fetchSupportRequests, 5000);
+      interval = setInterval(fetchSupportRequests, 30000);
     }
     return () => clearInterval(interval);
   }, [activeTab, userRole]);
 
   useEffect(() => {
-    let interval: any;
-    if (activeTab === 'helpdesk' && selectedSupportUser) {
-      fetchUserChatForAdmin(selectedSupportUser);
-      interval = setInterval(() => {
-        fetchUserChatForAdmin(selectedSupportUser);
-      }, 2000);
-    }
-    return () => clearInterval(interval);
+    if (activeTab !== 'helpdesk' || !selectedSupportUser) return;
+    fetchUserChatForAdmin(selectedSupportUser);
   }, [selectedSupportUser, activeTab]);
 
+  const selectedSupportUserRef = useRef<string | null>(null);
+  selectedSupportUserRef.current = selectedSupportUser;
+
+  // Admin multiplex socket: minden beszélgetés új üzenete azonnal; bontás után az utolsó kapott azonosítótól folytatja
+  useEffect(() => {
+    if (activeTab !== 'helpdesk' || userRole !== 'admin') return;
+    let socket: WebSocket | null = null;
+    let retryTimer: ReturnType<typeof setTimeout> | undefined;
+    let queueTimer: ReturnType<typeof setTimeout> | undefined;
+    let retryDelay = 1000;
+    let lastSeenId = 0;
+    let closed = false;
+
+    const connect = () => {
+      const token = localStorage.getItem("token");
+      const resume = lastSeenId > 0 ? `&after_id=${lastSeenId}` : "";
+      socket = new WebSocket(`wss://localhost:8000/ws/admin/chat?token=${token}${resume}`);
+      socket.onopen = () => {
+        retryDelay = 1000;
+      };
+      socket.onmessage = (e) => {
+        const data = JSON.parse(e.data);
+        if (data.type === "ping") {
+          socket?.send(JSON.stringify({ type: "pong" }));
+          return;
+        }
+        if (data.type !== "messages" || data.messages.length === 0) return;
+        lastSeenId = Math.max(lastSeenId, data.messages[data.messages.length - 1].id);
+        const selected = selectedSupportUserRef.current;
+        appendAdminChatMessages(data.messages.filter((m: any) => m.session_id === selected));
+        // Egy üzenetcsomag után egyszer frissül a sor
+        clearTimeout(queueTimer);
+        queueTimer = setTimeout(fetchSupportRequests, 300);
+      };
+      socket.onclose = () => {
+        if (closed) return;
+        retryTimer = setTimeout(connect, retryDelay);
+        retryDelay = Math.min(retryDelay * 2, 30000);
+      };
+    };
+
+    connect();
+    return () => {
+      closed = true;
+      clearTimeout(retryTimer);
+      clearTimeout(queueTimer);
+      socket?.close();
+    };
+  }, [activeTab, userRole]);
+
   // Jobb-klikk felülírása
   const EventWithContextMenu = ({ event }: { event: CalendarEvent }) => {
     return (
@@ -587,7 +762,7 @@ export default function DashboardPage() {
               <SearchableSelect
                 label="Naptár megtekintése"
                 placeholder="Keresés felhasználóra..."
-                options={allUsers.filter(u => u !== user)}
+                fetchOptions={searchUsers}
                 value={viewedUser}
                 onChange={(val) => setViewedUser(val)}
               />
@@ -872,6 +1047,7 @@ export default function DashboardPage() {
                       <h3 className="text-lg font-bold text-white">{event.title} <span className="text-xs font-normal text-zinc-500">by {event.owner}</span></h3>
                       <div className="text-sm text-green-400 mt-1">{formatListDate(event.start_date)} - {formatListDate(event.end_date)}</div>
                       {event.description && <p className="text-zinc-400 text-sm mt-2 italic truncate">{event.description}</p>}
+                      {event.capacity ? <p className="text-xs text-zinc-500 mt-1">Létszám: {event.participant_count}/{event.capacity}</p> : null}
                     </div>
                     {event.participants?.split(',').map(p => p.trim()).includes(user || "") ? (
                       /* HA MÁR CSATLAKOZOTT -> LEADÁS GOMB */
@@ -916,6 +1092,9 @@ export default function DashboardPage() {
                         }`}
                     >
                       <span className="truncate text-sm font-medium">👤 {u.session_id}</span>
+                      {u.unread_count > 0 && (
+                        <span className="ml-auto mr-2 text-xs font-bold bg-red-600 text-white rounded-full px-2" title="Olvasatlan üzenetek">{u.unread_count}</span>
+                      )}
                       {u.needs_human ? (
                         <span className="w-3 h-3 rounded-full bg-red-500 shadow-[0_0_10px_rgba(239,68,68,0.6)]" title="Segítség kell!" />
                       ) : (
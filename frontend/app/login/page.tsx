@@ -51,6 +51,7 @@ export default function LoginPage() {
       const data = await response.json();
       
       localStorage.setItem("token", data.access_token);
+      localStorage.setItem("refresh_token", data.refresh_token);
       localStorage.setItem("username", username);
       localStorage.setItem("role", data.role);
       
@@ -28,23 +28,51 @@ export default function HelpDesk() {
     }
   }, []);
 
-  const fetchMessages = async () => {
-    if (!sessionId) return;
-    try {
-      const res = await fetch(`https://localhost:8000/chat/history/${sessionId}`);
-      if (res.ok) {
-        const data = await res.json();
-        setMessages(data);
-      }
-    } catch (e) { console.error(e); }
+  const lastIdRef = useRef<number>(0);
+
+  // Az új üzenetek hozzáfűzése (azonosító szerint egyszer); a helyben mutatott (azonosító nélküli) ideiglenes üzeneteket a szerver példánya váltja
+  const mergeMessages = (incoming: any[]) => {
+    if (incoming.length === 0) return;
+    lastIdRef.current = Math.max(lastIdRef.current, incoming[incoming.length - 1].id);
+    const ids = new Set(incoming.map((m) => m.id));
+    setMessages((prev) => [...prev.filter((m) => m.id !== undefined && !ids.has(m.id)), ...incoming]);
   };
 
   useEffect(() => {
-    if (isOpen && sessionId) {
-      fetchMessages();
-      const interval = setInterval(fetchMessages, 3000); // Polling
-      return () => clearInterval(interval);
-    }
+    if (!isOpen || !sessionId) return;
+    let socket: WebSocket | null = null;
+    let retryTimer: ReturnType<typeof setTimeout> | undefined;
+    let retryDelay = 1000;
+    let closed = false;
+
+    // WebSocket: az új üzenetek azonnal érkeznek; bontás után az utolsó kapott azonosítótól folytatja
+    const connect = () => {
+      const resume = lastIdRef.current > 0 ? `?after_id=${lastIdRef.current}` : "";
+      socket = new WebSocket(`wss://localhost:8000/ws/chat/${sessionId}${resume}`);
+      socket.onopen = () => {
+        retryDelay = 1000;
+      };
+      socket.onmessage = (e) => {
+        const data = JSON.parse(e.data);
+        if (data.type === "messages") {
+          mergeMessages(data.messages);
+        } else if (data.type === "ping") {
+          socket?.send(JSON.stringify({ type: "pong" }));
+        }
+      };
+      socket.onclose = () => {
+        if (closed) return;
+        retryTimer = setTimeout(connect, retryDelay);
+        retryDelay = Math.min(retryDelay * 2, 30000);
+      };
+    };
+
+    connect();
+    return () => {
+      closed = true;
+      clearTimeout(retryTimer);
+      socket?.close();
+    };
   }, [isOpen, sessionId]);
 
   useEffect(() => {
@@ -65,7 +93,6 @@ export default function HelpDesk() {
         headers: { "Content-Type": "application/json" },
         body: JSON.stringify({ session_id: sessionId, message: txt })
       });
-      fetchMessages();
     } catch (e) {
       console.error(e);
     }
@@ -119,10 +146,13 @@ export default function HelpDesk() {
       if (res.ok) {
         const data = await res.json();
         
+        // A leirat és a válasz a long-pollon érkezik; ha még nem ért ide, addig helyben mutatjuk
         setMessages(prev => {
           const newMsgs = prev.filter(m => !m.isTemp);
-          newMsgs.push({ sender: 'user', message: data.user_text });
-          newMsgs.push({ sender: 'bot', message: data.ai_text });
+          if (!newMsgs.some(m => m.id !== undefined && m.message === data.ai_text)) {
+            newMsgs.push({ sender: 'user', message: data.user_text });
+            newMsgs.push({ sender: 'bot', message: data.ai_text });
+          }
           return newMsgs;
         });
 
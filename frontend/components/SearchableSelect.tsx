@@ -1,8 +1,14 @@
 "use client";
 import { useState, useRef, useEffect } from "react";
 
+export interface OptionPage {
+  items: string[];
+  next_cursor: string | null;
+}
+
 interface SearchableSelectProps {
-  options: string[];
+  options?: string[];
+  fetchOptions?: (query: string, cursor: string | null) => Promise<OptionPage>;
   value: string | null;
   onChange: (value: string | null) => void;
   placeholder?: string;
@@ -10,7 +16,8 @@ interface SearchableSelectProps {
 }
 
 export default function SearchableSelect({
-  options,
+  options = [],
+  fetchOptions,
   value,
   onChange,
   placeholder = "Válassz...",
@@ -18,7 +25,10 @@ export default function SearchableSelect({
 }: SearchableSelectProps) {
   const [isOpen, setIsOpen] = useState(false);
   const [search, setSearch] = useState("");
+  const [remoteOptions, setRemoteOptions] = useState<string[]>([]);
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
   const wrapperRef = useRef<HTMLDivElement>(null);
+  const requestId = useRef(0);
 
   useEffect(() => {
     if (value) {
@@ -28,24 +38,48 @@ export default function SearchableSelect({
     }
   }, [value]);
 
+  // Szerveroldali keresés: leütések után rövid késleltetéssel, csak a legutolsó válasz számít
+  useEffect(() => {
+    if (!fetchOptions || !isOpen) return;
+    const id = ++requestId.current;
+    const timer = setTimeout(async () => {
+      const page = await fetchOptions(search === value ? "" : search, null);
+      if (id !== requestId.current) return;
+      setRemoteOptions(page.items);
+      setNextCursor(page.next_cursor);
+    }, 150);
+    return () => clearTimeout(timer);
+  }, [fetchOptions, search, isOpen, value]);
+
+  const loadMore = async () => {
+    if (!fetchOptions || !nextCursor) return;
+    const id = requestId.current;
+    const page = await fetchOptions(search === value ? "" : search, nextCursor);
+    if (id !== requestId.current) return;
+    setRemoteOptions((prev) => [...prev, ...page.items]);
+    setNextCursor(page.next_cursor);
+  };
+
+  const knownOptions = fetchOptions ? remoteOptions : options;
+
   useEffect(() => {
     function handleClickOutside(event: MouseEvent) {
       if (wrapperRef.current && !wrapperRef.current.contains(event.target as Node)) {
         setIsOpen(false);
-        if (!options.includes(search) && value) {
+        if (!knownOptions.includes(search) && value) {
           setSearch(value);
-        } else if (!options.includes(search) && !value) {
+        } else if (!knownOptions.includes(search) && !value) {
           setSearch("");
         }
       }
     }
     document.addEventListener("mousedown", handleClickOutside);
     return () => document.removeEventListener("mousedown", handleClickOutside);
-  }, [wrapperRef, search, value, options]);
+  }, [wrapperRef, search, value, knownOptions]);
 
-  const filteredOptions = options.filter((opt) =>
-    opt.toLowerCase().includes(search.toLowerCase())
-  );
+  const filteredOptions = fetchOptions
+    ? remoteOptions
+    : options.filter((opt) => opt.toLowerCase().includes(search.toLowerCase()));
 
   const handleSelect = (option: string) => {
     onChange(option);
@@ -86,7 +120,8 @@ export default function SearchableSelect({
       {isOpen && (
         <div className="absolute z-50 w-full mt-1 bg-zinc-900 border border-zinc-700 rounded-lg shadow-xl max-h-60 overflow-y-auto">
           {filteredOptions.length > 0 ? (
-            filteredOptions.map((option) => (
+            <>
+            {filteredOptions.map((option) => (
               <div
                 key={option}
                 onClick={() => handleSelect(option)}
@@ -98,7 +133,16 @@ export default function SearchableSelect({
               >
                 {option}
               </div>
-            ))
+            ))}
+            {fetchOptions && nextCursor && (
+              <div
+                onClick={loadMore}
+                className="px-4 py-2 cursor-pointer text-sm text-blue-400 hover:bg-zinc-800 italic"
+              >
+                Továbbiak betöltése...
+              </div>
+            )}
+            </>
           ) : (
             <div className="px-4 py-3 text-zinc-500 text-sm italic">
               Nincs találat.